@@ -0,0 +1,147 @@
+# batch.py: GUI 없이 여러 시나리오 파일의 배치 탐색을 프로세스 풀로 실행하고 결과와 요약 통계를 저장하는 CLI
+
+import argparse
+import json
+import os
+import sys
+import traceback
+from time import perf_counter
+from typing import Dict, List, Optional
+from config import SETBACK, GRID_SIZE, BUILDING_SPACING
+from scenario import load_scenario, create_buildings, iter_scenario_paths
+from layout import iter_layouts, new_failure_reasons, SUBSTATION_MODES, PRODUCTION_CANDIDATE_MODES, GUIDE_ORDERS
+from ranking import top_k_layouts
+from cache import LayoutCache, cached_layout_set, cached_top_k, CACHE_ENV
+from stats import LayoutStats
+
+def run_scenario(path: str, top_k: int = 5, iter_options: Optional[Dict] = None,
+                 cache_dir: Optional[str] = None) -> Dict:
+    """시나리오 파일 하나를 탐색하여 배치 수, 실패 통계, 단계별 통계, 점수 상위 배치를 담은 결과 반환
+
+    cache_dir 를 지정하면 같은 입력의 이전 탐색 결과와 점수 상위 목록을 디스크 캐시에서 읽고, 없으면 계산하여 저장한다.
+    예외가 나면 'error' 에 내용을 담아 반환한다 (한 시나리오의 오류로 전체 실행이 멈추지 않도록).
+    """
+    started = perf_counter()
+    result = {'path': path, 'name': os.path.splitext(os.path.basename(path))[0]}
+    try:
+        inputs = load_scenario(path)
+        result['name'] = inputs['name']
+        buildings = create_buildings(inputs)
+        failure_reasons = new_failure_reasons()
+        stats = LayoutStats()
+        if cache_dir:
+            cache = LayoutCache(cache_dir)
+            layout_set, _ = cached_layout_set(buildings, cache, failure_reasons=failure_reasons,
+                                              stats=stats, **(iter_options or {}))
+            layout_count = len(layout_set)
+            # 점수 상위 목록도 같은 배치 키로 캐시 (적중하면 Future Area 계산 생략)
+            top_layouts = cached_top_k(layout_set, buildings, top_k, cache, **(iter_options or {}))
+        else:
+            layout_count = 0
+
+            def count_layout(layout: Dict) -> bool:
+                nonlocal layout_count
+                layout_count += 1
+                return True
+
+            iter_options = dict(iter_options or {}, failure_reasons=failure_reasons, stats=stats,
+                                predicate=count_layout)
+            if top_k > 0:
+                top_layouts = top_k_layouts(buildings, top_k, **iter_options)
+            else:
+                top_layouts = []
+                for _ in iter_layouts(buildings, **iter_options):
+                    pass
+        result.update({
+            'layout_count': layout_count,
+            'failure_reasons': failure_reasons,
+            'stats': stats.as_dict(),
+            'top_layouts': top_layouts
+        })
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+    result['elapsed'] = perf_counter() - started
+    return result
+
+def _run_scenario_args(args) -> Dict:
+    return run_scenario(*args)
+
+def _json_default(value):
+    # NumPy 스칼라 등 JSON 기본 형식이 아닌 값
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"JSON 으로 저장할 수 없는 값: {type(value).__name__}")
+
+def summarize(results: List[Dict]) -> Dict:
+    """시나리오 결과 목록의 요약 통계"""
+    succeeded = [result for result in results if 'error' not in result]
+    failure_reasons = new_failure_reasons()
+    for result in succeeded:
+        for reason, count in result['failure_reasons'].items():
+            failure_reasons[reason] += count
+    return {
+        'scenarios': len(results),
+        'succeeded': len(succeeded),
+        'errors': len(results) - len(succeeded),
+        'without_layouts': sum(1 for result in succeeded if result['layout_count'] == 0),
+        'layout_count': sum(result['layout_count'] for result in succeeded),
+        'failure_reasons': failure_reasons,
+        'elapsed_total': sum(result['elapsed'] for result in results)
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="시나리오 파일(JSON/YAML)들의 배치 탐색을 GUI 없이 실행")
+    parser.add_argument('scenarios', nargs='+', help="시나리오 파일 또는 시나리오 파일이 있는 디렉터리")
+    parser.add_argument('-o', '--output', help="시나리오별 결과를 JSON Lines 로 저장할 파일 (없으면 요약만 출력)")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="동시에 실행할 시나리오 수")
+    parser.add_argument('-k', '--top-k', type=int, default=5, help="시나리오별로 저장할 점수 상위 배치 수")
+    parser.add_argument('--substation-mode', choices=SUBSTATION_MODES, default='step')
+    parser.add_argument('--production-candidates', choices=PRODUCTION_CANDIDATE_MODES, default='grid')
+    parser.add_argument('--guide-order', choices=GUIDE_ORDERS, default='scan')
+    parser.add_argument('--collision-backend', choices=('geometry', 'raster', 'check'), default='geometry')
+    parser.add_argument('--setback', type=float, default=SETBACK, help="부지 경계 및 건물 간 이격거리 (m)")
+    parser.add_argument('--grid-size', type=float, default=GRID_SIZE, help="생산동 후보 격자 간격 (m)")
+    parser.add_argument('--building-spacing', type=float, default=BUILDING_SPACING, help="부속동 사이 간격 (m)")
+    parser.add_argument('--cache', default=os.environ.get(CACHE_ENV),
+                        help=f"탐색 결과를 보관할 디스크 캐시 디렉터리 (같은 입력을 다시 실행하면 캐시에서 읽음, 기본: 환경 변수 {CACHE_ENV})")
+    args = parser.parse_args(argv)
+
+    paths = list(iter_scenario_paths(args.scenarios))
+    iter_options = {'substation_mode': args.substation_mode, 'collision_backend': args.collision_backend,
+                    'production_candidates': args.production_candidates, 'guide_order': args.guide_order,
+                    'setback': args.setback, 'grid_size': args.grid_size, 'building_spacing': args.building_spacing}
+    tasks = [(path, args.top_k, iter_options, args.cache) for path in paths]
+
+    started = perf_counter()
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    executor = None
+    results = []
+    try:
+        if args.workers and args.workers > 1 and len(tasks) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=min(args.workers, len(tasks)))
+            result_iter = executor.map(_run_scenario_args, tasks)
+        else:
+            result_iter = map(_run_scenario_args, tasks)
+        # 끝난 순서가 아니라 입력 순서대로 기록
+        for result in result_iter:
+            results.append(result)
+            status = result['error'] if 'error' in result else f"{result['layout_count']}개 배치"
+            print(f"[{len(results)}/{len(tasks)}] {result['name']}: {status} ({result['elapsed']:.1f}s)", file=sys.stderr)
+            if output is not None:
+                output.write(json.dumps(result, ensure_ascii=False, default=_json_default) + '\n')
+                output.flush()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if output is not None:
+            output.close()
+
+    summary = summarize(results)
+    summary['wall_time'] = perf_counter() - started
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 1 if summary['errors'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
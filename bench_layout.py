@@ -0,0 +1,137 @@
+# bench_layout.py: 배치 탐색 전체 실행 시간, 생산동 후보 단계, 이격거리 검사 커널(스칼라 루프 / 배열 연산) 비용 측정
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import timeit
+from typing import Dict, List, Optional
+
+# 직사각형 부지 시나리오 (나머지 값은 DEFAULT_VALUES)
+SCENARIOS = {
+    'default': {'setback': 15},
+    'large': {'site_size': (1200, 900), 'gates': [(600, 0), (0, 400)]}
+}
+
+# 자식 프로세스에서 실행할 코드 (repeat 번 실행한 최소 시간, 레이아웃 수를 JSON 으로 출력)
+_CHILD = """
+import json, sys
+from time import perf_counter
+import layout
+from config import DEFAULT_VALUES
+from scenario import normalize_scenario, create_buildings
+values, grid_size, repeat, options = json.loads(sys.argv[1])
+setback = values.pop('setback', None)
+if setback is not None:
+    options['setback'] = setback
+buildings = create_buildings(normalize_scenario(dict(DEFAULT_VALUES, **values)))
+best = None
+for _ in range(repeat):
+    started = perf_counter()
+    layouts, failure_reasons = layout.generate_all_layouts(buildings, grid_size=grid_size, **options)
+    elapsed = perf_counter() - started
+    best = elapsed if best is None else min(best, elapsed)
+print(json.dumps({'seconds': best, 'layouts': len(layouts)}))
+"""
+
+def measure_layouts(tree: str, values: Dict, grid_size: float, repeat: int, options: Dict) -> Dict:
+    """tree 디렉터리의 배치 엔진을 새 프로세스에서 repeat 번 실행한 최소 시간과 레이아웃 수"""
+    output = subprocess.run([sys.executable, '-c', _CHILD, json.dumps([values, grid_size, repeat, options])],
+                            cwd=tree, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure_kernel(pairs: List[tuple], number: int = 2000) -> List[Dict]:
+    """후보 N개 x 배치 건물 M개 검사 한 번의 비용 (배열 연산 / 스칼라 루프, 모든 후보가 통과하는 최악의 경우)"""
+    import numpy as np
+    from utils import check_setback_distance_batch, is_rect_clear
+    rng = np.random.default_rng(0)
+    results = []
+    for candidate_count, placed_count in pairs:
+        candidates = rng.uniform(0, 1000, (candidate_count, 4))
+        placed = rng.uniform(2000, 3000, (placed_count, 4))
+        candidate_list, placed_list = candidates.tolist(), placed.tolist()
+        # 배열 연산 경로를 직접 재기 위해 충돌 인덱스도 묻는다 (작은 입력도 스칼라 루프로 넘어가지 않음)
+        batch = min(timeit.repeat(lambda: check_setback_distance_batch(candidates, placed, 15, True),
+                                  number=number, repeat=3)) / number
+        scalar = min(timeit.repeat(lambda: [is_rect_clear(rect, placed_list, 15) for rect in candidate_list],
+                                   number=number, repeat=3)) / number
+        results.append({'candidates': candidate_count, 'placed': placed_count,
+                        'batch_us': batch * 1e6, 'scalar_us': scalar * 1e6})
+    return results
+
+def measure_production(grid_sizes: List[float], repeat: int = 3) -> List[Dict]:
+    """생산동 후보 단계(주차장 이격거리 검사)만의 비용: 격자 일괄 검사 / 후보마다 주차장을 하나씩 검사하는 루프
+
+    'large' 시나리오의 가로 방향 생산동 기준 (이 단계 다음의 부속동/안내동/변전소 단계는 포함하지 않음)
+    """
+    import numpy as np
+    from config import DEFAULT_VALUES
+    from scenario import normalize_scenario, create_buildings
+    from layout import prepare_layout_run, new_failure_reasons, find_feasible_production_positions
+    from utils import check_setback_distance
+    buildings = create_buildings(normalize_scenario(dict(DEFAULT_VALUES, **SCENARIOS['large'])))
+    results = []
+    for grid_size in grid_sizes:
+        run = prepare_layout_run(buildings, grid_size=grid_size)
+        prod_w, prod_h = run['prod_orientations'][0][:2]
+        setback = run['setback']
+        max_prod_x = run['site_w'] - prod_w - setback
+        max_prod_y = run['site_h'] - prod_h - setback
+        parking_rects = run['parking_rects'].tolist()
+
+        def batch():
+            return find_feasible_production_positions(prod_w, prod_h, max_prod_x, max_prod_y, run['parking_index'],
+                                                      None, new_failure_reasons(), setback=setback,
+                                                      grid_size=grid_size)
+
+        def loop():
+            positions = []
+            for prod_x in np.arange(setback, max_prod_x + 1, grid_size):
+                for prod_y in np.arange(setback, max_prod_y + 1, grid_size):
+                    if all(check_setback_distance(prod_x, prod_y, prod_w, prod_h, *rect, setback)
+                           for rect in parking_rects):
+                        positions.append((prod_x, prod_y))
+            return positions
+
+        assert batch() == loop()
+        results.append({'grid_size': grid_size, 'candidates': len(np.arange(setback, max_prod_x + 1, grid_size)) *
+                        len(np.arange(setback, max_prod_y + 1, grid_size)),
+                        'batch_ms': min(timeit.repeat(batch, number=1, repeat=repeat)) * 1000,
+                        'loop_ms': min(timeit.repeat(loop, number=1, repeat=repeat)) * 1000})
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="배치 탐색 실행 시간 측정")
+    parser.add_argument('--grid-size', type=float, nargs='+', default=[30, 20], help="생산동 후보 격자 간격 목록 (m)")
+    parser.add_argument('-n', '--repeat', type=int, default=3, help="실행 횟수 (최소 시간 사용)")
+    parser.add_argument('--tree', nargs='+', help="비교할 배치 엔진 디렉터리 (scenario.py 가 있는 버전, 기본: 이 파일이 있는 디렉터리)")
+    parser.add_argument('--options', default='{}', help="generate_all_layouts 실행 옵션 JSON (예: '{\"workers\": 4}')")
+    parser.add_argument('--kernel', action='store_true', help="이격거리 검사 커널의 입력 크기별 비용만 측정")
+    parser.add_argument('--production', action='store_true', help="생산동 후보 단계의 격자 간격별 비용만 측정")
+    args = parser.parse_args(argv)
+
+    if args.production:
+        for result in measure_production(sorted(set(args.grid_size + [1, 2, 5, 10])), args.repeat):
+            print(f"grid {result['grid_size']:>5g}  후보 {result['candidates']:>7}개  "
+                  f"batch {result['batch_ms']:8.2f} ms  loop {result['loop_ms']:8.2f} ms")
+        return 0
+
+    if args.kernel:
+        pairs = [(1, 4), (1, 12), (8, 4), (4, 12), (16, 12), (32, 12), (64, 12), (256, 12)]
+        for result in measure_kernel(pairs):
+            print(f"N={result['candidates']:>4} M={result['placed']:>3} N*M={result['candidates'] * result['placed']:>5}  "
+                  f"batch {result['batch_us']:7.1f} us  scalar {result['scalar_us']:7.1f} us")
+        return 0
+
+    trees = args.tree or [os.path.dirname(os.path.abspath(__file__))]
+    options = json.loads(args.options)
+    for name, values in SCENARIOS.items():
+        for grid_size in args.grid_size:
+            for tree in trees:
+                result = measure_layouts(tree, values, grid_size, args.repeat, options)
+                print(f"{name:<8} grid {grid_size:>5g}  {result['seconds']:7.3f} s  {result['layouts']:>6}개 배치  {tree}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# bench_startup.py: 새 파이썬 프로세스에서 배치 엔진을 불러오고 실행하는 데 드는 시작 시간과 불러온 무거운 모듈 측정
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# 배치 엔진만 쓸 때 불러오지 않아야 하는 모듈 (GUI, 시각화, 다각형 기하)
+HEAVY_MODULES = ('PyQt5', 'plotly', 'shapely', 'yaml')
+
+# 직사각형 부지와 다각형 부지 시나리오 (나머지 값은 DEFAULT_VALUES)
+SCENARIOS = {
+    'rectangle': {},
+    'polygon': {'site_size': [(0, 0), (800, 0), (800, 450), (650, 600), (0, 600)]}
+}
+
+# 자식 프로세스에서 실행할 코드 (import 시간, 실행 시간, 불러온 무거운 모듈을 JSON 으로 출력)
+_CHILD = """
+import json, sys
+from time import perf_counter
+started = perf_counter()
+import layout, ranking, batch
+from scenario import normalize_scenario, create_buildings
+imported = perf_counter()
+values = json.loads(sys.argv[1])
+if values is not None:
+    buildings = create_buildings(normalize_scenario(values))
+    layout_count = sum(1 for _ in layout.iter_layouts(buildings))
+else:
+    layout_count = None
+finished = perf_counter()
+print(json.dumps({'import': imported - started, 'run': finished - imported, 'layouts': layout_count,
+                  'heavy': [name for name in json.loads(sys.argv[2]) if name in sys.modules]}))
+"""
+
+def measure(values, repeat: int) -> Dict:
+    """새 프로세스를 repeat 번 띄워 import/실행 시간의 중앙값과 불러온 무거운 모듈을 반환"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _CHILD, json.dumps(values), json.dumps(HEAVY_MODULES)],
+                                cwd=here, check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        'import_ms': statistics.median(run['import'] for run in runs) * 1000,
+        'run_ms': statistics.median(run['run'] for run in runs) * 1000,
+        'layouts': runs[-1]['layouts'],
+        'heavy': runs[-1]['heavy']
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="배치 엔진 시작 시간 측정")
+    parser.add_argument('-n', '--repeat', type=int, default=5, help="시나리오별 프로세스 실행 횟수")
+    args = parser.parse_args(argv)
+
+    cases = [('import only', None)] + list(SCENARIOS.items())
+    for name, values in cases:
+        result = measure(values, args.repeat)
+        layouts = '' if result['layouts'] is None else f"{result['layouts']:>5}개 배치"
+        heavy = ', '.join(result['heavy']) or '-'
+        print(f"{name:<12} import {result['import_ms']:7.1f} ms  run {result['run_ms']:7.1f} ms  "
+              f"{layouts:<10} 불러온 무거운 모듈: {heavy}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
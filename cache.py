@@ -0,0 +1,223 @@
+# cache.py: 같은 입력의 배치 탐색 결과를 디스크에 보관하는 내용 주소(content-addressed) 캐시
+
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import config
+from models import Building
+from layoutset import LayoutSet, generate_layout_set
+from ranking import DEFAULT_WEIGHTS, rank_top_k
+
+# 배치 결과가 달라지는 엔진 변경이 있으면 올린다 (소스 파일 해시도 키에 포함되지만 명시적인 무효화 수단)
+ENGINE_VERSION = 1
+# 배치 결과에 영향을 주는 엔진 모듈 (소스 내용이 바뀌면 기존 캐시 항목을 쓰지 않는다)
+ENGINE_MODULES = ('config', 'models', 'utils', 'spatial', 'occupancy', 'layout', 'layoutset')
+# 점수 상위 배치 목록에 추가로 영향을 주는 모듈
+RANKING_MODULES = ('ranking',)
+# 결과에 영향을 주는 iter_layouts 옵션과 기본값
+# (workers 는 결과가 같도록 보장되므로 키에서 제외, 'raster' 충돌 검사는 칸 경계가 아닌 좌표를 보수적으로 판단하므로 포함,
+#  이격거리/격자 간격/건물 간격 기본값은 설정 상수)
+KEY_OPTIONS = {'substation_mode': 'step', 'collision_backend': 'geometry', 'production_candidates': 'grid',
+               'guide_order': 'scan', 'setback': config.SETBACK, 'grid_size': config.GRID_SIZE,
+               'building_spacing': config.BUILDING_SPACING}
+
+# 이 환경 변수에 디렉터리를 지정하면 batch.py 가 --cache 를 주지 않아도 그 디렉터리의 캐시를 사용
+CACHE_ENV = 'LAYOUT_CACHE'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CACHE_SUFFIX = '.npz'
+
+def _canonical(value):
+    """입력 값을 JSON 으로 직렬화할 수 있는 정규형으로 변환 (숫자는 float, 튜플은 리스트, Building 은 사양)"""
+    if isinstance(value, Building):
+        return ['Building', value.name, float(value.width), float(value.height)]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (bool, np.bool_)) or value is None or isinstance(value, str):
+        return value.item() if isinstance(value, np.bool_) else value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    raise TypeError(f"캐시 키로 쓸 수 없는 값: {type(value).__name__}")
+
+@lru_cache(maxsize=None)
+def engine_digest(modules: Tuple[str, ...] = ENGINE_MODULES) -> str:
+    """ENGINE_VERSION 과 엔진 모듈(modules) 소스 내용의 해시"""
+    digest = hashlib.sha256(f"engine:{ENGINE_VERSION}".encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for module in modules:
+        with open(os.path.join(here, f"{module}.py"), 'rb') as source:
+            digest.update(module.encode() + b'\0' + source.read() + b'\0')
+    return digest.hexdigest()
+
+def cache_key(buildings: Dict, **iter_options) -> str:
+    """create_buildings 결과, 엔진 버전, 결과에 영향을 주는 옵션(설정 상수 기본값 포함)의 정규형 SHA-256 해시"""
+    options = {name: iter_options.get(name, default) for name, default in KEY_OPTIONS.items()}
+    payload = {
+        'engine': engine_digest(),
+        'options': options,
+        'buildings': buildings
+    }
+    text = json.dumps(_canonical(payload), sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def ranking_key(key: str, k: int, weights: Optional[Dict[str, float]] = None) -> str:
+    """배치 키 key 의 점수 상위 k개 목록 키 (점수 계산 모듈 소스와 가중치 포함)"""
+    payload = {
+        'layouts': key,
+        'ranking': engine_digest(RANKING_MODULES),
+        'k': k,
+        'weights': DEFAULT_WEIGHTS if weights is None else weights
+    }
+    text = json.dumps(_canonical(payload), sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class LayoutCache:
+    """키별로 LayoutSet 구조 배열과 메타데이터(JSON)를 .npz 파일 하나로 저장 (점수 상위 목록은 ranking_key 로 따로 저장)
+
+    읽을 때 파일 수정 시각을 갱신하고, 저장 후 전체 크기가 max_bytes 를 넘으면
+    가장 오래 쓰이지 않은 파일부터 지운다 (LRU). 파일은 임시 파일에 쓴 뒤 교체하므로
+    여러 프로세스가 같은 디렉터리를 함께 써도 반쯤 쓰인 파일을 읽지 않는다.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key: str) -> Optional[Tuple[LayoutSet, Dict[str, int]]]:
+        """저장된 (LayoutSet, failure_reasons), 없거나 읽을 수 없으면 None"""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                rows = stored['rows']
+                meta = json.loads(stored['meta'].tobytes().decode('utf-8'))
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            return None
+        if meta.get('key') != key:
+            return None
+        layout_set = LayoutSet(rows, meta['annex_names'], meta['guide_names'],
+                               {name: tuple(position) for name, position in meta['parking'].items()},
+                               [tuple(gate) for gate in meta['gates']])
+        return layout_set, meta['failure_reasons']
+
+    def put(self, key: str, layout_set: LayoutSet, failure_reasons: Dict[str, int]):
+        meta = {'key': key, 'annex_names': layout_set.annex_names, 'guide_names': layout_set.guide_names,
+                'parking': layout_set.parking, 'gates': layout_set.gates, 'failure_reasons': failure_reasons}
+        self._write(key, rows=layout_set.rows, meta=self._meta_bytes(meta))
+
+    def get_ranking(self, key: str) -> Optional[List[Tuple[int, float]]]:
+        """ranking_key 로 저장된 점수 상위 목록 [(layout id, 점수), ...], 없거나 읽을 수 없으면 None"""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                ids, scores = stored['ids'], stored['scores']
+                meta = json.loads(stored['meta'].tobytes().decode('utf-8'))
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            return None
+        if meta.get('key') != key:
+            return None
+        return [(int(layout_id), float(score)) for layout_id, score in zip(ids, scores)]
+
+    def put_ranking(self, key: str, ranking: List[Tuple[int, float]]):
+        ids = np.array([layout_id for layout_id, _ in ranking], dtype=np.int64)
+        scores = np.array([score for _, score in ranking], dtype=np.float64)
+        self._write(key, ids=ids, scores=scores, meta=self._meta_bytes({'key': key}))
+
+    @staticmethod
+    def _meta_bytes(meta: Dict) -> np.ndarray:
+        return np.frombuffer(json.dumps(meta, ensure_ascii=False).encode('utf-8'), dtype=np.uint8)
+
+    def _write(self, key: str, **arrays):
+        handle, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                np.savez(temp_file, **arrays)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 가장 오래 쓰이지 않은 항목 삭제"""
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(CACHE_SUFFIX):
+                continue
+            try:
+                status = os.stat(os.path.join(self.directory, file_name))
+            except FileNotFoundError:  # 다른 프로세스가 먼저 지운 경우
+                continue
+            entries.append((status.st_mtime, status.st_size, file_name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, file_name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, file_name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(CACHE_SUFFIX):
+                os.remove(os.path.join(self.directory, file_name))
+
+def cached_layout_set(buildings: Dict, cache: Optional[LayoutCache] = None,
+                      **iter_options) -> Tuple[LayoutSet, Dict[str, int]]:
+    """generate_layout_set 과 같은 결과를 캐시에서 찾고, 없으면 탐색하여 저장 후 반환
+
+    iter_options 는 iter_layouts 에 그대로 전달된다. limit/predicate 를 주면 결과가 전체 탐색이 아니므로 캐시를 쓰지 않는다.
+    stats 를 전달하면 'cache' 단계에 조회 1건과 적중 여부(out)를 기록한다 (적중하면 탐색 단계 통계는 없다).
+    """
+    if cache is None or iter_options.get('limit') is not None or iter_options.get('predicate') is not None:
+        return generate_layout_set(buildings, **iter_options)
+    stats = iter_options.get('stats')
+    failure_reasons = iter_options.pop('failure_reasons', None)
+    started = perf_counter()
+    key = cache_key(buildings, **iter_options)
+    cached = cache.get(key)
+    if stats is not None:
+        stats.record('cache', 1, int(cached is not None), perf_counter() - started)
+    if cached is not None:
+        layout_set, found_failures = cached
+    else:
+        layout_set, found_failures = generate_layout_set(buildings, **iter_options)
+        cache.put(key, layout_set, found_failures)
+    if failure_reasons is None:
+        return layout_set, found_failures
+    for reason, count in found_failures.items():
+        failure_reasons[reason] = failure_reasons.get(reason, 0) + count
+    return layout_set, failure_reasons
+
+def cached_top_k(layout_set: LayoutSet, buildings: Dict, k: int, cache: Optional[LayoutCache] = None,
+                 weights: Optional[Dict[str, float]] = None, **iter_options) -> List[Dict]:
+    """rank_top_k(layout_set, ...) 와 같은 결과를, 같은 배치 키/k/가중치의 이전 순위가 캐시에 있으면 점수 계산 없이 반환
+
+    layout_set 은 같은 buildings, iter_options 로 cached_layout_set 이 반환한 결과여야 한다.
+    캐시에는 상위 k개의 (layout id, 점수) 만 저장하고, 배치 내용은 layout_set 에서 다시 읽는다.
+    """
+    setback = iter_options.get('setback', config.SETBACK)
+    if cache is None or k <= 0 or iter_options.get('limit') is not None or iter_options.get('predicate') is not None:
+        return rank_top_k(layout_set, buildings, k, weights, setback)
+    key = ranking_key(cache_key(buildings, **iter_options), k, weights)
+    ranking = cache.get_ranking(key)
+    if ranking is None:
+        ranked = rank_top_k(layout_set, buildings, k, weights, setback)
+        cache.put_ranking(key, [(layout['id'], layout['score']) for layout in ranked])
+        return ranked
+    rows = {int(layout_id): index for index, layout_id in enumerate(layout_set['id'])}
+    return [dict(layout_set[rows[layout_id]], score=score) for layout_id, score in ranking]
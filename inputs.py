@@ -2,14 +2,14 @@
 
 import sys
 from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QLineEdit, QComboBox, QCheckBox, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QGroupBox, QFormLayout, QMessageBox
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from config import DEFAULT_VALUES
-from models import Building
-from utils import calculate_parking_area, calculate_parking_dimensions, get_main_gate
+from scenario import create_buildings  # GUI 없이 쓰는 건물 생성 함수 (기존 import 경로 유지)
 from shapely.geometry import Polygon  # 다각형 검사용
 
 class InputWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, initial: Optional[Dict] = None):
+        """initial: 입력란에 미리 채울 값 (다시 생성할 때의 이전 입력, None 이면 기본값 사용)"""
         super().__init__()
         self.setWindowTitle("공장 단지 배치도 생성 프로그램")
         self.setGeometry(300, 300, 600, 800)
@@ -115,9 +115,10 @@ class InputWindow(QMainWindow):
         submit_btn.clicked.connect(self.submit)
         self.layout.addWidget(submit_btn)
 
-        self.fill_default_values()
-        self.toggle_inputs()
         self.update_site_inputs(0)  # 초기 직사각형 입력
+        self.fill_values(DEFAULT_VALUES if initial is None else initial)
+        self.use_default_checkbox.setChecked(initial is None)
+        self.toggle_inputs()
 
     def update_site_inputs(self, index):
         shape = self.site_shape_combo.currentText()
@@ -177,35 +178,44 @@ class InputWindow(QMainWindow):
             self.gate_coords_layout.addRow(f"출입구 {i+1} (X/Y):", hbox)
             self.gate_coord_edits.append((x_edit, y_edit))
 
-    def fill_default_values(self):
-        self.site_shape_combo.setCurrentText("직사각형")
-        self.update_site_inputs(0)
-        self.site_width_edit.setText(str(DEFAULT_VALUES['site_size'][0]))
-        self.site_height_edit.setText(str(DEFAULT_VALUES['site_size'][1]))
+    def fill_values(self, values: Dict):
+        """입력란을 values(DEFAULT_VALUES 형식) 로 채움 (다각형 부지는 꼭짓점 수로 부지 형태 선택)"""
+        site_size = values['site_size']
+        if isinstance(site_size, list):
+            self.site_shape_combo.setCurrentText("오각형" if len(site_size) == 5 else "육각형")
+            self.update_site_inputs(self.site_shape_combo.currentIndex())
+            for (x_edit, y_edit), (x, y) in zip(self.site_polygon_edits, site_size):
+                x_edit.setText(str(x))
+                y_edit.setText(str(y))
+        else:
+            self.site_shape_combo.setCurrentText("직사각형")
+            self.update_site_inputs(0)
+            self.site_width_edit.setText(str(site_size[0]))
+            self.site_height_edit.setText(str(site_size[1]))
 
-        self.prod_width_edit.setText(str(DEFAULT_VALUES['prod_size'][0]))
-        self.prod_height_edit.setText(str(DEFAULT_VALUES['prod_size'][1]))
+        self.prod_width_edit.setText(str(values['prod_size'][0]))
+        self.prod_height_edit.setText(str(values['prod_size'][1]))
 
         for name in self.annex_names:
-            self.annex_width_edits[name].setText(str(DEFAULT_VALUES['annex_sizes'][name][0]))
-            self.annex_height_edits[name].setText(str(DEFAULT_VALUES['annex_sizes'][name][1]))
+            self.annex_width_edits[name].setText(str(values['annex_sizes'][name][0]))
+            self.annex_height_edits[name].setText(str(values['annex_sizes'][name][1]))
 
-        self.gate_count_combo.setCurrentText(str(DEFAULT_VALUES['gate_count']))
+        self.gate_count_combo.setCurrentText(str(len(values['gates'])))
         self.update_gate_coords()
 
-        for i, (x, y) in enumerate(DEFAULT_VALUES['gates']):
+        for i, (x, y) in enumerate(values['gates']):
             if i < len(self.gate_coord_edits):
                 self.gate_coord_edits[i][0].setText(str(x))
                 self.gate_coord_edits[i][1].setText(str(y))
 
-        self.main_guide_width_edit.setText(str(DEFAULT_VALUES['main_guide_size'][0]))
-        self.main_guide_height_edit.setText(str(DEFAULT_VALUES['main_guide_size'][1]))
-        self.other_guide_width_edit.setText(str(DEFAULT_VALUES['other_guide_size'][0]))
-        self.other_guide_height_edit.setText(str(DEFAULT_VALUES['other_guide_size'][1]))
+        self.main_guide_width_edit.setText(str(values['main_guide_size'][0]))
+        self.main_guide_height_edit.setText(str(values['main_guide_size'][1]))
+        self.other_guide_width_edit.setText(str(values['other_guide_size'][0]))
+        self.other_guide_height_edit.setText(str(values['other_guide_size'][1]))
 
-        self.substation_width_edit.setText(str(DEFAULT_VALUES['substation_size'][0]))
-        self.substation_height_edit.setText(str(DEFAULT_VALUES['substation_size'][1]))
-        self.parking_count_edit.setText(str(DEFAULT_VALUES['parking_count']))
+        self.substation_width_edit.setText(str(values['substation_size'][0]))
+        self.substation_height_edit.setText(str(values['substation_size'][1]))
+        self.parking_count_edit.setText(str(values['parking_count']))
 
     def validate(self):
         try:
@@ -299,56 +309,18 @@ class InputWindow(QMainWindow):
             }
         self.close()
 
-def get_user_inputs() -> Dict:
-    app = QApplication(sys.argv)
-    window = InputWindow()
+def get_user_inputs(initial: Optional[Dict] = None) -> Dict:
+    """입력 창을 띄워 입력 값을 받음 (initial: 미리 채울 이전 입력, 취소하면 initial 또는 기본값)"""
+    # 다시 생성할 때는 이미 만든 QApplication 을 재사용 (프로세스마다 하나만 만들 수 있음)
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = InputWindow(initial)
     window.show()
     app.exec_()
     if hasattr(window, 'result') and window.result:
         return window.result
+    elif initial is not None:
+        print("입력 취소됨. 이전 값 사용.")
+        return initial
     else:
         print("입력 취소됨. 기본값 사용.")
         return DEFAULT_VALUES
-
-def create_buildings(inputs: Dict) -> Dict:
-    site_size = inputs['site_size']
-    if isinstance(site_size, list):  # 다각형
-        site_polygon = Polygon(site_size)
-        site_w = site_polygon.bounds[2] - site_polygon.bounds[0]  # 대략적 너비
-        site_h = site_polygon.bounds[3] - site_polygon.bounds[1]  # 대략적 높이
-    else:  # 직사각형
-        site_w, site_h = site_size
-
-    prod_w, prod_h = inputs['prod_size']
-    
-    prod_building = Building('Production', prod_w, prod_h)
-    
-    annex_buildings = [Building(name, width, height) 
-                       for name, (width, height) in inputs['annex_sizes'].items()]
-    
-    main_gate = get_main_gate(inputs['gates'])
-    guide_buildings = [Building('안내동1', inputs['main_guide_size'][0], inputs['main_guide_size'][1])]
-    
-    guide_counter = 2
-    for gate_pos in inputs['gates']:
-        if gate_pos != main_gate:
-            guide_buildings.append(Building(f'안내동{guide_counter}',
-                                            inputs['other_guide_size'][0], 
-                                            inputs['other_guide_size'][1]))
-            guide_counter += 1
-    
-    substation = Building('Substation', inputs['substation_size'][0], inputs['substation_size'][1])
-    
-    total_area, breakdown = calculate_parking_area(inputs['parking_count'])
-    parking_width, parking_length = calculate_parking_dimensions(total_area)
-    parking_buildings = [Building(f'Parking_{i+1}', parking_width, parking_length) for i in range(2)]
-    
-    return {
-        'site_size': site_size,  # 다각형 지원
-        'site_shape': inputs.get('site_shape', '직사각형'),
-        'prod_building': prod_building,
-        'annex_buildings': annex_buildings,
-        'guide_buildings': guide_buildings,
-        'gates': inputs['gates'], 'substation': substation,
-        'parking_buildings': parking_buildings, 'parking_info': breakdown
-    }
@@ -1,71 +1,89 @@
 # layout.py: 배치 생성 로직
 
 import numpy as np
-from typing import List, Dict, Optional, Tuple
+from collections import deque
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Dict, Generator, Iterator, List, Optional, Tuple
 from config import SETBACK, GRID_SIZE, BUILDING_SPACING
-from models import Building
-from utils import (get_annex_group_center, get_main_gate, get_sides_without_gates, is_valid_substation_position, manhattan_distance, check_setback_distance, 
-                   get_production_short_edge_centers, distance, is_building_inside_polygon)
-from shapely.geometry import Polygon, Point  # 추가: 다각형 처리용 및 Point
+from models import Building, Placement
+from spatial import SpatialIndex, PreparedPolygon, prepare_polygon
+from occupancy import OccupancyGrid, CheckedOccupancy
+from stats import LayoutStats
+from profiling import traced
+from utils import (get_annex_group_center, get_main_gate, get_sides_without_gates, manhattan_distance,
+                   check_setback_distance_batch, is_rect_clear, building_rects, get_production_short_edge_centers,
+                   distance, get_main_guide_size, SETBACK_BATCH_MIN_PAIRS)
 
-def arrange_annex_buildings_user_specified_order(annex_buildings: List[Building], side: str, 
-                                                 prod_x: float, prod_y: float, prod_w: float, prod_h: float,
-                                                 orientation: str, gates: List[Tuple[float, float]]) -> Tuple[Dict, float, float]:
-    """사용자 지정: 고정 순서 배치 (electrode->formation 방향)"""
-    main_gate = get_main_gate(gates)
-    buildings_dict = {building.name: building for building in annex_buildings}
-    
-    # 사용자 지정 고정 순서
-    user_specified_order = ['SRP Control', '위험물보관장', 'CESS Control', 'UT', '신뢰성시험동', '폐기물보관장']
-    
-    is_horizontal_layout = orientation == "horizontal"
-    
-    if is_horizontal_layout:
-        total_length = sum(building.width for building in annex_buildings) + BUILDING_SPACING * (len(annex_buildings) - 1)
+if TYPE_CHECKING:
+    from shapely.geometry import Polygon  # shapely 는 다각형 부지를 처리할 때만 불러온다
+
+# 사용자 지정 고정 순서 (Admin동과 오/폐수처리장은 양 끝에 별도 배치)
+USER_SPECIFIED_ANNEX_ORDER = ['SRP Control', '위험물보관장', 'CESS Control', 'UT', '신뢰성시험동', '폐기물보관장']
+
+def get_annex_group_dimensions(annex_buildings: List[Building], orientation: str,
+                               spacing: float = BUILDING_SPACING) -> Tuple[float, float]:
+    """부속동 그룹의 (배치 방향 총 길이, 깊이) - spacing: 부속동 사이 간격"""
+    if orientation == "horizontal":
+        total_length = sum(building.width for building in annex_buildings) + spacing * (len(annex_buildings) - 1)
         max_depth = max(building.height for building in annex_buildings)
     else:
-        total_length = sum(building.height for building in annex_buildings) + BUILDING_SPACING * (len(annex_buildings) - 1)
+        total_length = sum(building.height for building in annex_buildings) + spacing * (len(annex_buildings) - 1)
         max_depth = max(building.width for building in annex_buildings)
+    return total_length, max_depth
+
+def is_admin_at_group_start(side: str, prod_x: float, prod_y: float, prod_w: float, prod_h: float,
+                            orientation: str, main_gate: Tuple[float, float],
+                            total_length: float, max_depth: float, setback: float = SETBACK) -> bool:
+    """Admin동을 부속동 그룹 시작 부분에 둘지 여부 (그룹 양 끝 중 Main 출입구에 가까운 쪽)"""
+    is_horizontal_layout = orientation == "horizontal"
     
     # 가상 group_x, group_y 계산 (절대 좌표 기반 거리 비교용)
     if side == 'left':
-        virtual_group_x = prod_x - total_length - SETBACK if is_horizontal_layout else prod_x - max_depth - SETBACK
+        virtual_group_x = prod_x - total_length - setback if is_horizontal_layout else prod_x - max_depth - setback
         virtual_group_y = prod_y + prod_h/2 - max_depth/2 if is_horizontal_layout else prod_y + prod_h/2 - total_length/2
     elif side == 'right':
-        virtual_group_x = prod_x + prod_w + SETBACK
+        virtual_group_x = prod_x + prod_w + setback
         virtual_group_y = prod_y + prod_h/2 - max_depth/2 if is_horizontal_layout else prod_y + prod_h/2 - total_length/2
     elif side == 'top':
         virtual_group_x = prod_x + prod_w/2 - total_length/2 if is_horizontal_layout else prod_x + prod_w/2 - max_depth/2
-        virtual_group_y = prod_y + prod_h + SETBACK
+        virtual_group_y = prod_y + prod_h + setback
     else:  # bottom
         virtual_group_x = prod_x + prod_w/2 - total_length/2 if is_horizontal_layout else prod_x + prod_w/2 - max_depth/2
-        virtual_group_y = prod_y - max_depth - SETBACK if is_horizontal_layout else prod_y - total_length - SETBACK
+        virtual_group_y = prod_y - max_depth - setback if is_horizontal_layout else prod_y - total_length - setback
+    
+    abs_start_pos = (virtual_group_x, virtual_group_y)
+    abs_end_pos = (virtual_group_x + total_length, virtual_group_y) if is_horizontal_layout else (virtual_group_x, virtual_group_y + total_length)
+    return manhattan_distance(abs_start_pos, main_gate) <= manhattan_distance(abs_end_pos, main_gate)
+
+def arrange_annex_buildings_relative(annex_buildings: List[Building], orientation: str,
+                                     admin_at_start: bool, spacing: float = BUILDING_SPACING) -> Tuple[Dict, float, float]:
+    """Admin동 위치(시작/끝)가 정해졌을 때의 부속동 상대 배치 (생산동 위치와 무관)"""
+    buildings_dict = {building.name: building for building in annex_buildings}
+    is_horizontal_layout = orientation == "horizontal"
+    total_length, max_depth = get_annex_group_dimensions(annex_buildings, orientation, spacing)
     
     # 사용자 지정 순서로 배치
     positions = {}
     cursor = 0
     
-    for building_name in user_specified_order:
+    for building_name in USER_SPECIFIED_ANNEX_ORDER:
         if building_name in buildings_dict:
             building = buildings_dict[building_name]
             positions[building_name] = (cursor, 0) if is_horizontal_layout else (0, cursor)
-            cursor += (building.width if is_horizontal_layout else building.height) + BUILDING_SPACING
+            cursor += (building.width if is_horizontal_layout else building.height) + spacing
     
     # Admin동과 오/폐수처리장 특별 배치
     for special_name in ['Admin', '오/폐수처리장']:
         if special_name in buildings_dict:
             building = buildings_dict[special_name]
-            abs_start_pos = (virtual_group_x, virtual_group_y)
-            abs_end_pos = (virtual_group_x + total_length, virtual_group_y) if is_horizontal_layout else (virtual_group_x, virtual_group_y + total_length)
-            
             start_pos = (0, 0)
             end_pos = (cursor, 0) if is_horizontal_layout else (0, cursor)
             
             if special_name == 'Admin':
                 # Main 출입구와의 거리 기준으로 배치
-                if manhattan_distance(abs_start_pos, main_gate) <= manhattan_distance(abs_end_pos, main_gate):
+                if admin_at_start:
                     # 시작 부분에 배치 - 다른 건물들을 뒤로 밀기
-                    shift = (building.width if is_horizontal_layout else building.height) + BUILDING_SPACING
+                    shift = (building.width if is_horizontal_layout else building.height) + spacing
                     new_positions = {}
                     for name, pos in positions.items():
                         new_positions[name] = (pos[0] + shift, pos[1]) if is_horizontal_layout else (pos[0], pos[1] + shift)
@@ -74,7 +92,7 @@ def arrange_annex_buildings_user_specified_order(annex_buildings: List[Building]
                     cursor += shift
                 else:
                     positions[special_name] = end_pos
-                    cursor += (building.width if is_horizontal_layout else building.height) + BUILDING_SPACING
+                    cursor += (building.width if is_horizontal_layout else building.height) + spacing
             else:  # '오/폐수처리장'
                 if 'Admin' in positions:
                     admin_pos = positions['Admin']
@@ -83,7 +101,7 @@ def arrange_annex_buildings_user_specified_order(annex_buildings: List[Building]
                         positions[special_name] = (cursor, 0) if is_horizontal_layout else (0, cursor)
                     else:
                         # Admin이 끝에 있으면 오/폐수처리장은 맨 시작에
-                        shift = (building.width if is_horizontal_layout else building.height) + BUILDING_SPACING
+                        shift = (building.width if is_horizontal_layout else building.height) + spacing
                         new_positions = {}
                         for name, pos in positions.items():
                             new_positions[name] = (pos[0] + shift, pos[1]) if is_horizontal_layout else (pos[0], pos[1] + shift)
@@ -94,445 +112,1291 @@ def arrange_annex_buildings_user_specified_order(annex_buildings: List[Building]
     
     return positions, total_length if is_horizontal_layout else max_depth, max_depth if is_horizontal_layout else total_length
 
+def arrange_annex_buildings_user_specified_order(annex_buildings: List[Building], side: str, 
+                                                 prod_x: float, prod_y: float, prod_w: float, prod_h: float,
+                                                 orientation: str, gates: List[Tuple[float, float]],
+                                                 setback: float = SETBACK,
+                                                 spacing: float = BUILDING_SPACING) -> Tuple[Dict, float, float]:
+    """사용자 지정: 고정 순서 배치 (electrode->formation 방향)"""
+    total_length, max_depth = get_annex_group_dimensions(annex_buildings, orientation, spacing)
+    admin_at_start = is_admin_at_group_start(side, prod_x, prod_y, prod_w, prod_h, orientation,
+                                             get_main_gate(gates), total_length, max_depth, setback)
+    return arrange_annex_buildings_relative(annex_buildings, orientation, admin_at_start, spacing)
+
+class AnnexArrangementCache:
+    """생산동 방향과 Admin동 위치(시작/끝)별 부속동 상대 배치를 실행마다 한 번만 계산해 재사용
+
+    생산동 위치마다 달라지는 것은 Admin동이 그룹의 어느 끝에 오는지 뿐이므로,
+    arrange() 는 그 판정만 하고 미리 계산한 배치를 돌려준다 (반환 dict 는 공유되므로 수정하지 말 것).
+    """
+
+    def __init__(self, annex_buildings: List[Building], gates: List[Tuple[float, float]],
+                 setback: float = SETBACK, spacing: float = BUILDING_SPACING):
+        self.main_gate = get_main_gate(gates)
+        self.setback = setback
+        self.dimensions = {}
+        self.arrangements = {}
+        for orientation in ("horizontal", "vertical"):
+            self.dimensions[orientation] = get_annex_group_dimensions(annex_buildings, orientation, spacing)
+            for admin_at_start in (True, False):
+                self.arrangements[orientation, admin_at_start] = arrange_annex_buildings_relative(
+                    annex_buildings, orientation, admin_at_start, spacing)
+
+    def arrange(self, side: str, prod_x: float, prod_y: float, prod_w: float, prod_h: float,
+                orientation: str) -> Tuple[Dict, float, float]:
+        """arrange_annex_buildings_user_specified_order 와 같은 결과를 반환"""
+        total_length, max_depth = self.dimensions[orientation]
+        admin_at_start = is_admin_at_group_start(side, prod_x, prod_y, prod_w, prod_h, orientation,
+                                                 self.main_gate, total_length, max_depth, self.setback)
+        return self.arrangements[orientation, admin_at_start]
+
 def place_parking_lots(main_gate: Tuple[float, float], parking_buildings: List[Building], 
-                       site_w: float, site_h: float) -> Dict[str, Tuple[float, float]]:
+                       site_w: float, site_h: float, setback: float = SETBACK) -> Dict[str, Tuple[float, float]]:
     """Main 출입구에서 대지를 바라봤을 때 앞쪽에 주차장 2개를 세로로 좌우 배치"""
     gate_x, gate_y = main_gate
     parking_1, parking_2 = parking_buildings
     
-    parking_x = max(SETBACK, min(gate_x + SETBACK, site_w - SETBACK - max(parking_1.width, parking_2.width)))
+    parking_x = max(setback, min(gate_x + setback, site_w - setback - max(parking_1.width, parking_2.width)))
     
-    left_y = gate_y + SETBACK
-    right_y = gate_y - SETBACK - parking_2.height
+    left_y = gate_y + setback
+    right_y = gate_y - setback - parking_2.height
     
-    if left_y < SETBACK:
-        offset = SETBACK - left_y
+    if left_y < setback:
+        offset = setback - left_y
         left_y += offset
         right_y += offset
     
-    if right_y + parking_2.height > site_h - SETBACK:
-        offset = (right_y + parking_2.height) - (site_h - SETBACK)
+    if right_y + parking_2.height > site_h - setback:
+        offset = (right_y + parking_2.height) - (site_h - setback)
         left_y -= offset
         right_y -= offset
         
-        if left_y < SETBACK:
-            left_y = SETBACK
-            right_y = left_y + parking_1.height + SETBACK
+        if left_y < setback:
+            left_y = setback
+            right_y = left_y + parking_1.height + setback
     
     return {'Parking_1': (parking_x, left_y), 'Parking_2': (parking_x, right_y)}
 
+def layout_placements(layout: Dict, buildings: Dict) -> List[Placement]:
+    """레이아웃에 배치된 모든 건물 (생산동, 부속동, 변전소, 안내동, 주차장 순)"""
+    prod = layout['production']
+    prod_building = buildings['prod_building']
+    if (prod['width'], prod['height']) != (prod_building.width, prod_building.height):
+        prod_building = prod_building.rotated()
+    placements = [Placement(prod_building, prod['x'], prod['y'])]
+    
+    annex_positions = layout['annex_group']['positions']
+    placements.extend(Placement(building, *annex_positions[building.name]) for building in buildings['annex_buildings'])
+    sub = layout['substation']
+    placements.append(Placement(buildings['substation'], sub['x'], sub['y']))
+    guides = layout['guides']
+    placements.extend(Placement(building, *guides[building.name]) for building in buildings['guide_buildings'])
+    parking = layout['parking']
+    placements.extend(Placement(building, *parking[building.name]) for building in buildings['parking_buildings'])
+    return placements
+
 def get_buildings_positions_sizes(layout: Dict, buildings: Dict) -> Tuple[List[Tuple[float, float]], List[Tuple[float, float]]]:
-    positions = []
-    sizes = []
+    placements = layout_placements(layout, buildings)
+    positions = [(placement.x, placement.y) for placement in placements]
+    sizes = [(placement.building.width, placement.building.height) for placement in placements]
+    return positions, sizes
 
-    # 생산동
-    prod = layout['production']
-    positions.append((prod['x'], prod['y']))
-    sizes.append((prod['width'], prod['height']))
+def find_feasible_production_positions(prod_w: float, prod_h: float, max_prod_x: float, max_prod_y: float,
+                                       parking_index, site_polygon,
+                                       failure_reasons: Dict[str, int],
+                                       axes: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                                       stats: Optional[LayoutStats] = None,
+                                       setback: float = SETBACK, grid_size: float = GRID_SIZE) -> List[Tuple[float, float]]:
+    """생산동 후보 격자 전체를 한 번에 만들어 주차장/부지 조건을 일괄 검사하고 통과한 위치만 반환
 
-    # 부속동들
-    annex_positions = layout['annex_group']['positions']
-    for building in buildings['annex_buildings']:
-        pos = annex_positions[building.name]
-        positions.append(pos)
-        sizes.append((building.width, building.height))
+    parking_index: 주차장이 등록된 충돌 검사 인덱스 (SpatialIndex 또는 OccupancyGrid)
+    site_polygon: 부지 폴리곤 (Polygon 또는 PreparedPolygon, 직사각형 부지는 None)
+    axes: 후보 prod_x, prod_y 좌표 배열 (없으면 setback 부터 grid_size 간격)
+    stats: 전달하면 단계별 통계를 누적 (filter_feasible_production_points 참고)
+    """
+    if axes is None:
+        axes = (np.arange(setback, max_prod_x + 1, grid_size), np.arange(setback, max_prod_y + 1, grid_size))
+    # (prod_x, prod_y) 후보 격자 - 기존 이중 루프와 같은 순서(prod_x 바깥, prod_y 안쪽)
+    grid_x, grid_y = np.meshgrid(*axes, indexing='ij')
+    return filter_feasible_production_points(prod_w, prod_h, grid_x.ravel(), grid_y.ravel(),
+                                             parking_index, site_polygon, failure_reasons, stats)
 
-    # 변전소
-    sub = layout['substation']
-    positions.append((sub['x'], sub['y']))
-    sizes.append((buildings['substation'].width, buildings['substation'].height))
+def filter_feasible_production_points(prod_w: float, prod_h: float, cand_x: np.ndarray, cand_y: np.ndarray,
+                                      parking_index, site_polygon,
+                                      failure_reasons: Dict[str, int],
+                                      stats: Optional[LayoutStats] = None) -> List[Tuple[float, float]]:
+    """생산동 후보 위치 (cand_x, cand_y) 중 주차장/부지 조건을 통과한 위치만 입력 순서대로 반환
 
-    # 안내동들
-    for building in buildings['guide_buildings']:
-        pos = layout['guides'][building.name]
-        positions.append(pos)
-        sizes.append((building.width, building.height))
+    stats: 전달하면 'production_parking', 'production_polygon' 단계 통계를 누적
+    """
+    started = perf_counter()
+    cand_x = np.asarray(cand_x)
+    cand_y = np.asarray(cand_y)
+    
+    # 주차장과의 이격거리 검사 (후보 전체 x 주차장 전체)
+    candidates = np.column_stack([cand_x, cand_y, np.full(cand_x.shape, prod_w), np.full(cand_x.shape, prod_h)])
+    valid = parking_index.clear_mask(candidates)
+    clear_count = int(np.count_nonzero(valid))
+    failure_reasons['collision'] += len(valid) - clear_count
+    if stats is not None:
+        stats.record('production_parking', len(valid), clear_count, perf_counter() - started,
+                     collision=len(valid) - clear_count)
     
-    # 주차장들
-    for building in buildings['parking_buildings']:
-        pos = layout['parking'][building.name]
-        positions.append(pos)
-        sizes.append((building.width, building.height))
+    # 생산동이 부지 내부에 있는지 확인 (polygon 경우)
+    if site_polygon is not None:
+        started = perf_counter()
+        inside = prepare_polygon(site_polygon).contains_rects(candidates[valid])
+        inside_count = int(np.count_nonzero(inside))
+        failure_reasons['outside_polygon'] += len(inside) - inside_count
+        valid[valid] = inside
+        if stats is not None:
+            stats.record('production_polygon', len(inside), inside_count, perf_counter() - started,
+                         outside_polygon=len(inside) - inside_count)
+    
+    return list(zip(cand_x[valid], cand_y[valid]))
 
-    return positions, sizes
+def _search_blocks(count: int, first_size: int = 16):
+    """탐색 순서대로 점점 커지는 후보 블록 구간 (앞쪽에서 찾으면 적은 연산으로 종료)"""
+    start, size = 0, first_size
+    while start < count:
+        yield start, min(start + size, count)
+        start += size
+        size *= 4
 
-def generate_all_layouts(buildings: Dict) -> Tuple[List[Dict], Dict[str, int]]:
-    layouts = []
-    failure_reasons = {
+# 안내동 탐색 오프셋 (x 바깥, y 안쪽 순서)
+GUIDE_SEARCH_OFFSETS = [(x_offset, y_offset) for x_offset in range(-80, 81, 10) for y_offset in range(-80, 81, 10)]
+_GUIDE_OFFSET_ARRAY = np.array(GUIDE_SEARCH_OFFSETS, dtype=float)
+
+# 안내동 후보 탐색 순서: 'scan' 은 GUIDE_SEARCH_OFFSETS 순서, 'nearest' 는 출입구에서 가까운 후보부터
+GUIDE_ORDERS = ('scan', 'nearest')
+
+def guide_search_order(building: Building, guide_order: str = 'scan') -> np.ndarray:
+    """안내동 후보 탐색 순서 (GUIDE_SEARCH_OFFSETS 인덱스 배열)
+
+    'nearest' 는 출입구에서 후보 직사각형까지의 맨해튼 거리 순 (같은 거리는 'scan' 순서)
+    """
+    if guide_order == 'scan':
+        return np.arange(len(GUIDE_SEARCH_OFFSETS))
+    x_offsets, y_offsets = _GUIDE_OFFSET_ARRAY[:, 0], _GUIDE_OFFSET_ARRAY[:, 1]
+    dx = np.maximum(0, np.maximum(x_offsets, -(x_offsets + building.width)))
+    dy = np.maximum(0, np.maximum(y_offsets, -(y_offsets + building.height)))
+    return np.argsort(dx + dy, kind='stable')
+
+def prepare_guide_search(building: Building, gate: Tuple[float, float], site_w: float, site_h: float,
+                         site_polygon=None, static_index=None, guide_order: str = 'scan',
+                         setback: float = SETBACK) -> Dict:
+    """출입구 주변 안내동 후보 위치와 고정 조건(부지 경계, polygon, 주차장) 검사 결과를 미리 계산
+
+    static_index: 모든 배치에 공통인 건물(주차장)이 등록된 충돌 검사 인덱스 - 여기서 막힌 후보는 다시 검사하지 않는다
+    guide_order: 후보 탐색 순서 ('scan' 또는 'nearest', guide_search_order 참고)
+    """
+    gate_x, gate_y = gate
+    order = guide_search_order(building, guide_order)
+    cand_x = gate_x + _GUIDE_OFFSET_ARRAY[order, 0]
+    cand_y = gate_y + _GUIDE_OFFSET_ARRAY[order, 1]
+    
+    # 경계 체크
+    in_bounds = ~((cand_x < setback) | (cand_y < setback) |
+                  (cand_x + building.width > site_w - setback) |
+                  (cand_y + building.height > site_h - setback))
+    
+    candidates = np.column_stack([cand_x, cand_y, np.full(cand_x.shape, building.width), np.full(cand_x.shape, building.height)])
+    
+    # polygon 내부 체크 (경계 안쪽 후보만)
+    inside = in_bounds.copy()
+    if site_polygon is not None:
+        inside[in_bounds] = prepare_polygon(site_polygon).contains_rects(candidates[in_bounds])
+    rects = candidates[inside]
+    
+    # 주차장과 이격거리를 만족하는 후보 (rects 인덱스, 탐색 순서) - 배치마다 이 후보들만 새 건물과 검사
+    static_clear = static_index.clear_mask(rects) if static_index is not None else np.ones(len(rects), dtype=bool)
+    if len(rects):
+        blocked_reason = 'collision'
+    else:
+        blocked_reason = 'outside_polygon' if in_bounds.any() else 'insufficient_space'
+    return {
+        'gate': gate,
+        'offsets': [GUIDE_SEARCH_OFFSETS[index] for index in order],
+        'indices': np.flatnonzero(inside),
+        'rects': rects,
+        'rect_list': rects.tolist(),
+        'open': np.flatnonzero(static_clear),
+        # 모든 후보를 감싸는 탐색 영역 (공간 인덱스 질의용)
+        'window': (cand_x.min(), cand_y.min(), cand_x.max() + building.width, cand_y.max() + building.height),
+        # 안내동을 놓지 못했을 때의 실패 이유 (부지 안 후보가 있으면 충돌, 없으면 부지 조건)
+        'blocked_reason': blocked_reason
+    }
+
+@traced()
+def find_guide_position(guide_search: Dict, placed_rects: List[Tuple[float, float, float, float]],
+                        failure_reasons: Dict[str, int],
+                        min_distance: float = SETBACK) -> Optional[Tuple[float, float]]:
+    """고정 조건을 통과한 후보들을 이번 배치에 새로 놓인 건물들과 검사하여 탐색 순서상 첫 번째 유효 위치를 반환 (없으면 None)
+
+    placed_rects: 주차장 외에 이번 배치에서 놓인 건물 (x, y, w, h) 목록 (생산동, 부속동, 앞서 놓인 안내동)
+    탐색 영역 근처에 새 건물이 없으면 고정 조건만 통과한 첫 후보가 바로 답이고,
+    있으면 앞쪽 후보부터 하나씩 검사하고, 검사할 쌍이 SETBACK_BATCH_MIN_PAIRS 를 넘는 뒤쪽 후보는 블록 단위로 일괄 검사한다.
+    failure_reasons 에는 안내동을 놓지 못한 경우에만 한 번 집계한다 (guide_search['blocked_reason']).
+    """
+    rects = guide_search['rects']
+    open_indices = guide_search['open']
+    hit = len(rects)
+    if len(open_indices):
+        window_x0, window_y0, window_x1, window_y1 = guide_search['window']
+        nearby = [rect for rect in placed_rects
+                  if (rect[0] - min_distance < window_x1 and rect[0] + rect[2] + min_distance > window_x0 and
+                      rect[1] - min_distance < window_y1 and rect[1] + rect[3] + min_distance > window_y0)]
+        scalar_count = max(1, SETBACK_BATCH_MIN_PAIRS // len(nearby)) if nearby else 1
+        rect_list = guide_search['rect_list']
+        for index in open_indices[:scalar_count].tolist():
+            if is_rect_clear(rect_list[index], nearby, min_distance):
+                hit = index
+                break
+        else:
+            rest = open_indices[scalar_count:]
+            for start, end in _search_blocks(len(rest)):
+                block = rest[start:end]
+                no_collision = check_setback_distance_batch(rects[block], nearby, min_distance)
+                if no_collision.any():
+                    hit = int(block[np.argmax(no_collision)])
+                    break
+    if hit == len(rects):
+        failure_reasons[guide_search['blocked_reason']] += 1
+        return None
+    gate_x, gate_y = guide_search['gate']
+    x_offset, y_offset = guide_search['offsets'][int(guide_search['indices'][hit])]
+    return gate_x + x_offset, gate_y + y_offset
+
+def new_failure_reasons() -> Dict[str, int]:
+    return {
         'insufficient_space': 0,
         'collision': 0,
         'outside_polygon': 0,
         'no_substation_position': 0
     }
-    site_shape = buildings['site_shape']
-    if site_shape == '직사각형':
+
+def get_site_geometry(buildings: Dict) -> Tuple[float, float, Optional['Polygon']]:
+    """부지 너비, 높이, 다각형(직사각형 부지는 None)"""
+    if buildings.get('site_shape', '직사각형') == '직사각형':
         site_w, site_h = buildings['site_size']
-        site_polygon = None
-    else:
-        site_polygon = Polygon(buildings['site_size'])
-        minx, miny, maxx, maxy = site_polygon.bounds
-        site_w = maxx - minx
-        site_h = maxy - miny
+        return site_w, site_h, None
+    from shapely.geometry import Polygon
+    site_polygon = Polygon(buildings['site_size'])
+    min_x, min_y, max_x, max_y = site_polygon.bounds
+    return max_x - min_x, max_y - min_y, site_polygon
+
+def create_collision_index(collision_backend: str, site_w: float, site_h: float, min_distance: float = SETBACK):
+    """충돌 검사 인덱스 생성
+
+    'geometry': 이격거리를 좌표로 정확히 검사하는 SpatialIndex
+    'raster': 1m 격자 요약 면적 테이블로 상수 시간에 검사하는 OccupancyGrid (칸 경계가 아닌 좌표는 보수적으로 판단)
+    'check': 두 방식을 함께 갱신하며 결과를 비교하는 CheckedOccupancy (결과는 'geometry' 와 같음)
+    """
+    if collision_backend == 'geometry':
+        return SpatialIndex(min_distance=min_distance)
+    if collision_backend == 'raster':
+        return OccupancyGrid(site_w, site_h, min_distance=min_distance)
+    if collision_backend == 'check':
+        return CheckedOccupancy(SpatialIndex(min_distance=min_distance),
+                                OccupancyGrid(site_w, site_h, min_distance=min_distance))
+    raise ValueError(f"알 수 없는 충돌 검사 방식: {collision_backend}")
+
+@traced()
+def prepare_layout_run(buildings: Dict, substation_mode: str = 'step', collision_backend: str = 'geometry',
+                       production_candidates: str = 'grid', guide_order: str = 'scan',
+                       setback: float = SETBACK, grid_size: float = GRID_SIZE,
+                       building_spacing: float = BUILDING_SPACING) -> Dict:
+    """배치 탐색 전체에서 공유하는 부지/주차장/출입구 정보를 미리 계산 (입력 건물 객체는 변경하지 않음)
+
+    substation_mode: 변전소 위치 탐색 방식 ('step': 10m 간격, 'exact': 가능 구간 해석 계산)
+    collision_backend: 충돌 검사 방식 ('geometry', 'raster', 'check', create_collision_index 참고)
+    production_candidates: 생산동 후보 위치 생성 방식 ('grid': grid_size 격자, 'critical': 제약선 좌표)
+    guide_order: 안내동 후보 탐색 순서 ('scan': 오프셋 격자 순서, 'nearest': 출입구에서 가까운 순)
+    setback: 부지 경계 및 건물 간 이격거리, grid_size: 생산동 후보 격자 간격, building_spacing: 부속동 사이 간격
+             (기본값은 config 의 SETBACK, GRID_SIZE, BUILDING_SPACING)
+    """
+    if substation_mode not in SUBSTATION_MODES:
+        raise ValueError(f"알 수 없는 변전소 탐색 방식: {substation_mode}")
+    if production_candidates not in PRODUCTION_CANDIDATE_MODES:
+        raise ValueError(f"알 수 없는 생산동 후보 생성 방식: {production_candidates}")
+    if guide_order not in GUIDE_ORDERS:
+        raise ValueError(f"알 수 없는 안내동 탐색 순서: {guide_order}")
+    if setback < 0 or grid_size <= 0 or building_spacing < 0:
+        raise ValueError(f"잘못된 배치 파라미터: setback={setback}, grid_size={grid_size}, "
+                         f"building_spacing={building_spacing}")
+    site_w, site_h, site_polygon = get_site_geometry(buildings)
+    # 폴리곤 부지는 경계 선분을 한 번만 준비하여 모든 포함 검사에 재사용
+    site_region = prepare_polygon(site_polygon)
     
     prod = buildings['prod_building']
-    annex_buildings = buildings['annex_buildings']
-    guide_buildings = buildings['guide_buildings']
     gates = buildings['gates']
-    substation = buildings['substation']
     parking_buildings = buildings['parking_buildings']
     
     main_gate = get_main_gate(gates)
-    parking_positions = place_parking_lots(main_gate, parking_buildings, site_w, site_h)
+    parking_positions = place_parking_lots(main_gate, parking_buildings, site_w, site_h, setback)
+    parking_rects = building_rects(parking_positions, parking_buildings)
+    parking_index = create_collision_index(collision_backend, site_w, site_h, setback)
+    for building, (parking_x, parking_y, parking_w, parking_h) in zip(parking_buildings, parking_rects):
+        parking_index.insert(building.name, parking_x, parking_y, parking_w, parking_h)
+    
+    # 출입구별 안내동 (Main 안내동은 출입구 위치에 맞게 회전한 복사본 사용)
+    main_guide = buildings['guide_buildings'][0]
+    main_guide_size = get_main_guide_size((main_guide.width, main_guide.height), main_gate)
+    if main_guide_size != (main_guide.width, main_guide.height):
+        main_guide = Building(main_guide.name, *main_guide_size)
+    guide_buildings = [main_guide] + buildings['guide_buildings'][1:]
+    other_gates = [g for g in gates if g != main_gate]
+    gate_guides = [main_guide if gate == main_gate else guide_buildings[1 + other_gates.index(gate)] for gate in gates]
+    
+    return {
+        'buildings': buildings,
+        'site_w': site_w, 'site_h': site_h, 'site_polygon': site_polygon, 'site_region': site_region,
+        'prod': prod, 'annex_buildings': buildings['annex_buildings'],
+        'annex_arrangements': AnnexArrangementCache(buildings['annex_buildings'], gates, setback, building_spacing),
+        'guide_buildings': guide_buildings, 'gate_guides': gate_guides,
+        'guide_searches': [prepare_guide_search(building, gate, site_w, site_h, site_region, parking_index, guide_order,
+                                                setback)
+                           for gate, building in zip(gates, gate_guides)],
+        'guide_order': guide_order,
+        'gates': gates, 'main_gate': main_gate, 'substation': buildings['substation'],
+        'substation_mode': substation_mode, 'collision_backend': collision_backend,
+        'production_candidates': production_candidates,
+        'setback': setback, 'grid_size': grid_size, 'building_spacing': building_spacing,
+        'parking_buildings': parking_buildings, 'parking_positions': parking_positions,
+        'parking_rects': parking_rects, 'parking_index': parking_index,
+        'prod_orientations': [
+            (prod.width, prod.height, False, "horizontal"),
+            (prod.height, prod.width, True, "vertical")
+        ]
+    }
+
+# 생산동 후보 위치 생성 방식: 'grid' 는 grid_size 간격 격자, 'critical' 은 생산동 모서리가 제약선에 닿는 좌표만 사용
+PRODUCTION_CANDIDATE_MODES = ('grid', 'critical')
+
+def get_annex_group_offset(side: str, prod_w: float, prod_h: float,
+                           annex_width: float, annex_height: float, setback: float = SETBACK) -> Tuple[float, float]:
+    """생산동 위치 기준 부속동 그룹 위치의 상대 좌표"""
+    if side == 'left':
+        return -annex_width - setback, prod_h/2 - annex_height/2
+    if side == 'right':
+        return prod_w + setback, prod_h/2 - annex_height/2
+    if side == 'top':
+        return prod_w/2 - annex_width/2, prod_h + setback
+    return prod_w/2 - annex_width/2, -annex_height - setback
+
+def get_annex_group_origin(side: str, prod_x, prod_y, prod_w: float, prod_h: float,
+                           annex_width: float, annex_height: float, setback: float = SETBACK):
+    """생산동 side 쪽 부속동 그룹의 좌하단 좌표 (prod_x, prod_y 는 배열이어도 된다)"""
+    if side == 'left':
+        return prod_x - annex_width - setback, prod_y + prod_h/2 - annex_height/2
+    if side == 'right':
+        return prod_x + prod_w + setback, prod_y + prod_h/2 - annex_height/2
+    if side == 'top':
+        return prod_x + prod_w/2 - annex_width/2, prod_y + prod_h + setback
+    return prod_x + prod_w/2 - annex_width/2, prod_y - annex_height - setback  # bottom
+
+# 부속동 그룹 부지 경계 검사의 경계 이름 (generate_position_layouts 의 검사 순서)
+ANNEX_BOUNDS = ('x_low', 'y_low', 'x_high', 'y_high')
+
+def annex_bound_failures(run: Dict, orientation_index: int, side: str,
+                         prod_xs: np.ndarray, prod_ys: np.ndarray) -> np.ndarray:
+    """생산동 위치들 각각에서 side 쪽 부속동 그룹이 처음으로 벗어나는 부지 경계 (ANNEX_BOUNDS 인덱스, 통과하면 -1)
+
+    부속동 그룹 크기는 생산동 방향으로만 정해지므로 배치 루프 전에 일괄 계산할 수 있다.
+    x 경계는 prod_x 에만, y 경계는 prod_y 에만 의존하므로 생산동 후보의 열/행 단위로 걸러진다.
+    """
+    prod_w, prod_h, _, orientation = run['prod_orientations'][orientation_index]
+    _, annex_width, annex_height = run['annex_arrangements'].arrangements[orientation, True]
+    setback = run['setback']
+    group_x, group_y = get_annex_group_origin(side, prod_xs, prod_ys, prod_w, prod_h, annex_width, annex_height, setback)
+    failed = [group_x < setback, group_y < setback,
+              group_x + annex_width > run['site_w'] - setback, group_y + annex_height > run['site_h'] - setback]
+    first = np.full(len(prod_xs), -1)
+    for bound_index in reversed(range(len(ANNEX_BOUNDS))):
+        first[failed[bound_index]] = bound_index
+    return first
+
+def prune_annex_bounds(run: Dict, orientation_index: int, positions: List[Tuple[float, float]],
+                       failure_reasons: Dict[str, int],
+                       pruned: Optional[Dict[Tuple[str, str], Dict[str, int]]] = None,
+                       stats: Optional[LayoutStats] = None
+                       ) -> Tuple[List[Tuple[float, float]], List[Tuple[str, ...]]]:
+    """부속동 그룹이 부지 경계를 벗어나는 (생산동 위치, side) 를 배치 루프 전에 제외
+
+    반환: (남은 위치 목록, 위치별로 검사할 side 튜플) - 모든 side 가 제외된 위치는 목록에서 빠진다.
+    제외한 side 는 배치 루프에서와 같이 하나마다 insufficient_space 로 집계한다.
+    pruned: 전달하면 (방향, side) 별로 경계(ANNEX_BOUNDS)마다 제외한 후보 수를 누적
+    stats: 전달하면 'annex_bounds' 단계에 (생산동 위치, side) 단위 통계를 누적
+    """
+    if not positions:
+        return [], []
+    started = perf_counter()
+    orientation = run['prod_orientations'][orientation_index][3]
+    prod_xs, prod_ys = np.array(positions).T
+    sides = ['top', 'bottom'] if orientation == "horizontal" else ['left', 'right']
+    failures = [annex_bound_failures(run, orientation_index, side, prod_xs, prod_ys) for side in sides]
+    
+    if pruned is not None:
+        for side, first in zip(sides, failures):
+            counts = pruned.setdefault((orientation, side), dict.fromkeys(ANNEX_BOUNDS, 0))
+            bound_counts = np.bincount(first[first >= 0], minlength=len(ANNEX_BOUNDS))
+            for bound_index, bound in enumerate(ANNEX_BOUNDS):
+                counts[bound] += int(bound_counts[bound_index])
+    rejected = int(sum(np.count_nonzero(first >= 0) for first in failures))
+    failure_reasons['insufficient_space'] += rejected
+    
+    kept_positions, kept_sides = [], []
+    open_sides = np.column_stack([first < 0 for first in failures])
+    for position, side_mask in zip(positions, open_sides.tolist()):
+        if any(side_mask):
+            kept_positions.append(position)
+            kept_sides.append(tuple(side for side, is_open in zip(sides, side_mask) if is_open))
+    if stats is not None:
+        all_failures = np.concatenate(failures)
+        bound_counts = np.bincount(all_failures[all_failures >= 0], minlength=len(ANNEX_BOUNDS))
+        stats.record('annex_bounds', len(all_failures), len(all_failures) - rejected, perf_counter() - started,
+                     **{bound: int(count) for bound, count in zip(ANNEX_BOUNDS, bound_counts)})
+    return kept_positions, kept_sides
+
+def critical_production_coordinates(run: Dict, orientation_index: int) -> Tuple[np.ndarray, np.ndarray]:
+    """생산동이 제약선에 닿는 prod_x, prod_y 후보 좌표 (오름차순, 부지 이격거리 범위 안)
+
+    제약선: 부지 경계 이격거리, 주차장 이격거리 경계, 출입구 정렬선(생산동 짧은 변 중심이 출입구와 같은 선),
+    안내동 탐색 영역 경계, 부속동 그룹이 부지 안에 들어가는 한계와 주차장에 닿는 위치, polygon 꼭짓점
+    """
+    prod_w, prod_h, _, orientation = run['prod_orientations'][orientation_index]
+    site_w, site_h, setback = run['site_w'], run['site_h'], run['setback']
+    max_prod_x = site_w - prod_w - setback
+    max_prod_y = site_h - prod_h - setback
+    xs = [setback, max_prod_x]
+    ys = [setback, max_prod_y]
+    
+    # 주차장 이격거리 경계
+    parking_rects = run['parking_rects']
+    for parking_x, parking_y, parking_w, parking_h in parking_rects:
+        xs += [parking_x - prod_w - setback, parking_x + parking_w + setback]
+        ys += [parking_y - prod_h - setback, parking_y + parking_h + setback]
+    
+    # 출입구 정렬선과 안내동 탐색 영역 경계
+    for (gate_x, gate_y), guide_search in zip(run['gates'], run['guide_searches']):
+        if prod_w > prod_h:
+            xs += [gate_x, gate_x - prod_w]
+            ys.append(gate_y - prod_h/2)
+        else:
+            xs.append(gate_x - prod_w/2)
+            ys += [gate_y, gate_y - prod_h]
+        window_x0, window_y0, window_x1, window_y1 = guide_search['window']
+        xs += [window_x0 - prod_w - setback, window_x1 + setback]
+        ys += [window_y0 - prod_h - setback, window_y1 + setback]
+    
+    # 부속동 그룹이 부지 이격거리 한계나 주차장 이격거리 경계에 닿는 위치
+    _, annex_width, annex_height = run['annex_arrangements'].arrangements[orientation, True]
+    group_xs = [setback, site_w - setback - annex_width]
+    group_ys = [setback, site_h - setback - annex_height]
+    for parking_x, parking_y, parking_w, parking_h in parking_rects:
+        group_xs += [parking_x - annex_width - setback, parking_x + parking_w + setback]
+        group_ys += [parking_y - annex_height - setback, parking_y + parking_h + setback]
+    for side in (['top', 'bottom'] if orientation == "horizontal" else ['left', 'right']):
+        offset_x, offset_y = get_annex_group_offset(side, prod_w, prod_h, annex_width, annex_height, setback)
+        xs += [group_x - offset_x for group_x in group_xs]
+        ys += [group_y - offset_y for group_y in group_ys]
+    
+    # polygon 꼭짓점에 생산동 모서리가 닿는 위치
+    if run['site_polygon'] is not None:
+        for vertex_x, vertex_y in run['site_polygon'].exterior.coords:
+            xs += [vertex_x, vertex_x - prod_w]
+            ys += [vertex_y, vertex_y - prod_h]
+    
+    xs = np.unique(np.round(np.asarray(xs, dtype=float), 6))
+    ys = np.unique(np.round(np.asarray(ys, dtype=float), 6))
+    return xs[(setback <= xs) & (xs <= max_prod_x)], ys[(setback <= ys) & (ys <= max_prod_y)]
+
+def find_production_positions(run: Dict, orientation_index: int, failure_reasons: Dict[str, int],
+                              stats: Optional[LayoutStats] = None) -> Optional[List[Tuple[float, float]]]:
+    """방향 하나에서 부지/주차장 조건을 통과한 생산동 후보 위치 (부지가 생산동보다 작으면 None)
+
+    부속동 그룹 경계는 검사하지 않는다 (prune_annex_bounds 참고).
+    """
+    prod_w, prod_h = run['prod_orientations'][orientation_index][:2]
+    setback = run['setback']
+    max_prod_x = run['site_w'] - prod_w - setback
+    max_prod_y = run['site_h'] - prod_h - setback
+    
+    if max_prod_x < setback or max_prod_y < setback:
+        failure_reasons['insufficient_space'] += 1
+        if stats is not None:
+            stats.record('production_site', 1, 0, insufficient_space=1)
+        return None
+    
+    axes = critical_production_coordinates(run, orientation_index) if run['production_candidates'] == 'critical' else None
+    return find_feasible_production_positions(prod_w, prod_h, max_prod_x, max_prod_y,
+                                              run['parking_index'], run['site_region'], failure_reasons, axes, stats,
+                                              setback, run['grid_size'])
+
+@traced()
+def find_production_columns(run: Dict, failure_reasons: Dict[str, int],
+                            pruned: Optional[Dict[Tuple[str, str], Dict[str, int]]] = None,
+                            stats: Optional[LayoutStats] = None
+                            ) -> List[Tuple[int, float, List[float], List[Tuple[str, ...]]]]:
+    """방향별로 생산동 후보 위치를 일괄 검사하고 (방향 인덱스, prod_x, [prod_y...], [검사할 side...]) 열 단위로 묶어 반환
+
+    pruned: 전달하면 부속동 그룹 경계로 미리 제외한 후보 수를 (방향, side) 별로 누적 (prune_annex_bounds 참고)
+    stats: 전달하면 생산동 후보 단계와 부속동 경계 단계 통계를 누적
+    """
+    columns = []
+    for orientation_index in range(len(run['prod_orientations'])):
+        production_positions = find_production_positions(run, orientation_index, failure_reasons, stats)
+        if production_positions is None:
+            continue
+        production_positions, position_sides = prune_annex_bounds(
+            run, orientation_index, production_positions, failure_reasons, pruned, stats)
+        
+        for (prod_x, prod_y), sides in zip(production_positions, position_sides):
+            if columns and columns[-1][0] == orientation_index and columns[-1][1] == prod_x:
+                columns[-1][2].append(prod_y)
+                columns[-1][3].append(sides)
+            else:
+                columns.append((orientation_index, prod_x, [prod_y], [sides]))
+    return columns
+
+@traced()
+def place_annex_group(run: Dict, orientation_index: int, prod_x: float, prod_y: float, side: str,
+                      failure_reasons: Dict[str, int],
+                      stats: Optional[LayoutStats] = None) -> Optional[Tuple[Dict, List[Tuple]]]:
+    """생산동의 side 쪽에 부속동 그룹을 배치하고 (부속동 위치, 부속동 (x, y, w, h) 목록) 반환
+
+    부지 경계를 벗어나거나 다각형 부지/주차장 조건을 통과하지 못하면 실패 이유를 기록하고 None 반환
+    (stats 를 전달하면 'annex_bounds', 'annex_site' 단계 통계 누적).
+    """
+    started = perf_counter() if stats is not None else None
+    prod_w, prod_h, is_rotated, orientation = run['prod_orientations'][orientation_index]
+    site_w, site_h, site_region, setback = run['site_w'], run['site_h'], run['site_region'], run['setback']
+    # 부속동 배치
+    annex_positions, annex_width, annex_height = run['annex_arrangements'].arrange(
+        side, prod_x, prod_y, prod_w, prod_h, orientation)
     
-    prod_orientations = [
-        (prod.width, prod.height, False, "horizontal"),
-        (prod.height, prod.width, True, "vertical")
-    ]
+    # 부속동 그룹의 실제 배치 위치 계산
+    group_x, group_y = get_annex_group_origin(side, prod_x, prod_y, prod_w, prod_h, annex_width, annex_height, setback)
     
-    layout_id = 0
+    # 부속동 그룹이 부지 경계를 벗어나는지 확인 (처음 벗어난 경계를 ANNEX_BOUNDS 이름으로 기록)
+    failed = (group_x < setback, group_y < setback,
+              group_x + annex_width > site_w - setback, group_y + annex_height > site_h - setback)
+    if any(failed):
+        failure_reasons['insufficient_space'] += 1
+        if stats is not None:
+            stats.record('annex_bounds', 1, 0, perf_counter() - started, **{ANNEX_BOUNDS[failed.index(True)]: 1})
+        return None
     
-    for prod_w, prod_h, is_rotated, orientation in prod_orientations:
-        max_prod_x = site_w - prod_w - SETBACK
-        max_prod_y = site_h - prod_h - SETBACK
+    # 상대 좌표를 실제 좌표로 변환
+    final_annex_positions = {name: (group_x + rel_x, group_y + rel_y) 
+                             for name, (rel_x, rel_y) in annex_positions.items()}
+    
+    # 부속동이 부지 내부에 있고 주차장과 충돌하지 않는지 확인 (배치 순서상 첫 실패 이유만 기록)
+    annex_rects = [(*final_annex_positions[building.name], building.width, building.height)
+                   for building in run['annex_buildings']]
+    annex_clear = run['parking_index'].clear_mask(annex_rects)
+    annex_failure = None
+    if site_region is not None:
+        annex_inside = site_region.contains_rects(annex_rects)
+        for inside, clear in zip(annex_inside, annex_clear):
+            if not inside:
+                annex_failure = 'outside_polygon'
+                break
+            if not clear:
+                annex_failure = 'collision'
+                break
+    elif not annex_clear.all():
+        annex_failure = 'collision'
+    
+    if annex_failure:
+        failure_reasons[annex_failure] += 1
+        if stats is not None:
+            stats.record('annex_site', 1, 0, perf_counter() - started, **{annex_failure: 1})
+        return None
+    if stats is not None:
+        stats.record('annex_site', 1, 1, perf_counter() - started)
+    return final_annex_positions, annex_rects
+
+@traced()
+def place_guides(run: Dict, layout_rects: List[Tuple], failure_reasons: Dict[str, int],
+                 stats: Optional[LayoutStats] = None) -> Optional[Dict[str, Tuple[float, float]]]:
+    """출입구마다 안내동을 배치한 {안내동 이름: 위치} (한 출입구라도 실패하면 None)
+
+    layout_rects: 주차장 외에 이번 배치에서 놓인 건물 (x, y, w, h) 목록 (생산동, 부속동)
+                  - 안내동 탐색은 주차장 조건을 미리 반영해 두었으므로 이것만 검사
+    """
+    guide_positions = {}
+    for gate_index, (building, guide_search) in enumerate(zip(run['gate_guides'], run['guide_searches'])):
+        # 안내동 위치 탐색 (후보 위치와 부지/주차장 조건은 실행 준비 단계에서 출입구별로 한 번만 계산)
+        started = perf_counter() if stats is not None else None
+        guide_position = find_guide_position(guide_search, layout_rects, failure_reasons, run['setback'])
+        if stats is not None:
+            stats.record(f'guide_gate{gate_index + 1}', 1, int(guide_position is not None), perf_counter() - started,
+                         **({} if guide_position is not None else {guide_search['blocked_reason']: 1}))
+        if guide_position is None:
+            return None
+        guide_positions[building.name] = guide_position
+        layout_rects = layout_rects + [(*guide_position, building.width, building.height)]
+    return guide_positions
+
+@traced()
+def place_substation(run: Dict, orientation_index: int, prod_x: float, prod_y: float,
+                     annex_positions: Dict, layout_rects: List[Tuple], guide_positions: Dict,
+                     failure_reasons: Dict[str, int],
+                     stats: Optional[LayoutStats] = None) -> List[Tuple[float, float, str]]:
+    """생산동/부속동/안내동이 놓인 배치에서 가능한 변전소 위치 목록 (없으면 실패 이유 기록)
+
+    layout_rects: 안내동 배치에 쓴 생산동, 부속동 (x, y, w, h) 목록 (place_guides 참고)
+    """
+    prod_w, prod_h = run['prod_orientations'][orientation_index][:2]
+    layout_rects = layout_rects + [(*guide_positions[building.name], building.width, building.height)
+                                   for building in run['gate_guides']]
+    # 주차장 인덱스를 공유하고 생산동/부속동/안내동만 추가
+    placed_index = run['parking_index'].child()
+    names = [run['prod'].name] + [building.name for building in run['annex_buildings']] + \
+            [building.name for building in run['gate_guides']]
+    for name, (x, y, w, h) in zip(names, layout_rects):
+        placed_index.insert(name, x, y, w, h)
+    
+    substation_positions = find_valid_substation_positions(
+        prod_x, prod_y, prod_w, prod_h,
+        annex_positions, run['annex_buildings'],
+        guide_positions, run['guide_buildings'],
+        run['parking_positions'], run['parking_buildings'],
+        run['substation'], run['site_w'], run['site_h'], run['gates'], run['site_region'], placed_index,
+        run['substation_mode'], stats, run['setback']
+    )
+    if not substation_positions:
+        failure_reasons['no_substation_position'] += 1
+    return substation_positions
+
+def build_position_layouts(run: Dict, orientation_index: int, prod_x: float, prod_y: float, side: str,
+                           annex_positions: Dict, guide_positions: Dict,
+                           substation_positions: List[Tuple[float, float, str]]) -> List[Dict]:
+    """변전소 위치마다 레이아웃 dict 를 만들고 출입구 ~ 생산동 거리를 계산 (id 는 호출하는 쪽에서 부여)"""
+    prod_w, prod_h, is_rotated, orientation = run['prod_orientations'][orientation_index]
+    gates = run['gates']
+    layouts = []
+    # 각 변전소 위치별로 별도 레이아웃 생성
+    for sub_x, sub_y, sub_side in substation_positions:
+        
+        # 출입구와 생산동까지의 맨해튼 거리 계산
+        short_edge_centers = get_production_short_edge_centers(prod_x, prod_y, prod_w, prod_h)
+        gate_distances = []
         
-        if max_prod_x < SETBACK or max_prod_y < SETBACK:
-            failure_reasons['insufficient_space'] += 1
+        for i, gate in enumerate(gates):
+            distances_to_edges = [distance(gate, center) for center in short_edge_centers]
+            min_distance = min(distances_to_edges)
+            closest_center = short_edge_centers[distances_to_edges.index(min_distance)]
+            gate_distances.append({
+                'gate_id': i + 1, 'gate_pos': gate,
+                'closest_center': closest_center, 'distance': min_distance
+            })
+        
+        # 레이아웃 정보 생성
+        layouts.append({
+            'id': None,
+            'production': {'x': prod_x, 'y': prod_y, 'width': prod_w, 'height': prod_h,
+                           'rotated': is_rotated, 'orientation': orientation},
+            'annex_group': {'side': side, 'positions': annex_positions},
+            'substation': {'x': sub_x, 'y': sub_y, 'side': sub_side},
+            'guides': guide_positions, 'parking': run['parking_positions'],
+            'gates': gates, 'gate_distances': gate_distances
+        })
+    return layouts
+
+def generate_position_layouts(run: Dict, orientation_index: int, prod_x: float, prod_y: float,
+                              failure_reasons: Dict[str, int], sides: Optional[Tuple[str, ...]] = None,
+                              stats: Optional[LayoutStats] = None, return_stats: bool = False):
+    """생산동 위치 하나에 대해 부속동/안내동/변전소를 배치한 레이아웃들을 생성 (id 는 호출하는 쪽에서 부여)
+
+    sides: 부속동 그룹을 검사할 side (없으면 생산동 방향의 두 side 모두, prune_annex_bounds 참고)
+    stats: 전달하면 부속동('annex_bounds', 'annex_site'), 출입구별 안내동('guide_gate<번호>'),
+           변별 변전소('substation_<side>') 단계 통계를 누적 (None 이면 시간 측정과 기록을 하지 않음)
+    return_stats: True 이면 stats 가 없을 때 새로 만들어 누적하고 생성기의 반환 값으로 돌려준다
+                  (stats = yield from generate_position_layouts(...))
+    """
+    if return_stats and stats is None:
+        stats = LayoutStats()
+    prod_w, prod_h, is_rotated, orientation = run['prod_orientations'][orientation_index]
+    
+    if sides is None:
+        sides = ['top', 'bottom'] if orientation == "horizontal" else ['left', 'right']
+    
+    for side in sides:
+        annex = place_annex_group(run, orientation_index, prod_x, prod_y, side, failure_reasons, stats)
+        if annex is None:
+            continue
+        annex_positions, annex_rects = annex
+        
+        layout_rects = [(prod_x, prod_y, prod_w, prod_h)] + annex_rects
+        guide_positions = place_guides(run, layout_rects, failure_reasons, stats)
+        if guide_positions is None:
+            continue
+        
+        substation_positions = place_substation(run, orientation_index, prod_x, prod_y, annex_positions, layout_rects,
+                                                guide_positions, failure_reasons, stats)
+        if not substation_positions:
             continue
         
-        for prod_x in np.arange(SETBACK, max_prod_x + 1, GRID_SIZE):
-            for prod_y in np.arange(SETBACK, max_prod_y + 1, GRID_SIZE):
-                
-                # 생산동이 주차장과 충돌하는지 확인
-                valid_prod_position = True
-                for building in parking_buildings:
-                    parking_pos = parking_positions[building.name]
-                    if not check_setback_distance(prod_x, prod_y, prod_w, prod_h,
-                                                  parking_pos[0], parking_pos[1],
-                                                  building.width, building.height):
-                        valid_prod_position = False
-                        failure_reasons['collision'] += 1
-                        break
-                
-                if not valid_prod_position:
-                    continue
-                
-                # 생산동이 부지 내부에 있는지 확인 (polygon 경우)
-                if site_polygon and not is_building_inside_polygon(prod_x, prod_y, prod_w, prod_h, site_polygon):
-                    failure_reasons['outside_polygon'] += 1
-                    continue
-                
-                sides = ['top', 'bottom'] if orientation == "horizontal" else ['left', 'right']
-                
-                for side in sides:
-                    # 부속동 배치
-                    annex_positions, annex_width, annex_height = arrange_annex_buildings_user_specified_order(
-                        annex_buildings, side, prod_x, prod_y, prod_w, prod_h, orientation, gates)
-                    
-                    # 부속동 그룹의 실제 배치 위치 계산
-                    if side == 'left':
-                        group_x = prod_x - annex_width - SETBACK
-                        group_y = prod_y + prod_h/2 - annex_height/2
-                    elif side == 'right':
-                        group_x = prod_x + prod_w + SETBACK
-                        group_y = prod_y + prod_h/2 - annex_height/2
-                    elif side == 'top':
-                        group_x = prod_x + prod_w/2 - annex_width/2
-                        group_y = prod_y + prod_h + SETBACK
-                    else:  # bottom
-                        group_x = prod_x + prod_w/2 - annex_width/2
-                        group_y = prod_y - annex_height - SETBACK
-                    
-                    # 부속동 그룹이 부지 경계를 벗어나는지 확인
-                    if (group_x < SETBACK or group_y < SETBACK or 
-                        group_x + annex_width > site_w - SETBACK or 
-                        group_y + annex_height > site_h - SETBACK):
-                        failure_reasons['insufficient_space'] += 1
-                        continue
-                    
-                    # 상대 좌표를 실제 좌표로 변환
-                    final_annex_positions = {name: (group_x + rel_x, group_y + rel_y) 
-                                             for name, (rel_x, rel_y) in annex_positions.items()}
-                    
-                    # 부속동이 주차장과 충돌하는지 확인
-                    valid_annex = True
-                    for building in annex_buildings:
-                        annex_pos = final_annex_positions[building.name]
-                        if site_polygon and not is_building_inside_polygon(annex_pos[0], annex_pos[1], building.width, building.height, site_polygon):
-                            valid_annex = False
-                            failure_reasons['outside_polygon'] += 1
-                            break
-                        for parking_building in parking_buildings:
-                            parking_pos = parking_positions[parking_building.name]
-                            if not check_setback_distance(annex_pos[0], annex_pos[1],
-                                                          building.width, building.height,
-                                                          parking_pos[0], parking_pos[1],
-                                                          parking_building.width, parking_building.height):
-                                valid_annex = False
-                                failure_reasons['collision'] += 1
-                                break
-                        if not valid_annex:
-                            break
-                    
-                    if not valid_annex:
-                        continue
-                    
-                    # 안내동 배치
-                    guide_positions = {}
-                    valid_guides = True
-                    
-                    for i, (gate_x, gate_y) in enumerate(gates):
-                        if (gate_x, gate_y) == main_gate:
-                            building = guide_buildings[0]
-                            # 출입구 위치에 따른 건물 회전
-                            if gate_x == 0 and building.width > building.height:
-                                building.width, building.height = building.height, building.width
-                            elif gate_y == 0 and building.width < building.height:
-                                building.width, building.height = building.height, building.width
-                        else:
-                            other_gate_index = [g for g in gates if g != main_gate].index((gate_x, gate_y))
-                            building = guide_buildings[1 + other_gate_index]
-                        
-                        # 안내동 위치 탐색
-                        found_position = False
-                        for x_offset in range(-80, 81, 10):
-                            for y_offset in range(-80, 81, 10):
-                                candidate_x = gate_x + x_offset
-                                candidate_y = gate_y + y_offset
-                                
-                                # 경계 체크
-                                if (candidate_x < SETBACK or candidate_y < SETBACK or
-                                    candidate_x + building.width > site_w - SETBACK or
-                                    candidate_y + building.height > site_h - SETBACK):
-                                    failure_reasons['insufficient_space'] += 1
-                                    continue
-                                
-                                # polygon 내부 체크
-                                if site_polygon and not is_building_inside_polygon(candidate_x, candidate_y, building.width, building.height, site_polygon):
-                                    failure_reasons['outside_polygon'] += 1
-                                    continue
-                                
-                                # 모든 기존 건물들과의 충돌 체크
-                                valid_position = True
-                                
-                                # 생산동과의 충돌 체크
-                                if not check_setback_distance(candidate_x, candidate_y, building.width, building.height,
-                                                              prod_x, prod_y, prod_w, prod_h):
-                                    valid_position = False
-                                    failure_reasons['collision'] += 1
-                                
-                                # 부속동들과의 충돌 체크
-                                if valid_position:
-                                    for annex_building in annex_buildings:
-                                        annex_pos = final_annex_positions[annex_building.name]
-                                        if not check_setback_distance(candidate_x, candidate_y, building.width, building.height,
-                                                                      annex_pos[0], annex_pos[1], annex_building.width, annex_building.height):
-                                            valid_position = False
-                                            failure_reasons['collision'] += 1
-                                            break
-                                
-                                # 주차장들과의 충돌 체크
-                                if valid_position:
-                                    for parking_building in parking_buildings:
-                                        parking_pos = parking_positions[parking_building.name]
-                                        if not check_setback_distance(candidate_x, candidate_y, building.width, building.height,
-                                                                      parking_pos[0], parking_pos[1], parking_building.width, parking_building.height):
-                                            valid_position = False
-                                            failure_reasons['collision'] += 1
-                                            break
-                                
-                                # 다른 안내동들과의 충돌 체크
-                                if valid_position:
-                                    for other_name, other_pos in guide_positions.items():
-                                        other_building = next(b for b in guide_buildings if b.name == other_name)
-                                        if not check_setback_distance(candidate_x, candidate_y, building.width, building.height,
-                                                                      other_pos[0], other_pos[1], other_building.width, other_building.height):
-                                            valid_position = False
-                                            failure_reasons['collision'] += 1
-                                            break
-                                
-                                if valid_position:
-                                    guide_positions[building.name] = (candidate_x, candidate_y)
-                                    found_position = True
-                                    break
-                            
-                            if found_position:
-                                break
-                        
-                        if not found_position:
-                            valid_guides = False
-                            break
-                    
-                    if not valid_guides:
-                        continue
-                    
-                    # 변전소 배치
-                    substation_positions = find_valid_substation_positions(
-                        prod_x, prod_y, prod_w, prod_h,
-                        final_annex_positions, annex_buildings,
-                        guide_positions, guide_buildings,
-                        parking_positions, parking_buildings,
-                        substation, site_w, site_h, gates, site_polygon
-                    )
-                    
-                    if not substation_positions:
-                        failure_reasons['no_substation_position'] += 1
-                        continue
-                    
-                    # 각 변전소 위치별로 별도 레이아웃 생성
-                    for sub_x, sub_y, sub_side in substation_positions:
-                        
-                        # 출입구와 생산동까지의 맨해튼 거리 계산
-                        short_edge_centers = get_production_short_edge_centers(prod_x, prod_y, prod_w, prod_h)
-                        gate_distances = []
-                        
-                        for i, gate in enumerate(gates):
-                            distances_to_edges = [distance(gate, center) for center in short_edge_centers]
-                            min_distance = min(distances_to_edges)
-                            closest_center = short_edge_centers[distances_to_edges.index(min_distance)]
-                            gate_distances.append({
-                                'gate_id': i + 1, 'gate_pos': gate,
-                                'closest_center': closest_center, 'distance': min_distance
-                            })
-                        
-                        # 레이아웃 정보 생성
-                        layout = {
-                            'id': layout_id,
-                            'production': {'x': prod_x, 'y': prod_y, 'width': prod_w, 'height': prod_h,
-                                           'rotated': is_rotated, 'orientation': orientation},
-                            'annex_group': {'side': side, 'positions': final_annex_positions},
-                            'substation': {'x': sub_x, 'y': sub_y, 'side': sub_side},
-                            'guides': guide_positions, 'parking': parking_positions,
-                            'gates': gates, 'gate_distances': gate_distances
-                        }
-                        
-                        layouts.append(layout)
-                        layout_id += 1
+        yield from build_position_layouts(run, orientation_index, prod_x, prod_y, side,
+                                          annex_positions, guide_positions, substation_positions)
+    return stats
+
+def generate_column_layouts(run: Dict, column: Tuple,
+                            collect_stats: bool = False) -> Tuple[List[Dict], Dict[str, int], Optional[LayoutStats]]:
+    """생산동 후보 한 열(같은 방향, 같은 prod_x)의 레이아웃과 실패 통계, 단계별 통계 (collect_stats=False 이면 None)"""
+    orientation_index, prod_x, prod_ys, prod_sides = column
+    failure_reasons = new_failure_reasons()
+    stats = LayoutStats() if collect_stats else None
+    layouts = []
+    for prod_y, sides in zip(prod_ys, prod_sides):
+        layouts.extend(generate_position_layouts(run, orientation_index, prod_x, prod_y, failure_reasons, sides, stats))
+    return layouts, failure_reasons, stats
+
+# 프로세스 풀 작업자별 실행 정보와 단계별 통계 수집 여부 (작업자 초기화 시 한 번만 준비)
+_worker_run = None
+_worker_collect_stats = False
+
+def _init_worker(buildings: Dict, run_options: Dict, collect_stats: bool = False):
+    global _worker_run, _worker_collect_stats
+    _worker_run = prepare_layout_run(buildings, **run_options)
+    _worker_collect_stats = collect_stats
+
+def _worker_generate_columns(columns: List[Tuple]) -> List[Tuple[List[Dict], Dict[str, int], Optional[LayoutStats]]]:
+    return [generate_column_layouts(_worker_run, column, _worker_collect_stats) for column in columns]
+
+# 병렬 실행에서 작업자 하나당 동시에 제출해 두는 열 묶음 수 (소비자가 멈추면 나머지 묶음은 제출하지 않는다)
+IN_FLIGHT_PER_WORKER = 2
+
+def _bounded_map(executor, function: Callable, items: List, window: int) -> Iterator:
+    """items 를 순서대로 제출하되 결과를 기다리는 작업은 window 개까지만 두고, 결과를 제출 순서대로 반환
+
+    생성기를 닫으면 아직 시작하지 않은 작업은 취소한다.
+    """
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+@traced()
+def iter_layouts(buildings: Dict, limit: Optional[int] = None,
+                 predicate: Optional[Callable[[Dict], bool]] = None,
+                 failure_reasons: Optional[Dict[str, int]] = None,
+                 workers: Optional[int] = None,
+                 substation_mode: str = 'step',
+                 collision_backend: str = 'geometry',
+                 production_candidates: str = 'grid',
+                 pruned: Optional[Dict[Tuple[str, str], Dict[str, int]]] = None,
+                 guide_order: str = 'scan',
+                 stats: Optional[LayoutStats] = None,
+                 setback: float = SETBACK, grid_size: float = GRID_SIZE,
+                 building_spacing: float = BUILDING_SPACING,
+                 return_stats: bool = False) -> Generator[Dict, None, Optional[LayoutStats]]:
+    """배치 케이스를 찾는 즉시 하나씩 반환하는 생성기
+
+    limit: predicate 를 통과한 레이아웃을 limit 개 반환하면 탐색을 중단
+    predicate: True 를 반환하는 레이아웃만 반환 (layout id 는 전체 탐색 순서 기준으로 유지)
+    failure_reasons: 전달하면 탐색한 범위까지의 실패 통계를 누적
+    workers: 2 이상이면 생산동 후보 열(방향, prod_x)을 프로세스 풀에 나누어 처리하고 열 순서대로 반환
+             (작업자당 IN_FLIGHT_PER_WORKER 묶음만 미리 제출하므로 limit 에 도달하거나 생성기를 닫으면 나머지는 계산하지 않음)
+    substation_mode: 변전소 위치 탐색 방식 ('step': 10m 간격, 'exact': 가능 구간에서 최적 위치를 정확히 계산)
+    collision_backend: 충돌 검사 방식 ('geometry': 좌표 기반 정확 검사, 'raster': 요약 면적 테이블, 'check': 두 방식 비교)
+    production_candidates: 생산동 후보 위치 ('grid': grid_size 격자, 'critical': 생산동이 제약선에 닿는 좌표만)
+    pruned: 전달하면 부속동 그룹이 부지를 벗어나 미리 제외한 생산동 후보 수를 (방향, side) 별 경계마다 누적
+    guide_order: 안내동 후보 탐색 순서 ('scan': 오프셋 격자 순서, 'nearest': 출입구에서 가까운 후보부터)
+    stats: 전달하면 탐색한 범위까지의 단계별 소요 시간, 후보 통과/탈락 수를 누적 (LayoutStats)
+           None 이면 단계별 시간 측정과 기록을 하지 않는다
+    setback, grid_size, building_spacing: 이격거리, 생산동 후보 격자 간격, 부속동 사이 간격 (prepare_layout_run 참고)
+    return_stats: True 이면 stats 가 없을 때 새로 만들어 누적하고 생성기의 반환 값으로 돌려준다
+                  (stats = yield from iter_layouts(...), 또는 StopIteration.value)
+    """
+    if return_stats and stats is None:
+        stats = LayoutStats()
+    if limit is not None and limit <= 0:
+        return stats
+    if failure_reasons is None:
+        failure_reasons = new_failure_reasons()
+    
+    run_options = {'substation_mode': substation_mode, 'collision_backend': collision_backend,
+                   'production_candidates': production_candidates, 'guide_order': guide_order,
+                   'setback': setback, 'grid_size': grid_size, 'building_spacing': building_spacing}
+    started = perf_counter()
+    run = prepare_layout_run(buildings, **run_options)
+    if stats is not None:
+        stats.record('prepare', 1, 1, perf_counter() - started)
+    columns = find_production_columns(run, failure_reasons, pruned, stats)
+    
+    executor = None
+    if workers and workers > 1 and len(columns) > 1:
+        from concurrent.futures import ProcessPoolExecutor  # 병렬 실행할 때만 불러온다
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(buildings, run_options, stats is not None))
+        chunksize = max(1, len(columns) // (workers * 16))
+        chunks = [columns[start:start + chunksize] for start in range(0, len(columns), chunksize)]
+        chunk_results = _bounded_map(executor, _worker_generate_columns, chunks, workers * IN_FLIGHT_PER_WORKER)
+        candidates = (layout for column_results in chunk_results
+                      for column_layouts, column_failures, column_stats in column_results
+                      for layout in _merge_failures(failure_reasons, column_failures, column_layouts,
+                                                    stats, column_stats))
+    else:
+        candidates = (layout for orientation_index, prod_x, prod_ys, prod_sides in columns
+                      for prod_y, sides in zip(prod_ys, prod_sides)
+                      for layout in generate_position_layouts(run, orientation_index, prod_x, prod_y,
+                                                              failure_reasons, sides, stats))
     
+    try:
+        yielded = 0
+        for layout_id, layout in enumerate(candidates):
+            layout['id'] = layout_id
+            if predicate is not None and not predicate(layout):
+                continue
+            yield layout
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                break
+    finally:
+        if executor is not None:
+            # 미리 제출한 묶음을 취소한 뒤 (실행 중인 묶음만 기다림) 작업자 프로세스 종료
+            chunk_results.close()
+            executor.shutdown(wait=True, cancel_futures=True)
+    return stats
+
+def _merge_failures(failure_reasons: Dict[str, int], column_failures: Dict[str, int], column_layouts: List[Dict],
+                    stats: Optional[LayoutStats], column_stats: Optional[LayoutStats]) -> List[Dict]:
+    for reason, count in column_failures.items():
+        failure_reasons[reason] += count
+    if stats is not None:
+        stats.merge(column_stats)
+    return column_layouts
+
+@traced()
+def generate_all_layouts(buildings: Dict, workers: Optional[int] = None,
+                         substation_mode: str = 'step',
+                         collision_backend: str = 'geometry',
+                         production_candidates: str = 'grid',
+                         guide_order: str = 'scan',
+                         stats: Optional[LayoutStats] = None,
+                         setback: float = SETBACK, grid_size: float = GRID_SIZE,
+                         building_spacing: float = BUILDING_SPACING, return_stats: bool = False):
+    """가능한 모든 배치 케이스 생성
+
+    workers: 2 이상이면 생산동 후보 열(방향, prod_x)을 프로세스 풀에 나누어 처리한다.
+             결과는 열 순서대로 합치므로 layout id 와 failure_reasons 는 단일 프로세스 실행과 같다.
+    substation_mode: 변전소 위치 탐색 방식 ('step' 또는 'exact')
+    collision_backend: 충돌 검사 방식 ('geometry', 'raster' 또는 'check')
+    production_candidates: 생산동 후보 위치 생성 방식 ('grid' 또는 'critical')
+    guide_order: 안내동 후보 탐색 순서 ('scan' 또는 'nearest')
+    stats: 전달하면 단계별 소요 시간과 후보 통과/탈락 통계를 누적 (LayoutStats, None 이면 측정하지 않음)
+    setback, grid_size, building_spacing: 이격거리, 생산동 후보 격자 간격, 부속동 사이 간격 (기본값은 config)
+    return_stats: True 이면 (레이아웃 목록, failure_reasons, LayoutStats) 를 반환 (기본은 앞의 둘만)
+    """
+    if return_stats and stats is None:
+        stats = LayoutStats()
+    failure_reasons = new_failure_reasons()
+    layouts = list(iter_layouts(buildings, failure_reasons=failure_reasons, workers=workers,
+                                 substation_mode=substation_mode, collision_backend=collision_backend,
+                                 production_candidates=production_candidates, guide_order=guide_order,
+                                 stats=stats, setback=setback, grid_size=grid_size,
+                                 building_spacing=building_spacing))
+    if return_stats:
+        return layouts, failure_reasons, stats
     return layouts, failure_reasons
 
+# 변전소 위치 탐색 방식: 'step' 은 최적 위치에서 10m 간격으로 탐색, 'exact' 는 가능 구간을 해석적으로 계산
+SUBSTATION_MODES = ('step', 'exact')
+
+def get_substation_search_line(side: str, substation, site_w: float, site_h: float,
+                               annex_center: Tuple[float, float], setback: float = SETBACK) -> Dict:
+    """변 side 를 따라 움직이는 변전소의 탐색 선
+
+    'horizontal': 위/아래 변이면 True (x 방향으로 이동), 'fixed': 변에 수직인 고정 좌표,
+    'optimal': 부속동 그룹 중심에 맞춘 이동 좌표, 'low' ~ 'high': 이동 좌표의 허용 범위
+    """
+    annex_center_x, annex_center_y = annex_center
+    if side in ['top', 'bottom']:
+        fixed = site_h - substation.height - setback if side == 'top' else setback
+        return {'side': side, 'horizontal': True, 'fixed': fixed,
+                'optimal': annex_center_x - substation.width / 2,
+                'low': setback, 'high': site_w - setback - substation.width,
+                'search_range': int(site_w - 2*setback)}
+    fixed = setback if side == 'left' else site_w - substation.width - setback
+    return {'side': side, 'horizontal': False, 'fixed': fixed,
+            'optimal': annex_center_y - substation.height / 2,
+            'low': setback, 'high': site_h - setback - substation.height,
+            'search_range': int(site_h - 2*setback)}
+
+def _substation_line_rects(line: Dict, substation, along: np.ndarray) -> np.ndarray:
+    """탐색 선 위의 이동 좌표 along 에 놓인 변전소 직사각형 (N,4)"""
+    fixed = np.full(along.shape, line['fixed'])
+    x, y = (along, fixed) if line['horizontal'] else (fixed, along)
+    return np.column_stack([x, y, np.full(along.shape, substation.width), np.full(along.shape, substation.height)])
+
+def _substation_line_window(line: Dict, substation) -> Tuple[float, float, float, float]:
+    """탐색 선을 따라 변전소가 차지할 수 있는 영역 (x0, y0, x1, y1)"""
+    low, high, fixed = line['low'], max(line['low'], line['high']), line['fixed']
+    if line['horizontal']:
+        return low, fixed, high + substation.width, fixed + substation.height
+    return fixed, low, fixed + substation.width, high + substation.height
+
+def _subtract_open_intervals(low: float, high: float, blocked: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """닫힌 구간 [low, high] 에서 열린 구간들을 뺀 나머지 닫힌 구간 목록 (오름차순)"""
+    intervals = []
+    cursor = low
+    for start, end in sorted(blocked):
+        if start > high:
+            break
+        if end <= cursor:
+            continue
+        if start >= cursor:
+            intervals.append((cursor, min(start, high)))
+        cursor = end
+    if cursor <= high:
+        intervals.append((cursor, high))
+    return intervals
+
+def find_substation_intervals(line: Dict, substation, placed_rects,
+                              site_polygon: Optional['Polygon'] = None,
+                              min_distance: float = SETBACK) -> List[Tuple[float, float]]:
+    """탐색 선 위에서 변전소를 놓을 수 있는 이동 좌표의 닫힌 구간 목록 (오름차순)
+
+    site_polygon: 부지 폴리곤 (Polygon 또는 PreparedPolygon, 직사각형 부지는 None)
+    배치된 건물을 이격거리만큼 확장해 탐색 선에 투영한 열린 구간과,
+    변전소가 지나가는 띠 영역 중 부지 폴리곤 밖 부분을 투영한 열린 구간을 허용 범위에서 뺀다.
+    """
+    low, high, fixed = line['low'], line['high'], line['fixed']
+    if low > high:
+        return []
+    if line['horizontal']:
+        along_size, across_size = substation.width, substation.height
+        columns = (0, 1, 2, 3)
+    else:
+        along_size, across_size = substation.height, substation.width
+        columns = (1, 0, 3, 2)
+    
+    placed_rects = np.asarray(placed_rects, dtype=float).reshape(-1, 4)
+    placed_along, placed_across, placed_along_size, placed_across_size = (placed_rects[:, i] for i in columns)
+    # 고정 방향으로 이격거리를 만족하지 못하는 건물만 이동 방향을 막는다
+    overlap = ((fixed + across_size + min_distance > placed_across) &
+               (placed_across + placed_across_size + min_distance > fixed))
+    blocked = list(zip((placed_along[overlap] - along_size - min_distance).tolist(),
+                       (placed_along[overlap] + placed_along_size[overlap] + min_distance).tolist()))
+    
+    if site_polygon is not None:
+        # 띠 영역은 변전소 높이(폭) 전체를 차지하므로 폴리곤 밖 조각과 이동 방향 범위가 겹치면 포함될 수 없다
+        from shapely.geometry import box
+        band = box(*_substation_line_window(line, substation))
+        outside = band.difference(prepare_polygon(site_polygon).polygon)
+        for piece in getattr(outside, 'geoms', [outside]):
+            if piece.is_empty or piece.area <= 0:
+                continue
+            minx, miny, maxx, maxy = piece.bounds
+            start, end = (minx, maxx) if line['horizontal'] else (miny, maxy)
+            blocked.append((start - along_size, end))
+    
+    return _subtract_open_intervals(low, high, blocked)
+
+def _nearest_interval_positions(intervals: List[Tuple[float, float]], optimal: float) -> List[Tuple[float, float, float]]:
+    """구간별로 최적 위치에 가장 가까운 점을 (위치, 구간 시작, 구간 끝) 으로, 가까운 순서(동거리면 + 방향 우선)로 정렬"""
+    nearest = [(min(max(optimal, start), end), start, end) for start, end in intervals]
+    return sorted(nearest, key=lambda item: (abs(item[0] - optimal), item[0] < optimal))
+
+def _find_exact_substation_position(line: Dict, substation, spatial_index,
+                                    site_region: Optional[PreparedPolygon]) -> Optional[float]:
+    """가능 구간 중 최적 위치에 가장 가까운 이동 좌표 (구간 끝점의 부동소수점 오차는 안쪽으로 조금씩 옮겨 보정)"""
+    # 변을 따라 움직이는 탐색 영역 주변의 건물만 가져와 구간 계산
+    placed_rects = spatial_index.nearby_rects(*_substation_line_window(line, substation))
+    min_distance = spatial_index.min_distance
+    intervals = find_substation_intervals(line, substation, placed_rects, site_region, min_distance)
+    placed_list = placed_rects.tolist()
+    for position, start, end in _nearest_interval_positions(intervals, line['optimal']):
+        inward = end if position <= (start + end) / 2 else start
+        for _ in range(8):
+            rect = _substation_line_rects(line, substation, np.array([position]))[0].tolist()
+            if (is_rect_clear(rect, placed_list, min_distance) and
+                    (site_region is None or site_region.contains_rect(*rect))):
+                return position
+            if position == inward:
+                break
+            position = float(np.nextafter(position, inward))
+    return None
+
+# step 탐색에서 배열을 만들지 않고 하나씩 검사할 앞쪽 후보 수 (대부분 최적 위치 근처에서 바로 찾으므로)
+SUBSTATION_SCALAR_CANDIDATES = 4
+
+def _find_step_substation_position(line: Dict, substation, spatial_index,
+                                   site_region: Optional[PreparedPolygon]) -> Optional[float]:
+    """최적 위치에서 10m 간격으로 +, - 번갈아 가며 탐색한 첫 번째 가능 위치의 이동 좌표
+
+    앞쪽 SUBSTATION_SCALAR_CANDIDATES 개는 하나씩 검사하고, 나머지는 점점 커지는 블록 단위로 일괄 검사한다.
+    """
+    low, high, optimal = line['low'], line['high'], line['optimal']
+    candidate_count = 2 * len(range(0, int(np.ceil(line['search_range'])), 10))
+    for index in range(min(SUBSTATION_SCALAR_CANDIDATES, candidate_count)):
+        along = optimal + (index // 2) * 10 * (1 if index % 2 == 0 else -1)
+        if not low <= along <= high:
+            continue
+        x, y = (along, line['fixed']) if line['horizontal'] else (line['fixed'], along)
+        if (spatial_index.is_clear(x, y, substation.width, substation.height) and
+                (site_region is None or site_region.contains_rect(x, y, substation.width, substation.height))):
+            return along
+    if candidate_count <= SUBSTATION_SCALAR_CANDIDATES:
+        return None
+    
+    steps = np.arange(SUBSTATION_SCALAR_CANDIDATES // 2 * 10, line['search_range'], 10)
+    offsets = np.column_stack([steps, -steps]).ravel()
+    along = optimal + offsets
+    in_range = (low <= along) & (along <= high)
+    if not in_range.any():
+        return None
+    candidates = _substation_line_rects(line, substation, along)
+    
+    # 변을 따라 움직이는 탐색 영역 주변의 건물만 한 번 조회하여 블록 단위로 검사
+    is_clear = spatial_index.clear_checker(*_substation_line_window(line, substation))
+    for start, end in _search_blocks(len(along), first_size=4):
+        valid = in_range[start:end]
+        if valid.any():
+            valid = valid & is_clear(candidates[start:end])
+        if site_region is not None and valid.any():
+            valid[valid] = site_region.contains_rects(candidates[start:end][valid])
+        if valid.any():
+            return float(along[start + int(np.argmax(valid))])
+    return None
+
+def _placed_buildings_index(prod_x: float, prod_y: float, prod_w: float, prod_h: float,
+                            annex_positions: Dict, annex_buildings: List,
+                            guide_positions: Dict, guide_buildings: List,
+                            parking_positions: Dict, parking_buildings: List,
+                            setback: float = SETBACK) -> SpatialIndex:
+    """생산동, 부속동, 안내동, 주차장을 등록한 공간 인덱스"""
+    spatial_index = SpatialIndex(min_distance=setback)
+    spatial_index.insert('Production', prod_x, prod_y, prod_w, prod_h)
+    for positions, buildings in [(annex_positions, annex_buildings), (guide_positions, guide_buildings),
+                                 (parking_positions, parking_buildings)]:
+        for building in buildings:
+            if building.name in positions:
+                spatial_index.insert(building.name, *positions[building.name], building.width, building.height)
+    return spatial_index
+
+@traced()
 def find_valid_substation_positions(prod_x: float, prod_y: float, prod_w: float, prod_h: float,
                                     annex_positions: Dict, annex_buildings: List,
                                     guide_positions: Dict, guide_buildings: List,
                                     parking_positions: Dict, parking_buildings: List,
                                     substation, site_w: float, site_h: float,
                                     gates: List[Tuple[float, float]],
-                                    site_polygon: Optional[Polygon] = None) -> List[Tuple[float, float, str]]:
-    """출입구가 없는 변에 부속동 그룹 중심과 정렬하여 변전소 배치"""
+                                    site_polygon: Optional['Polygon'] = None,
+                                    spatial_index=None,
+                                    mode: str = 'step',
+                                    stats: Optional[LayoutStats] = None,
+                                    setback: float = SETBACK) -> List[Tuple[float, float, str]]:
+    """출입구가 없는 변에 부속동 그룹 중심과 정렬하여 변전소 배치
+
+    site_polygon: 부지 폴리곤 (Polygon 또는 PreparedPolygon, 직사각형 부지는 None)
+    spatial_index: 배치된 모든 건물이 등록된 충돌 검사 인덱스 (SpatialIndex 또는 OccupancyGrid, 이미 만든 경우 재사용)
+    mode: 'step' 은 10m 간격 탐색, 'exact' 는 가능 구간에서 부속동 그룹 중심에 가장 가까운 위치를 정확히 계산
+    stats: 전달하면 변별 'substation_<side>' 단계 통계를 누적
+    setback: 부지 경계 이격거리 (spatial_index 를 새로 만들 때는 건물 간 이격거리로도 사용)
+    """
+    if mode not in SUBSTATION_MODES:
+        raise ValueError(f"알 수 없는 변전소 탐색 방식: {mode}")
+    site_region = prepare_polygon(site_polygon)
     valid_positions = []
     sides_without_gates = get_sides_without_gates(gates, site_w, site_h)
     
     if not sides_without_gates:
         return []
     
-    annex_center_x, annex_center_y = get_annex_group_center(annex_positions, annex_buildings)
+    annex_center = get_annex_group_center(annex_positions, annex_buildings)
+    if spatial_index is None:
+        spatial_index = _placed_buildings_index(prod_x, prod_y, prod_w, prod_h, annex_positions, annex_buildings,
+                                                guide_positions, guide_buildings, parking_positions, parking_buildings,
+                                                setback)
     
+    find_position = _find_exact_substation_position if mode == 'exact' else _find_step_substation_position
     for side in sides_without_gates:
-        if side == 'top':
-            substation_y = site_h - substation.height - SETBACK
-            optimal_x = annex_center_x - substation.width / 2
-        elif side == 'bottom':
-            substation_y = SETBACK
-            optimal_x = annex_center_x - substation.width / 2
-        elif side == 'left':
-            substation_x = SETBACK
-            optimal_y = annex_center_y - substation.height / 2
-            optimal_x, substation_y = substation_x, optimal_y
-        else:  # right
-            substation_x = site_w - substation.width - SETBACK
-            optimal_y = annex_center_y - substation.height / 2
-            optimal_x, substation_y = substation_x, optimal_y
-        
-        # 위치 탐색
-        if side in ['top', 'bottom']:
-            search_range = int(site_w - 2*SETBACK)
-            for x_offset in range(0, search_range, 10):
-                for x_candidate in [optimal_x + x_offset, optimal_x - x_offset]:
-                    if (SETBACK <= x_candidate <= site_w - SETBACK - substation.width and
-                        is_valid_substation_position(x_candidate, substation_y, substation,
-                                                     prod_x, prod_y, prod_w, prod_h,
-                                                     annex_positions, annex_buildings,
-                                                     guide_positions, guide_buildings,
-                                                     parking_positions, parking_buildings) and
-                        (site_polygon is None or is_building_inside_polygon(x_candidate, substation_y, substation.width, substation.height, site_polygon))):
-                        valid_positions.append((x_candidate, substation_y, side))
-                        break
-                else:
-                    continue
-                break
+        started = perf_counter() if stats is not None else None
+        line = get_substation_search_line(side, substation, site_w, site_h, annex_center, setback)
+        position = find_position(line, substation, spatial_index, site_region)
+        if stats is not None:
+            stats.record(f'substation_{side}', 1, int(position is not None), perf_counter() - started,
+                         no_position=int(position is None))
+        if position is None:
+            continue
+        position = float(position)
+        if line['horizontal']:
+            valid_positions.append((position, line['fixed'], side))
         else:
-            search_range = int(site_h - 2*SETBACK)
-            for y_offset in range(0, search_range, 10):
-                for y_candidate in [optimal_y + y_offset, optimal_y - y_offset]:
-                    if (SETBACK <= y_candidate <= site_h - SETBACK - substation.height and
-                        is_valid_substation_position(optimal_x, y_candidate, substation,
-                                                     prod_x, prod_y, prod_w, prod_h,
-                                                     annex_positions, annex_buildings,
-                                                     guide_positions, guide_buildings,
-                                                     parking_positions, parking_buildings) and
-                        (site_polygon is None or is_building_inside_polygon(optimal_x, y_candidate, substation.width, substation.height, site_polygon))):
-                        valid_positions.append((optimal_x, y_candidate, side))
-                        break
-                else:
-                    continue
-                break
+            valid_positions.append((line['fixed'], position, side))
     
     return valid_positions
 
-def find_max_square_area(site_w: float, site_h: float, 
-                         buildings_positions: List[Tuple[float, float]], 
-                         buildings_sizes: List[Tuple[float, float]], 
-                         site_polygon: Optional[Polygon] = None,
-                         setback: float = SETBACK) -> Tuple[Optional[float], Optional[float], float]:
-    
-    grid_size = 1
-    max_side = 0
-    max_pos = (None, None)
+def list_substation_intervals(prod_x: float, prod_y: float, prod_w: float, prod_h: float,
+                              annex_positions: Dict, annex_buildings: List,
+                              guide_positions: Dict, guide_buildings: List,
+                              parking_positions: Dict, parking_buildings: List,
+                              substation, site_w: float, site_h: float,
+                              gates: List[Tuple[float, float]],
+                              site_polygon: Optional['Polygon'] = None,
+                              setback: float = SETBACK) -> Dict[str, Dict]:
+    """출입구가 없는 변마다 변전소를 놓을 수 있는 모든 구간
+
+    반환: {변: {'fixed': 고정 좌표, 'optimal': 최적 이동 좌표, 'intervals': [(시작, 끝), ...]}}
+    """
+    spatial_index = _placed_buildings_index(prod_x, prod_y, prod_w, prod_h, annex_positions, annex_buildings,
+                                            guide_positions, guide_buildings, parking_positions, parking_buildings,
+                                            setback)
+    annex_center = get_annex_group_center(annex_positions, annex_buildings)
+    site_region = prepare_polygon(site_polygon)
+    side_intervals = {}
+    for side in get_sides_without_gates(gates, site_w, site_h):
+        line = get_substation_search_line(side, substation, site_w, site_h, annex_center, setback)
+        placed_rects = spatial_index.nearby_rects(*_substation_line_window(line, substation))
+        side_intervals[side] = {'fixed': line['fixed'], 'optimal': float(line['optimal']),
+                                'intervals': find_substation_intervals(line, substation, placed_rects, site_region,
+                                                                       setback)}
+    return side_intervals
+
+# Future Area 탐색 격자 크기 (m)
+FUTURE_AREA_GRID_SIZE = 1
+
+def future_area_grid(site_w: float, site_h: float, site_polygon=None,
+                     setback: float = SETBACK) -> np.ndarray:
+    """Future Area 탐색용 격자 (부지 경계 이격거리와 polygon 외부를 제외한 빈 칸이 True)
 
+    site_polygon: 부지 폴리곤 (Polygon 또는 PreparedPolygon, 직사각형 부지는 None)
+    """
+    grid_size = FUTURE_AREA_GRID_SIZE
     grid_w = int(site_w / grid_size) + 1
     grid_h = int(site_h / grid_size) + 1
     grid = np.ones((grid_w, grid_h), dtype=bool)
 
-    # 경계 setback 적용
+    # 경계 setback 적용 (한 칸보다 작으면 제외할 칸이 없다 - grid[-0:] 은 전체이므로 건너뜀)
     setback_grid = int(setback / grid_size)
-    grid[:setback_grid, :] = False
-    grid[-setback_grid:, :] = False
-    grid[:, :setback_grid] = False
-    grid[:, -setback_grid:] = False
+    if setback_grid > 0:
+        grid[:setback_grid, :] = False
+        grid[-setback_grid:, :] = False
+        grid[:, :setback_grid] = False
+        grid[:, -setback_grid:] = False
 
-    # 건물 영역 마킹
+    # polygon 마스킹 (polygon 내부만 True 유지, 아직 비어 있는 칸만 일괄 검사)
+    if site_polygon is not None:
+        cell_i, cell_j = np.nonzero(grid)
+        grid[cell_i, cell_j] = prepare_polygon(site_polygon).contains_points(cell_i * grid_size, cell_j * grid_size)
+    return grid
+
+def mark_buildings_on_grid(grid: np.ndarray, buildings_positions: List[Tuple[float, float]],
+                           buildings_sizes: List[Tuple[float, float]], setback: float = SETBACK) -> np.ndarray:
+    """건물과 주변 이격거리 영역을 격자에서 제외 (grid 를 직접 변경하고 반환)"""
+    grid_size = FUTURE_AREA_GRID_SIZE
+    grid_w, grid_h = grid.shape
     for (x, y), (w, h) in zip(buildings_positions, buildings_sizes):
         start_x = max(0, int((x - setback) / grid_size))
         end_x = min(grid_w - 1, int(np.ceil((x + w + setback) / grid_size)))
         start_y = max(0, int((y - setback) / grid_size))
         end_y = min(grid_h - 1, int(np.ceil((y + h + setback) / grid_size)))
         grid[start_x:end_x + 1, start_y:end_y + 1] = False
+    return grid
 
-    # polygon 마스킹 (polygon 내부만 True 유지)
-    if site_polygon:
-        for i in range(grid_w):
-            for j in range(grid_h):
-                point = Point(i * grid_size, j * grid_size)
-                if not site_polygon.contains(point):
-                    grid[i, j] = False
-
-    # 최대 정사각형 찾기 (DP)
-    dp = np.zeros_like(grid, dtype=int)
-    for i in range(grid_w):
-        for j in range(grid_h):
-            if grid[i, j]:
-                if i == 0 or j == 0:
-                    dp[i, j] = 1
-                else:
-                    dp[i, j] = min(dp[i-1, j], dp[i, j-1], dp[i-1, j-1]) + 1
-                
-                if dp[i, j] > max_side:
-                    max_side = dp[i, j]
-                    max_pos = (i - max_side + 1, j - max_side + 1)
+def _run_lengths(grid: np.ndarray, axis: int) -> np.ndarray:
+    """axis 방향으로 각 칸에서 끝나는 연속된 True 칸 수"""
+    index_shape = [1, 1]
+    index_shape[axis] = grid.shape[axis]
+    index = np.arange(grid.shape[axis], dtype=np.int32).reshape(index_shape)
+    last_blocked = np.where(grid, np.int32(-1), index)
+    np.maximum.accumulate(last_blocked, axis=axis, out=last_blocked)
+    return index - last_blocked
+
+def find_max_square_on_grid(grid: np.ndarray) -> Tuple[Optional[float], Optional[float], float]:
+    """격자의 True 칸으로 만들 수 있는 최대 정사각형 (x, y, 한 변 길이), 없으면 (None, None, 0)
 
-    if max_pos == (None, None) or max_side == 0:
+    (i, j) 에서 끝나는 최대 정사각형 = min(대각선 이전 칸 + 1, i 방향 연속 길이, j 방향 연속 길이) 이므로
+    행 단위로 한 번에 계산한다. 같은 크기가 여러 개면 행 우선 순서로 처음 나온 위치를 반환한다.
+    """
+    grid_size = FUTURE_AREA_GRID_SIZE
+    grid_w, grid_h = grid.shape
+    run_i = _run_lengths(grid, axis=0)
+    run_j = _run_lengths(grid, axis=1)
+    run_min = np.minimum(run_i, run_j)
+
+    dp = np.zeros(grid.shape, dtype=np.int32)
+    dp[0] = grid[0]
+    dp[:, 0] = grid[:, 0]
+    for i in range(1, grid_w):
+        row = dp[i, 1:]
+        np.add(dp[i - 1, :-1], 1, out=row)
+        np.minimum(row, run_min[i, 1:], out=row)
+
+    flat_index = int(np.argmax(dp))
+    max_side = int(dp.flat[flat_index])
+    if max_side == 0:
         return None, None, 0
-    
-    x_pos = max_pos[0] * grid_size
-    y_pos = max_pos[1] * grid_size
-    actual_size = max_side * grid_size
-    return x_pos, y_pos, actual_size
+    i, j = divmod(flat_index, grid_h)
+    return (i - max_side + 1) * grid_size, (j - max_side + 1) * grid_size, max_side * grid_size
+
+@traced()
+def find_max_square_area(site_w: float, site_h: float, 
+                         buildings_positions: List[Tuple[float, float]], 
+                         buildings_sizes: List[Tuple[float, float]], 
+                         site_polygon: Optional['Polygon'] = None,
+                         setback: float = SETBACK) -> Tuple[Optional[float], Optional[float], float]:
+    """배치 후 남는 여유 부지(Future Area)의 최대 정사각형 (x, y, 한 변 길이)"""
+    grid = future_area_grid(site_w, site_h, site_polygon, setback)
+    mark_buildings_on_grid(grid, buildings_positions, buildings_sizes, setback)
+    return find_max_square_on_grid(grid)
+
+class FutureAreaCache:
+    """Future Area 격자 중 배치마다 같은 부분을 미리 적용해 두고 재사용
+
+    부지 경계 이격거리와 polygon 외부는 한 번만, 주차장과 안내동은 위치 조합별로 한 번만 격자에 반영하고
+    배치마다 생산동, 부속동, 변전소만 복사한 격자에 추가로 표시한다. (find_max_square_area 와 같은 결과)
+    """
+
+    def __init__(self, buildings: Dict, setback: float = SETBACK, max_static_grids: int = 16):
+        self.buildings = buildings
+        self.setback = setback
+        self.max_static_grids = max_static_grids
+        site_w, site_h, site_polygon = get_site_geometry(buildings)
+        self.site_grid = future_area_grid(site_w, site_h, site_polygon, setback)
+        # 건물이 하나도 없을 때의 최대 정사각형 한 변 (어떤 배치의 Future Area 도 이보다 클 수 없다)
+        self.max_size = find_max_square_on_grid(self.site_grid)[2]
+        self.static_grids: Dict[Tuple, np.ndarray] = {}
+
+    def _static_grid(self, layout: Dict) -> np.ndarray:
+        """주차장과 안내동까지 반영한 격자 (위치 조합별로 캐시)"""
+        buildings = self.buildings
+        static_buildings = buildings['parking_buildings'] + buildings['guide_buildings']
+        positions = tuple(tuple(layout['parking'][building.name]) for building in buildings['parking_buildings']) + \
+                    tuple(tuple(layout['guides'][building.name]) for building in buildings['guide_buildings'])
+        grid = self.static_grids.get(positions)
+        if grid is None:
+            if len(self.static_grids) >= self.max_static_grids:
+                # 가장 먼저 만든 조합부터 제거
+                del self.static_grids[next(iter(self.static_grids))]
+            sizes = [(building.width, building.height) for building in static_buildings]
+            grid = mark_buildings_on_grid(self.site_grid.copy(), positions, sizes, self.setback)
+            self.static_grids[positions] = grid
+        return grid
+
+    @traced()
+    def find(self, layout: Dict) -> Tuple[Optional[float], Optional[float], float]:
+        """배치 케이스의 Future Area 최대 정사각형 (x, y, 한 변 길이)"""
+        buildings = self.buildings
+        prod = layout['production']
+        sub = layout['substation']
+        annex_positions = layout['annex_group']['positions']
+        positions = [(prod['x'], prod['y']), (sub['x'], sub['y'])]
+        sizes = [(prod['width'], prod['height']), (buildings['substation'].width, buildings['substation'].height)]
+        for building in buildings['annex_buildings']:
+            positions.append(annex_positions[building.name])
+            sizes.append((building.width, building.height))
+        
+        grid = mark_buildings_on_grid(self._static_grid(layout).copy(), positions, sizes, self.setback)
+        return find_max_square_on_grid(grid)
@@ -0,0 +1,191 @@
+# layoutset.py: 배치 케이스를 열 단위 NumPy 구조 배열로 보관하는 컨테이너
+
+import numpy as np
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Tuple
+from layout import iter_layouts, new_failure_reasons
+from utils import get_production_short_edge_centers
+
+ORIENTATIONS = ('horizontal', 'vertical')
+SIDES = ('top', 'bottom', 'left', 'right')
+
+class LayoutView(Mapping):
+    """LayoutSet 한 행을 기존 레이아웃 dict 처럼 읽는 지연 뷰 (키를 읽을 때 해당 부분만 만든다)"""
+
+    _keys = ('id', 'production', 'annex_group', 'substation', 'guides', 'parking', 'gates', 'gate_distances')
+
+    def __init__(self, layout_set: 'LayoutSet', index: int):
+        self._set = layout_set
+        self._row = layout_set.rows[index]
+
+    def __getitem__(self, key):
+        row, layout_set = self._row, self._set
+        if key == 'id':
+            return int(row['id'])
+        if key == 'production':
+            return {'x': float(row['prod_x']), 'y': float(row['prod_y']),
+                    'width': float(row['prod_w']), 'height': float(row['prod_h']),
+                    'rotated': bool(row['rotated']), 'orientation': ORIENTATIONS[row['orientation']]}
+        if key == 'annex_group':
+            return {'side': SIDES[row['side']],
+                    'positions': {name: (float(x), float(y)) for name, x, y in
+                                  zip(layout_set.annex_names, row['annex_x'], row['annex_y'])}}
+        if key == 'substation':
+            return {'x': float(row['sub_x']), 'y': float(row['sub_y']), 'side': SIDES[row['sub_side']]}
+        if key == 'guides':
+            return {name: (float(x), float(y)) for name, x, y in
+                    zip(layout_set.guide_names, row['guide_x'], row['guide_y'])}
+        if key == 'parking':
+            return layout_set.parking
+        if key == 'gates':
+            return layout_set.gates
+        if key == 'gate_distances':
+            centers = get_production_short_edge_centers(float(row['prod_x']), float(row['prod_y']),
+                                                        float(row['prod_w']), float(row['prod_h']))
+            return [{'gate_id': i + 1, 'gate_pos': gate, 'closest_center': centers[center_index],
+                     'distance': float(gate_distance)}
+                    for i, (gate, center_index, gate_distance) in
+                    enumerate(zip(layout_set.gates, row['gate_center'], row['gate_distance']))]
+        if key == 'score' and 'score' in layout_set.rows.dtype.names:
+            return float(row['score'])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._keys
+        if 'score' in self._set.rows.dtype.names:
+            yield 'score'
+
+    def __len__(self) -> int:
+        return len(self._keys) + ('score' in self._set.rows.dtype.names)
+
+class LayoutSet:
+    """배치 케이스 한 건을 구조 배열 한 행으로 보관 (부속동/안내동 좌표와 출입구 거리는 고정 길이 열)
+
+    모든 배치에 공통인 주차장 배치, 출입구, 건물 이름 순서는 한 번만 보관한다.
+    정수/마스크/슬라이스 인덱싱과 정렬은 새 LayoutSet 을 반환하고, 열 이름으로 인덱싱하면 열 배열을 반환한다.
+    정수 인덱싱과 반복은 기존 레이아웃 dict 와 같은 키를 가진 LayoutView 를 돌려준다.
+    """
+
+    def __init__(self, rows: np.ndarray, annex_names: List[str], guide_names: List[str],
+                 parking: Dict[str, Tuple[float, float]], gates: List[Tuple[float, float]]):
+        self.rows = rows
+        self.annex_names = annex_names
+        self.guide_names = guide_names
+        self.parking = parking
+        self.gates = gates
+
+    @staticmethod
+    def row_dtype(annex_count: int, guide_count: int, gate_count: int) -> np.dtype:
+        return np.dtype([
+            ('id', np.int64), ('prod_x', np.float64), ('prod_y', np.float64),
+            ('prod_w', np.float64), ('prod_h', np.float64), ('rotated', np.bool_), ('orientation', np.int8),
+            ('side', np.int8), ('sub_x', np.float64), ('sub_y', np.float64), ('sub_side', np.int8),
+            ('annex_x', np.float64, (annex_count,)), ('annex_y', np.float64, (annex_count,)),
+            ('guide_x', np.float64, (guide_count,)), ('guide_y', np.float64, (guide_count,)),
+            ('gate_distance', np.float64, (gate_count,)), ('gate_center', np.int8, (gate_count,))
+        ])
+
+    @classmethod
+    def from_layouts(cls, layouts: Iterable[Dict], buildings: Dict, chunk_size: int = 4096) -> 'LayoutSet':
+        """레이아웃 dict 들을 받아 구조 배열로 옮겨 담음 (스트리밍 입력은 chunk_size 행 단위로 채운다)"""
+        annex_names = [building.name for building in buildings['annex_buildings']]
+        gates = list(buildings['gates'])
+        guide_names, parking = None, {}
+        dtype = None
+        chunks, chunk, filled = [], None, 0
+        for layout in layouts:
+            if dtype is None:
+                guide_names = list(layout['guides'])
+                parking = layout['parking']
+                dtype = cls.row_dtype(len(annex_names), len(guide_names), len(gates))
+            if chunk is None or filled == len(chunk):
+                if chunk is not None:
+                    chunks.append(chunk)
+                chunk, filled = np.zeros(chunk_size, dtype=dtype), 0
+            row = chunk[filled]
+            prod = layout['production']
+            substation = layout['substation']
+            annex_positions = layout['annex_group']['positions']
+            guides = layout['guides']
+            row['id'] = layout['id']
+            row['prod_x'], row['prod_y'] = prod['x'], prod['y']
+            row['prod_w'], row['prod_h'] = prod['width'], prod['height']
+            row['rotated'] = prod['rotated']
+            row['orientation'] = ORIENTATIONS.index(prod['orientation'])
+            row['side'] = SIDES.index(layout['annex_group']['side'])
+            row['sub_x'], row['sub_y'] = substation['x'], substation['y']
+            row['sub_side'] = SIDES.index(substation['side'])
+            row['annex_x'] = [annex_positions[name][0] for name in annex_names]
+            row['annex_y'] = [annex_positions[name][1] for name in annex_names]
+            row['guide_x'] = [guides[name][0] for name in guide_names]
+            row['guide_y'] = [guides[name][1] for name in guide_names]
+            centers = get_production_short_edge_centers(prod['x'], prod['y'], prod['width'], prod['height'])
+            row['gate_distance'] = [gate_distance['distance'] for gate_distance in layout['gate_distances']]
+            row['gate_center'] = [centers.index(gate_distance['closest_center'])
+                                  for gate_distance in layout['gate_distances']]
+            filled += 1
+        if dtype is None:
+            return cls(np.zeros(0, dtype=cls.row_dtype(len(annex_names), 0, len(gates))), annex_names, [], parking, gates)
+        chunks.append(chunk[:filled])
+        return cls(np.concatenate(chunks), annex_names, guide_names, parking, gates)
+
+    def _with_rows(self, rows: np.ndarray) -> 'LayoutSet':
+        return LayoutSet(rows, self.annex_names, self.guide_names, self.parking, self.gates)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.rows[key]
+        if isinstance(key, (int, np.integer)):
+            return LayoutView(self, key)
+        return self._with_rows(self.rows[key])
+
+    def __iter__(self) -> Iterator[LayoutView]:
+        for index in range(len(self.rows)):
+            yield LayoutView(self, index)
+
+    @property
+    def total_gate_distance(self) -> np.ndarray:
+        """배치별 출입구 ~ 생산동 거리 합"""
+        return self.rows['gate_distance'].sum(axis=1)
+
+    def with_column(self, name: str, values) -> 'LayoutSet':
+        """열을 추가(또는 교체)한 새 LayoutSet (예: 'score')"""
+        values = np.asarray(values)
+        if name in self.rows.dtype.names:
+            rows = self.rows.copy()
+        else:
+            descr = self.rows.dtype.descr + [(name, values.dtype.str, values.shape[1:])]
+            rows = np.zeros(len(self.rows), dtype=np.dtype(descr))
+            for field in self.rows.dtype.names:
+                rows[field] = self.rows[field]
+        rows[name] = values
+        return self._with_rows(rows)
+
+    def sorted_by(self, keys, descending: bool = False) -> 'LayoutSet':
+        """열 이름(또는 열 이름 목록, 앞쪽이 우선) 이나 값 배열 기준으로 안정 정렬"""
+        if isinstance(keys, str):
+            keys = [keys]
+        columns = [self.rows[key] if isinstance(key, str) else np.asarray(key) for key in keys]
+        if descending:
+            columns = [-column for column in columns]
+        order = np.lexsort(columns[::-1]) if columns else np.arange(len(self.rows))
+        return self._with_rows(self.rows[order])
+
+    def to_dicts(self) -> List[Dict]:
+        """모든 행을 일반 레이아웃 dict 목록으로 변환"""
+        return [dict(view) for view in self]
+
+def generate_layout_set(buildings: Dict, **iter_options) -> Tuple[LayoutSet, Dict[str, int]]:
+    """generate_all_layouts 와 같은 배치 케이스를 LayoutSet 으로 반환 (레이아웃 dict 는 한 번에 하나만 존재)
+
+    iter_options 는 iter_layouts 에 그대로 전달된다 (workers, substation_mode 등).
+    """
+    failure_reasons = iter_options.pop('failure_reasons', None)
+    if failure_reasons is None:
+        failure_reasons = new_failure_reasons()
+    layout_set = LayoutSet.from_layouts(iter_layouts(buildings, failure_reasons=failure_reasons, **iter_options),
+                                        buildings)
+    return layout_set, failure_reasons
@@ -1,30 +1,75 @@
-# models.py: Building 클래스 정의
+# models.py: 건물 사양(Building)과 배치 기록(Placement) 정의
 
-from typing import Tuple
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+# 건물 종류 (이름에 키워드가 포함되면 해당 종류, 앞쪽 키워드가 우선) 와 종류별 색상
+BUILDING_KINDS = ('Production', 'Admin', 'UT', '신뢰성시험동', '폐기물보관장', '위험물보관장', '오/폐수처리장',
+                  'CESS Control', 'SRP Control', 'Substation', 'Guide', 'Parking')
+KIND_COLORS = ('#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8',
+               '#F7DC6F', '#BB8FCE', '#F39C12', '#E74C3C', '#A9CCE3')
+DEFAULT_COLOR = '#BDC3C7'
+
+@lru_cache(maxsize=None)
+def building_kind(name: str) -> int:
+    """건물 이름으로 종류 인덱스를 판정 (BUILDING_KINDS 인덱스, 해당 없으면 -1)"""
+    for kind, keyword in enumerate(BUILDING_KINDS):
+        if keyword in name:
+            return kind
+    return -1
 
 class Building:
-    def __init__(self, name: str, width: float, height: float):
-        self.name = name
-        self.width = width
-        self.height = height
-        self.x = None
-        self.y = None
-        self.color = self._get_building_color()
-    
-    def _get_building_color(self):
-        color_map = {
-            'Production': '#FF6B6B',
-            'Admin': '#4ECDC4', 'UT': '#45B7D1',
-            '신뢰성시험동': '#96CEB4', '폐기물보관장': '#FFEAA7',
-            '위험물보관장': '#DDA0DD', '오/폐수처리장': '#98D8C8',
-            'CESS Control': '#F7DC6F', 'SRP Control': '#BB8FCE',
-            'Substation': '#F39C12', 'Guide': '#E74C3C',
-            'Parking': '#A9CCE3'
-        }
-        for key in color_map:
-            if key in self.name:
-                return color_map[key]
-        return '#BDC3C7'
-    
+    """건물 사양 (이름, 가로, 세로, 종류) - 변경할 수 없고 값이 같으면 같은 건물로 취급 (해시 가능)
+
+    위치는 갖지 않는다 (배치 위치는 레이아웃 또는 Placement 에 기록).
+    """
+
+    __slots__ = ('name', 'width', 'height', 'kind')
+
+    def __init__(self, name: str, width: float, height: float, kind: Optional[int] = None):
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'width', width)
+        object.__setattr__(self, 'height', height)
+        object.__setattr__(self, 'kind', building_kind(name) if kind is None else kind)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Building 은 변경할 수 없습니다: {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Building 은 변경할 수 없습니다: {name}")
+
+    def _key(self) -> Tuple[str, float, float, int]:
+        return self.name, self.width, self.height, self.kind
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Building) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __reduce__(self):
+        return Building, self._key()
+
+    def __repr__(self) -> str:
+        return f"Building({self.name!r}, {self.width!r}, {self.height!r})"
+
+    @property
+    def color(self) -> str:
+        return KIND_COLORS[self.kind] if self.kind >= 0 else DEFAULT_COLOR
+
+    def rotated(self) -> 'Building':
+        """가로/세로를 바꾼 사양"""
+        return Building(self.name, self.height, self.width, self.kind)
+
+class Placement(NamedTuple):
+    """배치된 건물 한 동 (건물 사양과 좌하단 좌표)"""
+    building: Building
+    x: float
+    y: float
+
+    @property
+    def rect(self) -> Tuple[float, float, float, float]:
+        return self.x, self.y, self.building.width, self.building.height
+
     def get_coords(self) -> Tuple[float, float, float, float]:
-        return self.x, self.y, self.x + self.width, self.y + self.height
+        return self.x, self.y, self.x + self.building.width, self.y + self.building.height
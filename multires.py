@@ -0,0 +1,127 @@
+# multires.py: 거친 격자에서 시작해 유망한 생산동 위치 주변만 점점 세밀한 간격으로 탐색하는 다중 해상도 배치 탐색
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from layout import (prepare_layout_run, filter_feasible_production_points, prune_annex_bounds,
+                    generate_position_layouts, new_failure_reasons, FutureAreaCache)
+from ranking import DEFAULT_WEIGHTS, layout_metrics, weighted_score
+
+DEFAULT_LEVELS = (100, 25, 5, 1)  # 레벨별 생산동 후보 간격 (m)
+DEFAULT_LEVEL_BUDGET = 400        # 세분화 레벨마다 새로 평가할 생산동 후보 위치 최대 수
+
+def _level_candidates(run: Dict, step: float, seeds: List[Tuple[int, float, float]],
+                      radius: Optional[float]) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+    """후보 위치 묶음 (방향 인덱스, x 배열, y 배열) 목록
+
+    seeds 가 없으면 방향별로 부지 전체를 step 간격으로 만들고, 있으면 seeds 순서(점수 내림차순)대로
+    방향과 무관하게 각 seed 주변 ±radius 범위를 step 간격으로 만든다 (같은 seed 는 한 번만).
+    """
+    setback = run['setback']
+    # 방향별 생산동 좌하단 좌표 범위 (부지에 들어가지 않는 방향은 None)
+    bounds = []
+    for prod_w, prod_h, _, _ in run['prod_orientations']:
+        max_prod_x = run['site_w'] - prod_w - setback
+        max_prod_y = run['site_h'] - prod_h - setback
+        bounds.append(None if max_prod_x < setback or max_prod_y < setback else (max_prod_x, max_prod_y))
+
+    candidates = []
+    if radius is None:
+        for orientation_index, bound in enumerate(bounds):
+            if bound is None:
+                continue
+            grid_x, grid_y = np.meshgrid(np.arange(setback, bound[0] + 1, step),
+                                         np.arange(setback, bound[1] + 1, step), indexing='ij')
+            candidates.append((orientation_index, grid_x.ravel(), grid_y.ravel()))
+        return candidates
+
+    offsets = np.arange(-(radius // step) * step, radius + step / 2, step)
+    seen = set()
+    for orientation_index, seed_x, seed_y in seeds:
+        key = (orientation_index, round(seed_x, 6), round(seed_y, 6))
+        bound = bounds[orientation_index]
+        if bound is None or key in seen:
+            continue
+        seen.add(key)
+        max_prod_x, max_prod_y = bound
+        grid_x, grid_y = np.meshgrid(seed_x + offsets, seed_y + offsets, indexing='ij')
+        grid_x, grid_y = grid_x.ravel(), grid_y.ravel()
+        inside = (setback <= grid_x) & (grid_x <= max_prod_x) & (setback <= grid_y) & (grid_y <= max_prod_y)
+        candidates.append((orientation_index, grid_x[inside], grid_y[inside]))
+    return candidates
+
+def multires_layouts(buildings: Dict, levels: Sequence[float] = DEFAULT_LEVELS,
+                     budget: int = DEFAULT_LEVEL_BUDGET, k: Optional[int] = None,
+                     weights: Optional[Dict[str, float]] = None,
+                     failure_reasons: Optional[Dict[str, int]] = None,
+                     stats: Optional[List[Dict]] = None, **run_options) -> List[Dict]:
+    """거친 격자에서 세밀한 격자로 좁혀 가며 배치 케이스를 탐색하고 점수 내림차순으로 반환
+
+    levels: 레벨별 후보 간격 (첫 레벨은 부지 전체, 이후 레벨은 앞 레벨 간격의 절반 반경 안만 탐색)
+    budget: 세분화 레벨마다 새로 평가할 생산동 후보 위치 최대 수 (점수가 좋은 위치 주변부터 채운다)
+    k: 점수 상위 k개만 반환 (없으면 찾은 배치 전체)
+    weights: 점수 가중치 (ranking.DEFAULT_WEIGHTS 와 같은 형식)
+    failure_reasons: 전달하면 평가한 후보들의 실패 통계를 누적
+    stats: 전달하면 레벨별 {'step', 'candidates', 'feasible', 'layouts'} 를 추가
+    run_options: prepare_layout_run 옵션 (substation_mode, collision_backend, setback, building_spacing 등)
+    반환 레이아웃에는 'score' 가 추가되며, id 는 레벨 순서대로 발견한 순서이다.
+    """
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    if failure_reasons is None:
+        failure_reasons = new_failure_reasons()
+    run = prepare_layout_run(buildings, **run_options)
+    future_area = FutureAreaCache(buildings, run['setback']) if weights.get('future_area') else None
+
+    layouts = []
+    evaluated = set()
+    # 평가한 생산동 위치의 (최고 점수, 방향 인덱스, x, y) - 배치가 없는 위치는 -inf
+    position_scores = []
+    previous_step = None
+    for step in levels:
+        # 방향과 무관하게 점수 순 (배치가 없는 위치는 seed 에서 제외, 동점이면 먼저 평가한 위치 우선)
+        seeds = [(orientation_index, x, y) for score, orientation_index, x, y in
+                 sorted(position_scores, key=lambda entry: entry[0], reverse=True) if score > -np.inf]
+        radius = None if previous_step is None else previous_step / 2
+
+        # 좋은 seed 주변부터 중복 없이 budget 개까지 후보 선정
+        level_positions = []
+        for orientation_index, cand_x, cand_y in _level_candidates(run, step, seeds, radius):
+            for x, y in zip(cand_x.tolist(), cand_y.tolist()):
+                key = (orientation_index, round(x, 6), round(y, 6))
+                if key in evaluated:
+                    continue
+                evaluated.add(key)
+                level_positions.append((orientation_index, x, y))
+            if radius is not None and len(level_positions) >= budget:
+                break
+        if radius is not None:
+            level_positions = level_positions[:budget]
+
+        level_stats = {'step': step, 'candidates': len(level_positions), 'feasible': 0, 'layouts': 0}
+        for orientation_index in range(len(run['prod_orientations'])):
+            points = [(x, y) for index, x, y in level_positions if index == orientation_index]
+            if not points:
+                continue
+            prod_w, prod_h = run['prod_orientations'][orientation_index][:2]
+            cand_x, cand_y = np.array(points).T
+            feasible = filter_feasible_production_points(prod_w, prod_h, cand_x, cand_y, run['parking_index'],
+                                                         run['site_region'], failure_reasons)
+            feasible, feasible_sides = prune_annex_bounds(run, orientation_index, feasible, failure_reasons)
+            level_stats['feasible'] += len(feasible)
+            for (prod_x, prod_y), sides in zip(feasible, feasible_sides):
+                best = -np.inf
+                for layout in generate_position_layouts(run, orientation_index, prod_x, prod_y,
+                                                        failure_reasons, sides):
+                    metrics = layout_metrics(layout, buildings, include_future_area=future_area is not None,
+                                             future_area=future_area, setback=run['setback'])
+                    layout['id'] = len(layouts)
+                    layout['score'] = float(weighted_score(metrics, weights))
+                    layouts.append(layout)
+                    best = max(best, layout['score'])
+                    level_stats['layouts'] += 1
+                position_scores.append((best, orientation_index, prod_x, prod_y))
+        if stats is not None:
+            stats.append(level_stats)
+        previous_step = step
+
+    layouts.sort(key=lambda layout: (-layout['score'], layout['id']))
+    return layouts if k is None else layouts[:k]
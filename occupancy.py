@@ -0,0 +1,220 @@
+# occupancy.py: 요약 면적 테이블(summed-area table) 기반 래스터 점유 격자
+
+import math
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from config import SETBACK
+
+def summed_area_table(grid: np.ndarray) -> np.ndarray:
+    """table[i, j] = grid[:i, :j] 의 합 (앞쪽에 0 인 행/열이 붙은 (W+1, H+1) 배열)"""
+    table = np.zeros((grid.shape[0] + 1, grid.shape[1] + 1), dtype=np.int32)
+    np.cumsum(grid, axis=0, dtype=np.int32, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table
+
+def table_sums(table: np.ndarray, i0: np.ndarray, j0: np.ndarray, i1: np.ndarray, j1: np.ndarray) -> np.ndarray:
+    """칸 범위 [i0, i1) x [j0, j1) 들의 합 (범위마다 테이블 네 칸만 읽음)"""
+    return table[i1, j1] - table[i0, j1] - table[i1, j0] + table[i0, j0]
+
+class OccupancyGrid:
+    """부지를 cell_size 격자로 나누어 건물이 차지한 칸을 요약 면적 테이블로 관리하는 점유 격자
+
+    직사각형 질의는 테이블 네 칸만 읽으므로 후보 수에만 비례한다.
+    좌표가 cell_size 의 배수이면 기하 검사(check_setback_distance)와 결과가 같고,
+    아니면 칸 단위로 바깥쪽으로 반올림하므로 항상 보수적으로(충돌 쪽으로) 판단한다.
+    부지(polygon) 포함 검사는 하지 않는다 (PreparedPolygon 이 담당).
+
+    건물을 추가하면 테이블을 바로 다시 만들지 않고 겹침 목록(overlay)에 두었다가
+    목록이 fold_threshold 개를 넘으면 격자에 합쳐 테이블을 다시 만든다.
+    child() 로 만든 격자는 부모의 테이블과 목록을 복사 없이 공유하고 새로 추가한 건물만 따로 보관한다.
+    (자식이 테이블을 다시 만든 뒤에는 부모에 추가한 건물이 자식에 보이지 않으므로, 부모는 자식을 만든 뒤 변경하지 않는다)
+    """
+
+    def __init__(self, site_w: float, site_h: float, cell_size: float = 1,
+                 min_distance: float = SETBACK, fold_threshold: int = 32,
+                 parent: Optional['OccupancyGrid'] = None):
+        self.parent = parent
+        self.names: List[str] = []
+        self.rects: List[Tuple[float, float, float, float]] = []
+        self.overlay: List[Tuple[int, int, int, int]] = []
+        self._overlay_array: Optional[np.ndarray] = None
+        if parent is not None:
+            self.cell_size, self.min_distance = parent.cell_size, parent.min_distance
+            self.fold_threshold = parent.fold_threshold
+            self.cols, self.rows = parent.cols, parent.rows
+            self.occupied = None
+            self.table = None
+            self.on_grid = parent.on_grid
+            return
+
+        self.cell_size = cell_size
+        self.min_distance = min_distance
+        self.fold_threshold = fold_threshold
+        self.cols = int(math.ceil(site_w / cell_size))
+        self.rows = int(math.ceil(site_h / cell_size))
+        self.occupied = np.zeros((self.cols, self.rows), dtype=bool)
+        self.table = summed_area_table(self.occupied)
+        self.on_grid = True
+
+    def child(self) -> 'OccupancyGrid':
+        return OccupancyGrid(0, 0, parent=self)
+
+    def __len__(self) -> int:
+        return len(self.rects) + (len(self.parent) if self.parent is not None else 0)
+
+    def _cell_ranges(self, x0, y0, x1, y1) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """영역 (x0, y0)-(x1, y1) 의 열린 내부와 겹치는 칸 범위 [i0, i1) x [j0, j1) (격자 밖으로 나갈 수 있음)"""
+        cell_size = self.cell_size
+        return (np.floor(np.asarray(x0, dtype=float) / cell_size).astype(np.intp),
+                np.floor(np.asarray(y0, dtype=float) / cell_size).astype(np.intp),
+                np.ceil(np.asarray(x1, dtype=float) / cell_size).astype(np.intp),
+                np.ceil(np.asarray(y1, dtype=float) / cell_size).astype(np.intp))
+
+    def _clip_ranges(self, i0, j0, i1, j1) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """칸 범위를 격자 안으로 잘라냄 (테이블 질의용)"""
+        i0, i1 = np.minimum(np.maximum(i0, 0), self.cols), np.minimum(np.maximum(i1, 0), self.cols)
+        j0, j1 = np.minimum(np.maximum(j0, 0), self.rows), np.minimum(np.maximum(j1, 0), self.rows)
+        return i0, j0, np.maximum(i0, i1), np.maximum(j0, j1)
+
+    def _in_grid(self, cell_range: Tuple[int, int, int, int]) -> bool:
+        i0, j0, i1, j1 = cell_range
+        return 0 <= i0 and i1 <= self.cols and 0 <= j0 and j1 <= self.rows
+
+    def _is_on_grid(self, *values: float) -> bool:
+        return all(float(value / self.cell_size).is_integer() for value in values)
+
+    def insert(self, name: str, x: float, y: float, w: float, h: float):
+        """건물을 등록 (칸 범위만 겹침 목록에 추가하고, 목록이 길어지면 격자에 합침)"""
+        cell_size = self.cell_size
+        self.names.append(name)
+        self.rects.append((x, y, w, h))
+        self.overlay.append((math.floor(x / cell_size), math.floor(y / cell_size),
+                             math.ceil((x + w) / cell_size), math.ceil((y + h) / cell_size)))
+        self._overlay_array = None
+        self.on_grid = self.on_grid and self._is_on_grid(x, y, w, h)
+        if len(self.overlay) > self.fold_threshold:
+            self.fold()
+
+    def _table_layers(self) -> Tuple['OccupancyGrid', List['OccupancyGrid']]:
+        """가장 가까운 테이블을 가진 격자와, 거기까지 겹침 목록을 확인해야 하는 격자들"""
+        layers = []
+        layer = self
+        while True:
+            layers.append(layer)
+            if layer.table is not None:
+                return layer, layers
+            layer = layer.parent
+
+    def fold(self):
+        """겹침 목록의 건물들을 격자에 합치고 요약 면적 테이블을 다시 만든다
+
+        격자 밖으로 나간 건물은 잘라내면 충돌을 놓칠 수 있으므로 겹침 목록에 그대로 남긴다.
+        """
+        owner, layers = self._table_layers()
+        occupied = owner.occupied.copy() if owner is not self else owner.occupied
+        remaining = []
+        for layer in reversed(layers):
+            for cell_range in layer.overlay:
+                if self._in_grid(cell_range):
+                    i0, j0, i1, j1 = cell_range
+                    occupied[i0:i1, j0:j1] = True
+                else:
+                    remaining.append(cell_range)
+        self.occupied = occupied
+        self.table = summed_area_table(occupied)
+        self.overlay = remaining
+        self._overlay_array = None
+
+    def _overlay_ranges(self) -> np.ndarray:
+        """겹침 목록의 칸 범위를 (4, M) 배열로 (추가할 때까지 재사용)"""
+        if self._overlay_array is None:
+            self._overlay_array = np.array(self.overlay, dtype=np.intp).T.reshape(4, -1)
+        return self._overlay_array
+
+    def clear_mask(self, rects) -> np.ndarray:
+        """후보 직사각형 (N,4) 각각이 등록된 모든 건물과 이격거리를 만족하는지 한 번에 검사"""
+        rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+        d = self.min_distance
+        i0, j0, i1, j1 = self._cell_ranges(rects[:, 0] - d, rects[:, 1] - d,
+                                           rects[:, 0] + rects[:, 2] + d, rects[:, 1] + rects[:, 3] + d)
+        owner, layers = self._table_layers()
+        clear = table_sums(owner.table, *self._clip_ranges(i0, j0, i1, j1)) == 0
+        overlay = [layer._overlay_ranges() for layer in layers if layer.overlay]
+        if overlay and clear.any():
+            placed = (overlay[0] if len(overlay) == 1 else np.hstack(overlay))[:, np.newaxis, :]
+            hit = ((i0[:, np.newaxis] < placed[2]) & (placed[0] < i1[:, np.newaxis]) &
+                   (j0[:, np.newaxis] < placed[3]) & (placed[1] < j1[:, np.newaxis]))
+            clear &= ~hit.any(axis=1)
+        return clear
+
+    def clear_checker(self, x0: float, y0: float, x1: float, y1: float) -> Callable[[np.ndarray], np.ndarray]:
+        """영역 안의 후보들을 반복 검사할 때 쓰는 검사 함수 (테이블 질의는 영역과 무관하게 상수 시간)"""
+        return self.clear_mask
+
+    def is_clear(self, x: float, y: float, w: float, h: float) -> bool:
+        return bool(self.clear_mask((x, y, w, h))[0])
+
+    def nearby_rects(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """영역 (x0, y0)-(x1, y1) 과 이격거리 이내로 가까운 건물들의 (M,4) 배열 (부모 건물부터 등록 순서)"""
+        rects = []
+        layer = self
+        while layer is not None:
+            rects = layer.rects + rects
+            layer = layer.parent
+        rects = np.array(rects, dtype=float).reshape(-1, 4)
+        d = self.min_distance
+        near = ((rects[:, 0] - d <= x1) & (x0 <= rects[:, 0] + rects[:, 2] + d) &
+                (rects[:, 1] - d <= y1) & (y0 <= rects[:, 1] + rects[:, 3] + d))
+        return rects[near]
+
+class CheckedOccupancy:
+    """기하 인덱스(SpatialIndex)와 래스터 점유 격자를 함께 갱신하면서 모든 충돌 질의 결과를 비교하는 검증용 인덱스
+
+    반환값은 기하 검사 결과를 따른다. 래스터가 비어 있다고 했는데 기하 검사가 충돌이라고 하거나,
+    모든 좌표가 칸 경계에 있는데 결과가 다르면 AssertionError. 그 밖의 차이(래스터의 보수적 판단)는 mismatches 에 센다.
+    """
+
+    def __init__(self, exact, raster: OccupancyGrid, mismatches: Optional[Dict[str, int]] = None):
+        self.exact = exact
+        self.raster = raster
+        self.mismatches = mismatches if mismatches is not None else {'queries': 0, 'conservative': 0}
+        self.min_distance = exact.min_distance
+
+    def child(self) -> 'CheckedOccupancy':
+        return CheckedOccupancy(self.exact.child(), self.raster.child(), self.mismatches)
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    def insert(self, name: str, x: float, y: float, w: float, h: float):
+        self.exact.insert(name, x, y, w, h)
+        self.raster.insert(name, x, y, w, h)
+
+    def nearby_rects(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        return self.exact.nearby_rects(x0, y0, x1, y1)
+
+    def _compare(self, rects, exact_clear: np.ndarray, raster_clear: np.ndarray) -> np.ndarray:
+        rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+        self.mismatches['queries'] += len(rects)
+        unsafe = raster_clear & ~exact_clear
+        if unsafe.any():
+            raise AssertionError(f"래스터 점유 격자가 충돌을 놓쳤습니다: {rects[unsafe][0].tolist()}")
+        conservative = exact_clear & ~raster_clear
+        if conservative.any():
+            if self.raster.on_grid and self.raster._is_on_grid(self.raster.min_distance):
+                on_grid = np.all(rects / self.raster.cell_size == np.round(rects / self.raster.cell_size), axis=1)
+                if (conservative & on_grid).any():
+                    raise AssertionError(f"칸 경계 좌표에서 래스터 결과가 다릅니다: {rects[conservative & on_grid][0].tolist()}")
+            self.mismatches['conservative'] += int(np.count_nonzero(conservative))
+        return exact_clear
+
+    def clear_mask(self, rects) -> np.ndarray:
+        return self._compare(rects, self.exact.clear_mask(rects), self.raster.clear_mask(rects))
+
+    def clear_checker(self, x0: float, y0: float, x1: float, y1: float) -> Callable[[np.ndarray], np.ndarray]:
+        exact_check = self.exact.clear_checker(x0, y0, x1, y1)
+        raster_check = self.raster.clear_checker(x0, y0, x1, y1)
+        return lambda rects: self._compare(rects, exact_check(rects), raster_check(rects))
+
+    def is_clear(self, x: float, y: float, w: float, h: float) -> bool:
+        return bool(self.clear_mask((x, y, w, h))[0])
@@ -0,0 +1,197 @@
+# pipeline.py: 입력 값 일부만 바뀌었을 때 영향받는 단계만 다시 계산하는 단계별 배치 탐색 파이프라인
+
+from collections import OrderedDict
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+from config import SETBACK, GRID_SIZE, BUILDING_SPACING
+from scenario import create_buildings
+from layout import (prepare_layout_run, new_failure_reasons, find_production_positions, prune_annex_bounds,
+                    place_annex_group, place_guides, place_substation, build_position_layouts)
+from stats import LayoutStats
+from profiling import span, traced
+
+# 단계 의존 그래프 (정의 순서가 실행 순서)
+# after: 앞 단계 (앞 단계 결과가 바뀌면 이 단계도 다시 계산)
+# inputs: 이 단계가 직접 쓰는 입력 값 (DEFAULT_VALUES 의 키)
+# options: 이 단계 결과에 영향을 주는 실행 옵션
+# (collision_backend 는 'raster' 의 보수적 판단이, setback 은 이격거리가 모든 충돌 검사에 영향을 주므로 첫 단계에 둔다)
+STAGE_GRAPH = {
+    'parking': {'after': (), 'inputs': ('site_size', 'site_shape', 'gates', 'parking_count'),
+                'options': ('collision_backend', 'setback')},
+    'production': {'after': ('parking',), 'inputs': ('prod_size',), 'options': ('production_candidates', 'grid_size')},
+    'annex': {'after': ('production',), 'inputs': ('annex_sizes',), 'options': ('building_spacing',)},
+    'guides': {'after': ('annex',), 'inputs': ('main_guide_size', 'other_guide_size'), 'options': ('guide_order',)},
+    'substation': {'after': ('guides',), 'inputs': ('substation_size',), 'options': ('substation_mode',)},
+    'metrics': {'after': ('substation',), 'inputs': (), 'options': ()}
+}
+
+DEFAULT_RUN_OPTIONS = {'substation_mode': 'step', 'collision_backend': 'geometry',
+                       'production_candidates': 'grid', 'guide_order': 'scan',
+                       'setback': SETBACK, 'grid_size': GRID_SIZE, 'building_spacing': BUILDING_SPACING}
+
+def stage_inputs(name: str, run_options: Dict) -> Tuple[str, ...]:
+    """단계 name 이 직접 쓰는 입력 값 키
+
+    'critical' 생산동 후보는 부속동 그룹 크기와 안내동 탐색 영역으로 후보 좌표를 정하므로
+    생산동 단계가 부속동/안내동 크기에도 의존한다 (critical_production_coordinates 참고).
+    """
+    inputs = STAGE_GRAPH[name]['inputs']
+    if name == 'production' and run_options['production_candidates'] == 'critical':
+        inputs += ('annex_sizes', 'main_guide_size', 'other_guide_size')
+    return inputs
+
+def stage_options(name: str, run_options: Dict) -> Tuple[str, ...]:
+    """단계 name 결과에 영향을 주는 실행 옵션 키 ('critical' 생산동 후보는 부속동 간격에도 의존, stage_inputs 참고)"""
+    options = STAGE_GRAPH[name]['options']
+    if name == 'production' and run_options['production_candidates'] == 'critical':
+        options += ('building_spacing',)
+    return options
+
+def _freeze(value):
+    """입력 값을 비교/해시 가능한 값으로 변환 (dict 는 키 순서와 무관, 300 과 300.0 은 같은 값)"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _parking_stage(run: Dict, upstream: Dict, failure_reasons: Dict[str, int], stats: Optional[LayoutStats]) -> Dict:
+    # 주차장 배치는 실행 준비 단계(prepare_layout_run)에서 계산되므로 결과만 기록
+    return run['parking_positions']
+
+def _production_stage(run: Dict, upstream: Dict, failure_reasons: Dict[str, int], stats: Optional[LayoutStats]) -> List:
+    # 방향별 (방향 인덱스, 부지/주차장 조건을 통과한 생산동 위치 또는 None)
+    return [(orientation_index, find_production_positions(run, orientation_index, failure_reasons, stats))
+            for orientation_index in range(len(run['prod_orientations']))]
+
+def _annex_stage(run: Dict, upstream: Dict, failure_reasons: Dict[str, int], stats: Optional[LayoutStats]) -> List:
+    # (방향 인덱스, prod_x, prod_y, side, 부속동 위치, 부속동 사각형) - iter_layouts 와 같은 순서
+    placements = []
+    for orientation_index, production_positions in upstream['production']:
+        if production_positions is None:
+            continue
+        production_positions, position_sides = prune_annex_bounds(
+            run, orientation_index, production_positions, failure_reasons, None, stats)
+        for (prod_x, prod_y), sides in zip(production_positions, position_sides):
+            for side in sides:
+                annex = place_annex_group(run, orientation_index, prod_x, prod_y, side, failure_reasons, stats)
+                if annex is not None:
+                    placements.append((orientation_index, prod_x, prod_y, side) + annex)
+    return placements
+
+def _guides_stage(run: Dict, upstream: Dict, failure_reasons: Dict[str, int], stats: Optional[LayoutStats]) -> List:
+    # (부속동 배치, 생산동/부속동 사각형 배열, 안내동 위치)
+    placements = []
+    for placement in upstream['annex']:
+        orientation_index, prod_x, prod_y, side, annex_positions, annex_rects = placement
+        prod_w, prod_h = run['prod_orientations'][orientation_index][:2]
+        layout_rects = [(prod_x, prod_y, prod_w, prod_h)] + annex_rects
+        guide_positions = place_guides(run, layout_rects, failure_reasons, stats)
+        if guide_positions is not None:
+            placements.append((placement, layout_rects, guide_positions))
+    return placements
+
+def _substation_stage(run: Dict, upstream: Dict, failure_reasons: Dict[str, int], stats: Optional[LayoutStats]) -> List:
+    # (부속동 배치, 안내동 위치, 변전소 위치 목록)
+    placements = []
+    for placement, layout_rects, guide_positions in upstream['guides']:
+        orientation_index, prod_x, prod_y, side, annex_positions, _ = placement
+        substation_positions = place_substation(run, orientation_index, prod_x, prod_y, annex_positions, layout_rects,
+                                                guide_positions, failure_reasons, stats)
+        if substation_positions:
+            placements.append((placement, guide_positions, substation_positions))
+    return placements
+
+def _metrics_stage(run: Dict, upstream: Dict, failure_reasons: Dict[str, int], stats: Optional[LayoutStats]) -> List[Dict]:
+    # 레이아웃 조립과 출입구 ~ 생산동 거리 (id 는 iter_layouts 와 같은 순서로 부여)
+    layouts = []
+    for placement, guide_positions, substation_positions in upstream['substation']:
+        orientation_index, prod_x, prod_y, side, annex_positions, _ = placement
+        layouts.extend(build_position_layouts(run, orientation_index, prod_x, prod_y, side,
+                                              annex_positions, guide_positions, substation_positions))
+    for layout_id, layout in enumerate(layouts):
+        layout['id'] = layout_id
+    return layouts
+
+_STAGE_FUNCTIONS = {
+    'parking': _parking_stage,
+    'production': _production_stage,
+    'annex': _annex_stage,
+    'guides': _guides_stage,
+    'substation': _substation_stage,
+    'metrics': _metrics_stage
+}
+
+class LayoutPipeline:
+    """STAGE_GRAPH 단계마다 결과를 보관하고, 입력이 바뀌면 바뀐 입력을 쓰는 단계와 그 뒤 단계만 다시 계산
+
+    단계 결과는 (앞 단계 지문, 이 단계 입력 값, 옵션) 지문별로 최근 history 개까지 보관하므로
+    값을 바꿨다가 되돌리는 경우에도 다시 계산하지 않는다.
+    결과(레이아웃 id, failure_reasons)는 같은 입력의 iter_layouts 전체 탐색과 같다.
+    """
+
+    def __init__(self, history: int = 4, **run_options):
+        self.run_options = self._run_options(DEFAULT_RUN_OPTIONS, run_options)
+        self.history = history
+        self.outputs = {name: OrderedDict() for name in STAGE_GRAPH}
+        # 마지막 update() 에서 다시 계산한 단계 이름
+        self.last_computed: List[str] = []
+
+    @staticmethod
+    def _run_options(base: Dict, overrides: Dict) -> Dict:
+        unknown = set(overrides) - set(DEFAULT_RUN_OPTIONS)
+        if unknown:
+            raise ValueError(f"알 수 없는 실행 옵션: {sorted(unknown)}")
+        return dict(base, **overrides)
+
+    @traced()
+    def update(self, inputs: Dict, stats: Optional[LayoutStats] = None,
+               **run_options) -> Tuple[List[Dict], Dict[str, int]]:
+        """입력 값(DEFAULT_VALUES 형식)에 대한 (레이아웃 목록, failure_reasons)
+
+        stats: 전달하면 이번에 다시 계산한 단계의 통계만 누적 (보관된 결과를 쓴 단계는 기록하지 않음)
+        run_options: 이번 호출에만 적용할 실행 옵션 (예: setback, building_spacing 파라미터 탐색)
+        반환하는 레이아웃 목록은 보관된 결과와 공유되므로 수정하지 말 것.
+        """
+        run_options = self._run_options(self.run_options, run_options) if run_options else self.run_options
+        run = None
+        fingerprints, results, stage_results = {}, {}, {}
+        computed = []
+        for name, spec in STAGE_GRAPH.items():
+            fingerprint = (tuple(fingerprints[upstream] for upstream in spec['after']),
+                           tuple(_freeze(inputs.get(key)) for key in stage_inputs(name, run_options)),
+                           tuple(run_options[option] for option in stage_options(name, run_options)))
+            fingerprints[name] = fingerprint
+            stored = self.outputs[name]
+            result = stored.get(fingerprint)
+            if result is None:
+                if run is None:
+                    started = perf_counter()
+                    run = prepare_layout_run(create_buildings(inputs), **run_options)
+                    if stats is not None:
+                        stats.record('prepare', 1, 1, perf_counter() - started)
+                failure_reasons = new_failure_reasons()
+                stage_stats = LayoutStats() if stats is not None else None
+                with span(f'pipeline.{name}'):
+                    output = _STAGE_FUNCTIONS[name](run, results, failure_reasons, stage_stats)
+                result = stored[fingerprint] = {'output': output, 'failure_reasons': failure_reasons}
+                while len(stored) > self.history:
+                    stored.popitem(last=False)
+                computed.append(name)
+                if stats is not None:
+                    stats.merge(stage_stats)
+            else:
+                stored.move_to_end(fingerprint)
+            stage_results[name] = result
+            results[name] = result['output']
+        self.last_computed = computed
+
+        failure_reasons = new_failure_reasons()
+        for result in stage_results.values():
+            for reason, count in result['failure_reasons'].items():
+                failure_reasons[reason] += count
+        return results['metrics'], failure_reasons
+
+    def clear(self):
+        for stored in self.outputs.values():
+            stored.clear()
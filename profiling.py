@@ -0,0 +1,129 @@
+# profiling.py: 배치 탐색 단계별 구간(span)을 Chrome trace / Perfetto JSON 파일로 기록하는 선택적 프로파일링 훅
+
+import atexit
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional
+
+# 이 환경 변수에 파일 경로를 지정하면 프로그램 시작부터 종료까지 기록하여 종료 시 저장
+TRACE_ENV = 'LAYOUT_TRACE'
+
+class Tracer:
+    """완료된 구간을 Chrome trace 'X' 이벤트로 모아 JSON 으로 저장"""
+
+    def __init__(self):
+        self.events: List[Dict] = []
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+
+    def add(self, name: str, started: float, ended: float, args: Optional[Dict] = None):
+        event = {'name': name, 'ph': 'X', 'pid': self.pid, 'tid': threading.get_ident(),
+                 'ts': (started - self._origin) * 1e6, 'dur': (ended - started) * 1e6}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as trace_file:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, trace_file, ensure_ascii=False)
+
+# 현재 기록 중인 Tracer (None 이면 모든 훅이 바로 원래 함수를 호출)
+_tracer: Optional[Tracer] = None
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'started')
+
+    def __init__(self, tracer: Tracer, name: str, args: Dict):
+        self.tracer, self.name, self.args = tracer, name, args
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.add(self.name, self.started, time.perf_counter(), self.args)
+        return False
+
+_NO_SPAN = nullcontext()
+
+def span(name: str, **args):
+    """with span('이름'): ... 구간을 기록 (기록 중이 아니면 아무것도 하지 않는 공유 컨텍스트 반환)"""
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return _Span(tracer, name, args)
+
+def traced(name: Optional[str] = None) -> Callable:
+    """함수 호출 전체를 구간으로 기록하는 데코레이터 (생성기 함수는 끝까지 소비될 때까지를 기록)"""
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__qualname__
+        if inspect.isgeneratorfunction(function):
+            @functools.wraps(function)
+            def generator_wrapper(*args, **kwargs):
+                if _tracer is None:
+                    return (yield from function(*args, **kwargs))
+                with _Span(_tracer, span_name, None):
+                    return (yield from function(*args, **kwargs))
+            return generator_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                tracer.add(span_name, started, time.perf_counter())
+        return wrapper
+    return decorator
+
+def enable() -> Tracer:
+    """기록을 시작하고 Tracer 를 반환 (이미 기록 중이면 그 Tracer)"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+def disable() -> Optional[Tracer]:
+    """기록을 멈추고 지금까지 기록한 Tracer 를 반환"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+@contextmanager
+def profile(path: str):
+    """with profile('trace.json'): 블록 안의 구간을 기록하여 path 에 저장 (chrome://tracing, ui.perfetto.dev 에서 열기)
+
+    이미 기록 중(환경 변수나 바깥 profile)이면 그 기록을 이어 쓰고 블록이 끝날 때까지의 내용을 path 에 저장한다.
+
+    프로세스 풀 작업자 안의 구간은 기록되지 않는다 (작업자 결과를 기다린 시간은 부모 구간에 포함).
+    """
+    previous = _tracer
+    tracer = enable()
+    try:
+        yield tracer
+    finally:
+        if previous is None:
+            disable()
+        tracer.write(path)
+
+def _enable_from_env():
+    path = os.environ.get(TRACE_ENV)
+    if not path:
+        return
+    tracer = enable()
+
+    def write_trace():
+        # fork 로 만든 작업자 프로세스는 부모의 Tracer 를 복사해 가지므로 부모만 저장
+        if tracer.pid == os.getpid():
+            tracer.write(path)
+    atexit.register(write_trace)
+
+_enable_from_env()
@@ -0,0 +1,113 @@
+# ranking.py: 배치 케이스 점수 계산 및 상위 K개 선별
+
+import heapq
+from typing import Dict, Iterable, List, Mapping, Optional
+from config import SETBACK
+from layout import iter_layouts, get_buildings_positions_sizes, find_max_square_area, get_site_geometry, FutureAreaCache
+from utils import get_annex_group_center, manhattan_distance
+
+# 지표별 가중치 (점수 = Σ 가중치 x 지표, 클수록 좋은 배치)
+DEFAULT_WEIGHTS = {
+    'gate_distance': -1.0,   # 출입구 ~ 생산동 맨해튼 거리 합 (m, 짧을수록 좋음)
+    'future_area': 1.0,      # 여유 부지(Future Area) 최대 정사각형 면적 (m²)
+    'annex_distance': -1.0   # 부속동 그룹 중심 ~ 생산동 중심 맨해튼 거리 (m)
+}
+
+def layout_future_area(layout: Dict, buildings: Dict, future_area: Optional[FutureAreaCache] = None,
+                       setback: float = SETBACK) -> float:
+    """배치 후 남는 여유 부지(Future Area)의 최대 정사각형 면적
+
+    future_area: 같은 부지의 여러 배치를 평가할 때 재사용하는 격자 캐시 (이격거리는 캐시를 만들 때 정해진다)
+    setback: future_area 가 없을 때 쓰는 이격거리
+    """
+    if future_area is not None:
+        _, _, future_size = future_area.find(layout)
+    else:
+        site_w, site_h, site_polygon = get_site_geometry(buildings)
+        positions, sizes = get_buildings_positions_sizes(layout, buildings)
+        _, _, future_size = find_max_square_area(site_w, site_h, positions, sizes, site_polygon, setback)
+    return future_size * future_size
+
+def layout_metrics(layout: Dict, buildings: Dict, include_future_area: bool = True,
+                   future_area: Optional[FutureAreaCache] = None, setback: float = SETBACK) -> Dict[str, float]:
+    """배치 케이스의 평가 지표 계산 (Future Area 는 계산 비용이 커서 선택적으로 계산)"""
+    prod = layout['production']
+    prod_center = (prod['x'] + prod['width'] / 2, prod['y'] + prod['height'] / 2)
+    annex_center = get_annex_group_center(layout['annex_group']['positions'], buildings['annex_buildings'])
+
+    metrics = {
+        'gate_distance': sum(gate_dist['distance'] for gate_dist in layout['gate_distances']),
+        'annex_distance': manhattan_distance(annex_center, prod_center)
+    }
+    if include_future_area:
+        metrics['future_area'] = layout_future_area(layout, buildings, future_area, setback)
+    return metrics
+
+def weighted_score(metrics: Dict[str, float], weights: Dict[str, float]) -> float:
+    return sum(weight * metrics[name] for name, weight in weights.items() if weight and name in metrics)
+
+def score_layout(layout: Dict, buildings: Dict, weights: Optional[Dict[str, float]] = None,
+                 future_area: Optional[FutureAreaCache] = None, setback: float = SETBACK) -> float:
+    """가중치를 적용한 배치 점수 (클수록 좋음, setback 은 배치를 만들 때의 이격거리)"""
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    metrics = layout_metrics(layout, buildings, include_future_area=bool(weights.get('future_area')),
+                             future_area=future_area, setback=setback)
+    return weighted_score(metrics, weights)
+
+def top_k_layouts(buildings: Dict, k: int, weights: Optional[Dict[str, float]] = None,
+                  **iter_options) -> List[Dict]:
+    """배치 케이스를 스트리밍으로 평가하면서 점수 상위 K개만 크기 K 의 힙에 유지
+
+    동점이면 먼저 만들어진 케이스(iter_layouts 순서, 곧 layout id 가 작은 쪽)가 우선한다.
+    반환 레이아웃에는 'score' 가 추가되며 점수 내림차순으로 정렬된다.
+    iter_options 는 iter_layouts 에 그대로 전달된다 (failure_reasons, workers, setback 등).
+    iter_layouts 의 탐색 모드가 아니라 그 출력에 대한 후처리이므로 모든 배치 케이스는 그대로 만들어지고,
+    점수 상한으로 Future Area 계산만 생략한다.
+    """
+    if k <= 0:
+        return []
+    return rank_top_k(iter_layouts(buildings, **iter_options), buildings, k, weights,
+                      iter_options.get('setback', SETBACK))
+
+def rank_top_k(layouts: Iterable[Mapping], buildings: Dict, k: int,
+               weights: Optional[Dict[str, float]] = None, setback: float = SETBACK) -> List[Dict]:
+    """이미 만들어진 배치 케이스들(레이아웃 dict 또는 LayoutView) 중 점수 상위 K개 (top_k_layouts 참고)
+
+    동점이면 layouts 에서 먼저 나온 케이스가 우선한다 (id 순서와 무관).
+
+    setback: Future Area 계산에 쓰는 이격거리 (배치를 만들 때의 값과 같아야 한다)
+    """
+    if k <= 0:
+        return []
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    future_weight = weights.get('future_area', 0)
+
+    # 부지 경계, 주차장, 안내동이 반영된 Future Area 격자를 모든 케이스가 공유
+    future_area = FutureAreaCache(buildings, setback) if future_weight else None
+    # 빈 부지 격자의 최대 정사각형 면적으로 점수 상한을 계산하여, 힙에 들어갈 수 없는 케이스는 계산 생략
+    # (격자는 축마다 int(크기) + 1 칸이므로 부지 크기에서 이격거리를 뺀 값보다 한 칸 클 수 있다)
+    future_bound = max(0, future_weight * future_area.max_size ** 2) if future_area is not None else 0
+
+    heap = []  # (점수, -순번, layout) 최소 힙: 맨 앞이 현재 K개 중 가장 나쁜 케이스
+    for sequence, layout in enumerate(layouts):
+        metrics = layout_metrics(layout, buildings, include_future_area=False)
+        # 순번은 증가하므로 동점인 새 케이스는 힙에 들어갈 수 없다
+        if len(heap) == k and weighted_score(metrics, weights) + future_bound <= heap[0][0]:
+            continue
+
+        if future_weight:
+            metrics['future_area'] = layout_future_area(layout, buildings, future_area, setback)
+        score = weighted_score(metrics, weights)
+        entry = (score, -sequence, layout)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    ranked = []
+    for score, _, layout in sorted(heap, key=lambda entry: entry[:2], reverse=True):
+        if not isinstance(layout, dict):  # LayoutView 는 읽기 전용
+            layout = dict(layout)
+        layout['score'] = float(score)
+        ranked.append(layout)
+    return ranked
@@ -0,0 +1,108 @@
+# scenario.py: GUI 없이 시나리오(입력 값) 파일을 읽고 건물 객체를 만드는 함수
+
+import copy
+import json
+import os
+from typing import Dict, Iterator, List
+from config import DEFAULT_VALUES
+from models import Building
+from utils import calculate_parking_area, calculate_parking_dimensions, get_main_gate, get_main_guide_size
+
+SCENARIO_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+def create_buildings(inputs: Dict) -> Dict:
+    site_size = inputs['site_size']
+    if isinstance(site_size, list):  # 다각형
+        from shapely.geometry import Polygon  # 다각형 부지에서만 불러온다
+        site_polygon = Polygon(site_size)
+        site_w = site_polygon.bounds[2] - site_polygon.bounds[0]  # 대략적 너비
+        site_h = site_polygon.bounds[3] - site_polygon.bounds[1]  # 대략적 높이
+    else:  # 직사각형
+        site_w, site_h = site_size
+
+    prod_w, prod_h = inputs['prod_size']
+    
+    prod_building = Building('Production', prod_w, prod_h)
+    
+    annex_buildings = [Building(name, width, height) 
+                       for name, (width, height) in inputs['annex_sizes'].items()]
+    
+    main_gate = get_main_gate(inputs['gates'])
+    # Main 안내동은 Main 출입구 위치에 맞게 회전한 크기로 생성
+    main_guide_w, main_guide_h = get_main_guide_size(inputs['main_guide_size'], main_gate)
+    guide_buildings = [Building('안내동1', main_guide_w, main_guide_h)]
+    
+    guide_counter = 2
+    for gate_pos in inputs['gates']:
+        if gate_pos != main_gate:
+            guide_buildings.append(Building(f'안내동{guide_counter}',
+                                            inputs['other_guide_size'][0], 
+                                            inputs['other_guide_size'][1]))
+            guide_counter += 1
+    
+    substation = Building('Substation', inputs['substation_size'][0], inputs['substation_size'][1])
+    
+    total_area, breakdown = calculate_parking_area(inputs['parking_count'])
+    parking_width, parking_length = calculate_parking_dimensions(total_area)
+    parking_buildings = [Building(f'Parking_{i+1}', parking_width, parking_length) for i in range(2)]
+    
+    return {
+        'site_size': site_size,  # 다각형 지원
+        'site_shape': inputs.get('site_shape', '직사각형'),
+        'prod_building': prod_building,
+        'annex_buildings': annex_buildings,
+        'guide_buildings': guide_buildings,
+        'gates': inputs['gates'], 'substation': substation,
+        'parking_buildings': parking_buildings, 'parking_info': breakdown
+    }
+
+def normalize_scenario(values: Dict) -> Dict:
+    """파일에서 읽은 값(JSON 은 튜플이 모두 리스트)을 DEFAULT_VALUES 와 같은 형식으로 정리
+
+    빠진 항목은 DEFAULT_VALUES 로 채운다. site_size 는 (가로, 세로) 튜플이면 직사각형,
+    [(x, y), ...] 꼭짓점 목록이면 다각형 부지이다.
+    """
+    inputs = copy.deepcopy(DEFAULT_VALUES)
+    inputs.update(copy.deepcopy(values))
+    
+    site_size = inputs['site_size']
+    if site_size and isinstance(site_size[0], (list, tuple)):
+        inputs['site_size'] = [tuple(vertex) for vertex in site_size]
+        if inputs.get('site_shape', '직사각형') == '직사각형':
+            inputs['site_shape'] = '다각형'
+    else:
+        inputs['site_size'] = tuple(site_size)
+        inputs['site_shape'] = '직사각형'
+    
+    for key in ('prod_size', 'main_guide_size', 'other_guide_size', 'substation_size'):
+        inputs[key] = tuple(inputs[key])
+    inputs['annex_sizes'] = {name: tuple(size) for name, size in inputs['annex_sizes'].items()}
+    inputs['gates'] = [tuple(gate) for gate in inputs['gates']]
+    inputs['gate_count'] = len(inputs['gates'])
+    return inputs
+
+def load_scenario(path: str) -> Dict:
+    """시나리오 파일(JSON 또는 YAML)을 읽어 정리한 입력 값을 반환 ('name' 항목은 시나리오 이름으로 분리)"""
+    with open(path, encoding='utf-8') as scenario_file:
+        if path.endswith('.json'):
+            values = json.load(scenario_file)
+        else:
+            import yaml  # YAML 시나리오를 쓸 때만 필요
+            values = yaml.safe_load(scenario_file)
+    if not isinstance(values, dict):
+        raise ValueError(f"시나리오 파일은 항목 이름과 값의 사전이어야 합니다: {path}")
+    values = dict(values)
+    name = values.pop('name', os.path.splitext(os.path.basename(path))[0])
+    inputs = normalize_scenario(values)
+    inputs['name'] = name
+    return inputs
+
+def iter_scenario_paths(paths: List[str]) -> Iterator[str]:
+    """파일 경로는 그대로, 디렉터리는 안의 시나리오 파일들을 이름 순으로"""
+    for path in paths:
+        if os.path.isdir(path):
+            for file_name in sorted(os.listdir(path)):
+                if file_name.endswith(SCENARIO_EXTENSIONS):
+                    yield os.path.join(path, file_name)
+        else:
+            yield path
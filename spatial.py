@@ -0,0 +1,160 @@
+# spatial.py: 배치된 건물 충돌 검사용 인덱스와 부지 폴리곤 포함 검사
+
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+from config import SETBACK
+from utils import check_setback_distance, check_setback_distance_batch, is_rect_clear, SETBACK_BATCH_MIN_PAIRS
+
+class SpatialIndex:
+    """배치된 건물 직사각형 목록으로 이격거리 충돌을 검사하는 인덱스
+
+    배치 하나에 놓이는 건물은 주차장을 포함해도 20개 안팎이라 격자 버킷을 관리하는 비용이 검사보다 커서
+    등록한 목록을 그대로 훑는다.
+    child() 로 만든 인덱스는 부모의 건물을 복사 없이 공유하고 새로 배치한 건물만 따로 보관한다.
+    (주차장처럼 모든 배치에 공통인 건물은 한 번만 등록하고, 배치마다 가볍게 확장하기 위함)
+    """
+
+    def __init__(self, min_distance: float = SETBACK, parent: Optional['SpatialIndex'] = None):
+        if parent is not None:
+            min_distance = parent.min_distance
+        self.min_distance = min_distance
+        self.parent = parent
+        self.names: List[str] = []
+        self.rects: List[Tuple[float, float, float, float]] = []
+
+    def child(self) -> 'SpatialIndex':
+        return SpatialIndex(parent=self)
+
+    def __len__(self) -> int:
+        return len(self.rects) + (len(self.parent) if self.parent is not None else 0)
+
+    def insert(self, name: str, x: float, y: float, w: float, h: float):
+        """건물을 등록"""
+        self.names.append(name)
+        self.rects.append((x, y, w, h))
+
+    def all_rects(self) -> List[Tuple[float, float, float, float]]:
+        """등록된 모든 건물 직사각형 (부모 인덱스의 건물부터 등록 순서)"""
+        return (self.parent.all_rects() if self.parent is not None else []) + self.rects
+
+    def nearby(self, x0: float, y0: float, x1: float, y1: float) -> List[Tuple[str, Tuple[float, float, float, float]]]:
+        """영역 (x0, y0)-(x1, y1) 과 이격거리 이내로 가까운 건물들의 (이름, 직사각형) 목록 (등록 순서)"""
+        d = self.min_distance
+        found = self.parent.nearby(x0, y0, x1, y1) if self.parent is not None else []
+        for name, (x, y, w, h) in zip(self.names, self.rects):
+            if x - d <= x1 and x0 <= x + w + d and y - d <= y1 and y0 <= y + h + d:
+                found.append((name, (x, y, w, h)))
+        return found
+
+    def nearby_rects(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """nearby() 결과를 (M,4) 배열로 반환"""
+        return np.array([rect for _, rect in self.nearby(x0, y0, x1, y1)], dtype=float).reshape(-1, 4)
+
+    def first_conflict(self, x: float, y: float, w: float, h: float) -> Optional[str]:
+        """이격거리를 만족하지 못하는 첫 번째 건물 이름 (없으면 None)"""
+        for name, rect in self.nearby(x, y, x + w, y + h):
+            if not check_setback_distance(x, y, w, h, *rect, self.min_distance):
+                return name
+        return None
+
+    def is_clear(self, x: float, y: float, w: float, h: float) -> bool:
+        """직사각형이 등록된 모든 건물과 이격거리를 만족하는지 검사"""
+        layer = self
+        while layer is not None:
+            if not is_rect_clear((x, y, w, h), layer.rects, self.min_distance):
+                return False
+            layer = layer.parent
+        return True
+
+    def clear_checker(self, x0: float, y0: float, x1: float, y1: float) -> Callable[[np.ndarray], np.ndarray]:
+        """영역 (x0, y0)-(x1, y1) 안의 후보들을 반복 검사할 때 쓰는 검사 함수 (주변 건물은 한 번만 조회)"""
+        placed = self.nearby_rects(x0, y0, x1, y1)
+        if not len(placed):
+            return lambda rects: np.ones(len(rects), dtype=bool)
+        return lambda rects: check_setback_distance_batch(rects, placed, self.min_distance)
+
+    def clear_mask(self, rects) -> np.ndarray:
+        """후보 직사각형 (N,4) 각각이 등록된 모든 건물과 이격거리를 만족하는지 한 번에 검사
+
+        후보 수 x 건물 수가 SETBACK_BATCH_MIN_PAIRS 보다 작으면 주변 조회 없이 전체 건물과 하나씩 검사한다.
+        """
+        rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+        if len(rects) * len(self) < SETBACK_BATCH_MIN_PAIRS:
+            placed = self.all_rects()
+            return np.array([is_rect_clear(rect, placed, self.min_distance) for rect in rects.tolist()], dtype=bool)
+        placed = self.nearby_rects(rects[:, 0].min(), rects[:, 1].min(),
+                                   (rects[:, 0] + rects[:, 2]).max(), (rects[:, 1] + rects[:, 3]).max())
+        if not len(placed):
+            return np.ones(len(rects), dtype=bool)
+        return check_setback_distance_batch(rects, placed, self.min_distance)
+
+class PreparedPolygon:
+    """부지 폴리곤의 경계 선분을 배열로 한 번만 준비해 두고 직사각형들의 포함 여부를 일괄 검사
+
+    직사각형이 폴리곤에 포함될 조건 (shapely contains 와 같은 결과):
+    폴리곤 경계 선분이 직사각형 내부(열린 영역)를 지나지 않고, 직사각형 중심이 폴리곤 내부에 있다.
+    후보가 적으면 배열 연산의 고정 비용이 커서 준비된(prepared) shapely 폴리곤으로 검사한다.
+    """
+
+    # 이 개수 미만의 직사각형은 prepared shapely 폴리곤으로 검사
+    small_batch = 100
+
+    def __init__(self, polygon):
+        import shapely  # 다각형 부지에서만 불러온다
+        self.polygon = polygon
+        self.bounds = polygon.bounds
+        self.prepared = shapely.Polygon(polygon.exterior.coords, [ring.coords for ring in polygon.interiors])
+        shapely.prepare(self.prepared)
+        edges = []
+        for ring in [polygon.exterior] + list(polygon.interiors):
+            coords = np.asarray(ring.coords, dtype=float)
+            edges.append(np.hstack([coords[:-1], coords[1:]]))
+        edges = np.vstack(edges)
+        edges = edges[(edges[:, 0] != edges[:, 2]) | (edges[:, 1] != edges[:, 3])]
+        self.ax, self.ay, self.bx, self.by = edges.T
+        self.edge_min_x = np.minimum(self.ax, self.bx)
+        self.edge_max_x = np.maximum(self.ax, self.bx)
+        self.edge_min_y = np.minimum(self.ay, self.by)
+        self.edge_max_y = np.maximum(self.ay, self.by)
+
+    def _cross(self, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+        """점 (N,1) 들이 각 경계 선분의 어느 쪽에 있는지 (N,E) 외적 값"""
+        return (self.bx - self.ax) * (py - self.ay) - (self.by - self.ay) * (px - self.ax)
+
+    def contains_points(self, px, py) -> np.ndarray:
+        """점들이 폴리곤 내부(경계 제외)에 있는지 일괄 검사 (경계 위의 점은 False)"""
+        import shapely
+        return shapely.contains_xy(self.prepared, np.asarray(px, dtype=float), np.asarray(py, dtype=float))
+
+    def contains_rects(self, rects) -> np.ndarray:
+        """직사각형 (N,4) 각각이 폴리곤 안에 완전히 포함되는지 한 번에 검사"""
+        rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+        if len(rects) < self.small_batch:
+            import shapely
+            boxes = shapely.box(rects[:, 0], rects[:, 1], rects[:, 0] + rects[:, 2], rects[:, 1] + rects[:, 3])
+            return shapely.contains(self.prepared, boxes)
+        x0, y0 = rects[:, 0:1], rects[:, 1:2]
+        x1, y1 = x0 + rects[:, 2:3], y0 + rects[:, 3:4]
+        min_x, min_y, max_x, max_y = self.bounds
+        inside = ((min_x <= x0) & (x1 <= max_x) & (min_y <= y0) & (y1 <= max_y)).ravel()
+        
+        # 분리축 검사: x, y 투영이 열린 구간으로 겹치고 네 꼭짓점이 선분 양쪽에 걸치면 선분이 직사각형 내부를 지난다
+        overlap = ((self.edge_max_x > x0) & (self.edge_min_x < x1) &
+                   (self.edge_max_y > y0) & (self.edge_min_y < y1))
+        corners = [self._cross(x0, y0), self._cross(x1, y0), self._cross(x0, y1), self._cross(x1, y1)]
+        straddle = (np.minimum.reduce(corners) < 0) & (np.maximum.reduce(corners) > 0)
+        inside &= ~(overlap & straddle).any(axis=1)
+        
+        if inside.any():
+            centers = rects[inside]
+            inside[inside] = self.contains_points(centers[:, 0] + centers[:, 2] / 2, centers[:, 1] + centers[:, 3] / 2)
+        return inside
+
+    def contains_rect(self, x: float, y: float, w: float, h: float) -> bool:
+        return bool(self.contains_rects((x, y, w, h))[0])
+
+def prepare_polygon(site_polygon) -> Optional[PreparedPolygon]:
+    """부지 폴리곤을 PreparedPolygon 으로 준비 (None 이나 이미 준비된 폴리곤은 그대로 반환)"""
+    if site_polygon is None or isinstance(site_polygon, PreparedPolygon):
+        return site_polygon
+    return PreparedPolygon(site_polygon)
@@ -0,0 +1,46 @@
+# stats.py: 배치 탐색 단계별 소요 시간과 후보 통과/탈락 통계
+
+import copy
+from typing import Dict
+
+class LayoutStats:
+    """단계별 {'time': 초, 'in': 들어온 후보 수, 'out': 통과한 후보 수, 'rejected': {이유: 수}} 통계
+
+    단계는 처음 기록될 때 만들어지고 기록된 순서대로 보고된다.
+    작업자 프로세스에서 모은 통계는 merge() 로 합친다 (pickle 로 전달할 수 있는 dict 만 보관).
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict] = {}
+
+    def stage(self, name: str) -> Dict:
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {'time': 0.0, 'in': 0, 'out': 0, 'rejected': {}}
+        return entry
+
+    def record(self, name: str, candidates: int, passed: int, elapsed: float = 0.0, **rejected: int):
+        """단계 name 에 후보 candidates 개 중 passed 개 통과, 소요 시간 elapsed 초, 이유별 탈락 수를 누적"""
+        entry = self.stage(name)
+        entry['in'] += candidates
+        entry['out'] += passed
+        entry['time'] += elapsed
+        entry_rejected = entry['rejected']
+        for reason, count in rejected.items():
+            if count:
+                entry_rejected[reason] = entry_rejected.get(reason, 0) + count
+
+    def merge(self, other: 'LayoutStats'):
+        for name, other_entry in other.stages.items():
+            self.record(name, other_entry['in'], other_entry['out'], other_entry['time'], **other_entry['rejected'])
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return copy.deepcopy(self.stages)
+
+    def report(self) -> str:
+        """단계별 한 줄 요약 (단계, 시간, 통과/입력, 탈락 이유)"""
+        lines = []
+        for name, entry in self.stages.items():
+            rejected = ', '.join(f"{reason}={count}" for reason, count in entry['rejected'].items())
+            lines.append(f"{name:<20} {entry['time'] * 1000:9.1f} ms  {entry['out']:>9} / {entry['in']:<9} {rejected}")
+        return '\n'.join(lines)
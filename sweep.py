@@ -0,0 +1,158 @@
+# sweep.py: 이격거리/격자 간격/부속동 간격/부지 크기/생산동 크기 조합 전체의 배치 가능 여부와 점수 표를 만드는 파라미터 탐색
+
+import argparse
+import itertools
+import json
+import os
+import sys
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Sequence
+from config import DEFAULT_VALUES
+from scenario import create_buildings, load_scenario
+from pipeline import LayoutPipeline
+from ranking import rank_top_k
+
+# 탐색 파라미터 (앞 단계에 영향을 주는 것부터 - 조합을 이 순서로 중첩하면 연속한 조합이 앞 단계 결과를 공유)
+# site_size, prod_size 는 입력 값, 나머지는 실행 옵션
+SWEEP_PARAMS = ('site_size', 'setback', 'grid_size', 'prod_size', 'building_spacing')
+INPUT_PARAMS = ('site_size', 'prod_size')
+
+def sweep_combinations(inputs: Dict, run_options: Dict, ranges: Dict[str, Optional[Sequence]]) -> List[Dict]:
+    """SWEEP_PARAMS 순서로 중첩한 모든 조합 (범위를 주지 않은 파라미터는 기준 값 하나)"""
+    values = []
+    for param in SWEEP_PARAMS:
+        param_range = ranges.get(param)
+        if param_range is None:
+            base = inputs[param] if param in INPUT_PARAMS else run_options[param]
+            param_range = [base]
+        elif not param_range:
+            raise ValueError(f"빈 탐색 범위: {param}")
+        values.append([tuple(value) if isinstance(value, list) else value for value in param_range])
+    return [dict(zip(SWEEP_PARAMS, combination)) for combination in itertools.product(*values)]
+
+def combination_inputs(inputs: Dict, combination: Dict) -> Dict:
+    """기준 입력 값에 조합의 부지/생산동 크기를 적용 (직사각형 부지의 출입구는 부지 크기에 비례하여 옮긴다)"""
+    site_w, site_h = inputs['site_size']
+    new_w, new_h = combination['site_size']
+    gates = inputs['gates']
+    if (new_w, new_h) != (site_w, site_h):
+        gates = [(gate_x * new_w / site_w, gate_y * new_h / site_h) for gate_x, gate_y in gates]
+    return dict(inputs, site_size=(new_w, new_h), gates=gates, prod_size=combination['prod_size'])
+
+# 작업자 프로세스마다 하나씩 두는 파이프라인 (같은 프로세스의 연속한 조합이 앞 단계 결과를 재사용)
+_pipeline: Optional[LayoutPipeline] = None
+
+def _evaluate_chunk(args) -> List[Dict]:
+    inputs, combinations, run_options, weights, score = args
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = LayoutPipeline()
+    rows = []
+    for combination in combinations:
+        started = perf_counter()
+        combo_inputs = combination_inputs(inputs, combination)
+        options = {param: value for param, value in combination.items() if param not in INPUT_PARAMS}
+        layouts, failure_reasons = _pipeline.update(combo_inputs, **dict(run_options, **options))
+        row = dict(combination, layout_count=len(layouts), feasible=bool(layouts),
+                   failure_reasons={reason: count for reason, count in failure_reasons.items() if count})
+        if score:
+            # 파이프라인이 보관한 레이아웃은 수정하지 않도록 복사본에 점수를 기록
+            best = rank_top_k(map(dict, layouts), create_buildings(combo_inputs), 1, weights,
+                              setback=combination['setback'])
+            row['best_score'] = best[0]['score'] if best else None
+            row['best_layout_id'] = best[0]['id'] if best else None
+        row['elapsed'] = perf_counter() - started
+        rows.append(row)
+    return rows
+
+def sweep(inputs: Dict, setbacks: Optional[Sequence[float]] = None, grid_sizes: Optional[Sequence[float]] = None,
+          building_spacings: Optional[Sequence[float]] = None, site_sizes: Optional[Sequence] = None,
+          prod_sizes: Optional[Sequence] = None, workers: Optional[int] = None,
+          weights: Optional[Dict[str, float]] = None, score: bool = True, **run_options) -> List[Dict]:
+    """파라미터 범위의 모든 조합을 탐색하여 조합별 결과 행 목록을 SWEEP_PARAMS 중첩 순서로 반환
+
+    inputs: 기준 입력 값 (DEFAULT_VALUES 형식, 직사각형 부지)
+    site_sizes, prod_sizes: (가로, 세로) 목록, 나머지 범위는 숫자 목록 (None 이면 기준 값만)
+    workers: 2 이상이면 조합을 연속 구간으로 나눠 프로세스 풀에서 실행 (결과는 순차 실행과 같다)
+    score: False 이면 점수(Future Area 계산 비용이 큼)를 생략하고 배치 가능 여부와 수만 계산
+    run_options: 모든 조합에 공통으로 쓰는 LayoutPipeline 실행 옵션 (substation_mode 등)
+    행: 조합 값, layout_count, feasible, failure_reasons, best_score, best_layout_id, elapsed(초)
+    """
+    if isinstance(inputs['site_size'], list):
+        raise ValueError("다각형 부지는 파라미터 탐색을 지원하지 않습니다")
+    run_options = LayoutPipeline(**run_options).run_options
+    combinations = sweep_combinations(inputs, run_options, {
+        'site_size': site_sizes, 'setback': setbacks, 'grid_size': grid_sizes,
+        'prod_size': prod_sizes, 'building_spacing': building_spacings})
+    # 작업자별 연속 구간: 같은 구간의 이웃 조합은 앞쪽 파라미터가 같아 파이프라인 단계 결과를 재사용한다
+    chunk_count = min(workers or 1, len(combinations))
+    chunk_size = -(-len(combinations) // chunk_count)
+    tasks = [(inputs, combinations[start:start + chunk_size], run_options, weights, score)
+             for start in range(0, len(combinations), chunk_size)]
+    if len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+            chunks = list(executor.map(_evaluate_chunk, tasks))
+    else:
+        chunks = [_evaluate_chunk(task) for task in tasks]
+    return [row for chunk in chunks for row in chunk]
+
+def _size_order(value):
+    # (가로, 세로) 는 면적 순
+    return value[0] * value[1] if isinstance(value, tuple) else value
+
+def minimum_feasible(rows: Iterable[Dict], param: str) -> List[Dict]:
+    """나머지 파라미터 조합별로 배치가 가능한 param 의 최솟값 (예: 'site_size' 로 최소 부지 크기, 없으면 None)"""
+    others = [name for name in SWEEP_PARAMS if name != param]
+    groups = {}
+    for row in rows:
+        group = groups.setdefault(tuple(row[name] for name in others), [])
+        if row['feasible']:
+            group.append(row[param])
+    return [dict(zip(others, key), **{param: min(values, key=_size_order) if values else None})
+            for key, values in groups.items()]
+
+def format_table(rows: List[Dict]) -> str:
+    """결과 행 목록을 고정 폭 텍스트 표로"""
+    lines = [f"{'site':>11} {'setback':>8} {'grid':>6} {'prod':>11} {'spacing':>8} {'layouts':>8} {'score':>10} {'time':>7}"]
+    for row in rows:
+        best_score = row.get('best_score')
+        score_text = '-' if best_score is None else f"{best_score:.1f}"
+        lines.append(f"{'x'.join(f'{value:g}' for value in row['site_size']):>11} {row['setback']:>8g} "
+                     f"{row['grid_size']:>6g} {'x'.join(f'{value:g}' for value in row['prod_size']):>11} "
+                     f"{row['building_spacing']:>8g} {row['layout_count']:>8} {score_text:>10} {row['elapsed']:>6.2f}s")
+    return '\n'.join(lines)
+
+def _parse_size(text: str):
+    width, height = text.lower().split('x')
+    return (float(width), float(height))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="배치 파라미터 조합별 배치 가능 여부와 점수 표")
+    parser.add_argument('scenario', nargs='?', help="기준 시나리오 파일 (없으면 DEFAULT_VALUES)")
+    parser.add_argument('--setback', type=float, nargs='+', help="이격거리 목록 (m)")
+    parser.add_argument('--grid-size', type=float, nargs='+', help="생산동 후보 격자 간격 목록 (m)")
+    parser.add_argument('--building-spacing', type=float, nargs='+', help="부속동 사이 간격 목록 (m)")
+    parser.add_argument('--site-size', type=_parse_size, nargs='+', help="부지 크기 목록 (예: 700x500)")
+    parser.add_argument('--prod-size', type=_parse_size, nargs='+', help="생산동 크기 목록 (예: 300x150)")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="작업자 프로세스 수")
+    parser.add_argument('--no-score', action='store_true', help="점수 계산 생략 (배치 가능 여부와 수만)")
+    parser.add_argument('-o', '--output', help="조합별 결과를 JSON Lines 로 저장할 파일")
+    args = parser.parse_args(argv)
+
+    inputs = load_scenario(args.scenario) if args.scenario else dict(DEFAULT_VALUES)
+    started = perf_counter()
+    rows = sweep(inputs, setbacks=args.setback, grid_sizes=args.grid_size, building_spacings=args.building_spacing,
+                 site_sizes=args.site_size, prod_sizes=args.prod_size, workers=args.workers,
+                 score=not args.no_score)
+    print(format_table(rows))
+    print(f"{len(rows)}개 조합 중 {sum(row['feasible'] for row in rows)}개 배치 가능 ({perf_counter() - started:.1f}s)",
+          file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            for row in rows:
+                output.write(json.dumps(row, ensure_ascii=False) + '\n')
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
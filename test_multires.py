@@ -0,0 +1,23 @@
+# test_multires.py: 다중 해상도 탐색의 seed 세분화 순서 검사
+
+from config import DEFAULT_VALUES
+from scenario import create_buildings
+from multires import multires_layouts
+
+# Future Area 를 빼서 빠르게 계산 (기본 시나리오에서 거친 레벨의 최고 점수 위치가 세로 방향)
+WEIGHTS = {'gate_distance': -1.0, 'annex_distance': -1.0}
+
+def test_refinement_starts_at_best_seed_across_orientations():
+    buildings = create_buildings(DEFAULT_VALUES)
+    stats = []
+    layouts = multires_layouts(buildings, levels=(100, 25), budget=50, weights=WEIGHTS, stats=stats)
+    coarse_count = stats[0]['layouts']
+    best = max((layout for layout in layouts if layout['id'] < coarse_count),
+               key=lambda layout: (layout['score'], -layout['id']))
+    assert best['production']['orientation'] == 'vertical'
+
+    # 세분화 레벨은 방향별 순서가 아니라 최고 점수 seed 주변(±50m)부터 평가해야 한다
+    seed_x, seed_y = best['production']['x'], best['production']['y']
+    refined = [layout['production'] for layout in layouts if layout['id'] >= coarse_count]
+    assert any(prod['orientation'] == 'vertical' and abs(prod['x'] - seed_x) <= 50 and abs(prod['y'] - seed_y) <= 50
+               for prod in refined)
@@ -0,0 +1,27 @@
+# test_ranking.py: 상위 K개 선별의 점수 상한 가지치기 검사
+
+from config import DEFAULT_VALUES
+from scenario import create_buildings
+from layout import generate_all_layouts
+from ranking import rank_top_k
+
+def test_pruned_top_k_matches_full_ranking():
+    # 부지 세로가 짧아 Future Area 정사각형이 위아래 이격선에 모두 닿는 경우 (상한이 정확해야 함)
+    buildings = create_buildings(dict(DEFAULT_VALUES, site_size=(2000, 600), gates=[(200, 600), (0, 200)]))
+    layouts, _ = generate_all_layouts(buildings, grid_size=50)
+    # 앞쪽 케이스로 힙이 먼저 차고 더 좋은 케이스가 뒤에 나오는 구간만 사용 (전체 순위 계산 비용 절감)
+    layouts = layouts[:20] + layouts[890:920]
+    pruned = rank_top_k(layouts, buildings, 5)
+    full = rank_top_k([dict(layout) for layout in layouts], buildings, len(layouts))[:5]
+    assert [layout['id'] for layout in pruned] == [layout['id'] for layout in full]
+    assert [layout['score'] for layout in pruned] == [layout['score'] for layout in full]
+
+def test_ties_keep_input_order():
+    # 입력이 id 오름차순이 아니어도 동점은 먼저 나온 케이스가 우선 (기본 입력의 상위 5개에 동점이 있음)
+    buildings = create_buildings(DEFAULT_VALUES)
+    layouts, _ = generate_all_layouts(buildings)
+    layouts.reverse()
+    scores = {layout['id']: layout['score'] for layout in rank_top_k(layouts, buildings, len(layouts))}
+    expected = sorted(layouts, key=lambda layout: -scores[layout['id']])[:5]
+    assert len({scores[layout['id']] for layout in expected}) < 5
+    assert [layout['id'] for layout in rank_top_k(layouts, buildings, 5)] == [layout['id'] for layout in expected]
@@ -1,12 +1,15 @@
 # utils.py: 유틸리티 함수 (거리 계산, 주차 계산 등)
 
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import TYPE_CHECKING, List, Dict, Tuple, Optional
 from config import SETBACK, BUILDING_SPACING  # config에서 import
-from shapely.geometry import Polygon, box  # 추가 import
 
-def is_building_inside_polygon(building_x: float, building_y: float, building_w: float, building_h: float, site_polygon: Polygon) -> bool:
+if TYPE_CHECKING:
+    from shapely.geometry import Polygon  # shapely 는 다각형 부지에서만 불러온다
+
+def is_building_inside_polygon(building_x: float, building_y: float, building_w: float, building_h: float, site_polygon: 'Polygon') -> bool:
     """건물 직사각형이 부지 폴리곤 내부에 완전히 포함되는지 검사"""
+    from shapely.geometry import box
     building_rect = box(building_x, building_y, building_x + building_w, building_y + building_h)
     return site_polygon.contains(building_rect)  # 건물 전체가 내부에 있음
 
@@ -66,6 +69,16 @@ def get_main_gate(gates: List[Tuple[float, float]]) -> Tuple[float, float]:
     """y좌표가 가장 작은 출입구를 Main 출입구로 반환"""
     return min(gates, key=lambda gate: gate[1])
 
+def get_main_guide_size(guide_size: Tuple[float, float], main_gate: Tuple[float, float]) -> Tuple[float, float]:
+    """Main 출입구 위치에 따라 회전한 Main 안내동 크기 (x=0 변이면 세로로 길게, y=0 변이면 가로로 길게)"""
+    width, height = guide_size
+    gate_x, gate_y = main_gate
+    if gate_x == 0 and width > height:
+        return height, width
+    elif gate_y == 0 and width < height:
+        return height, width
+    return width, height
+
 def manhattan_distance(p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
     """맨해튼 거리 계산"""
     return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
@@ -76,6 +89,59 @@ def check_setback_distance(x1: float, y1: float, w1: float, h1: float,
     return (x1 + w1 + min_distance <= x2 or x2 + w2 + min_distance <= x1 or
             y1 + h1 + min_distance <= y2 or y2 + h2 + min_distance <= y1)
 
+def is_rect_clear(rect, placed, min_distance: float = SETBACK) -> bool:
+    """직사각형 하나가 배치된 직사각형 목록 전체와 이격거리를 만족하는지 (첫 충돌에서 바로 False)"""
+    x1, y1, w1, h1 = rect
+    for x2, y2, w2, h2 in placed:
+        if not (x1 + w1 + min_distance <= x2 or x2 + w2 + min_distance <= x1 or
+                y1 + h1 + min_distance <= y2 or y2 + h2 + min_distance <= y1):
+            return False
+    return True
+
+# 후보 수 x 배치 건물 수가 이보다 적으면 배열 연산 대신 is_rect_clear 루프로 검사
+# (배열 연산 한 번의 고정 비용이 스칼라 비교 수백 쌍과 비슷하다)
+SETBACK_BATCH_MIN_PAIRS = 256
+
+def check_setback_distance_batch(candidates, placed, min_distance: float = SETBACK,
+                                 return_conflict_index: bool = False):
+    """직사각형 하나 또는 N개 후보를 배치된 직사각형 (M,4) 배열과 한 번에 이격거리 검사
+
+    candidates: (x, y, w, h) 하나 또는 (N,4) 배열, placed: (M,4) 배열
+    반환: 이격거리를 만족하면 True 인 마스크 (단일 입력이면 bool 하나)
+          return_conflict_index=True 이면 첫 번째 충돌 건물의 인덱스(충돌 없음: -1)도 함께 반환
+    N x M 이 SETBACK_BATCH_MIN_PAIRS 보다 작으면 (충돌 인덱스를 묻지 않을 때) 스칼라 루프로 검사한다.
+    """
+    candidates = np.asarray(candidates, dtype=float)
+    single = candidates.ndim == 1
+    candidates = candidates.reshape(-1, 4)
+    placed = np.asarray(placed, dtype=float).reshape(-1, 4)
+    
+    if not return_conflict_index and len(candidates) * len(placed) < SETBACK_BATCH_MIN_PAIRS:
+        placed_list = placed.tolist()
+        valid = [is_rect_clear(rect, placed_list, min_distance) for rect in candidates.tolist()]
+        return valid[0] if single else np.array(valid, dtype=bool)
+    
+    x1, y1, w1, h1 = (candidates[:, i:i + 1] for i in range(4))
+    x2, y2, w2, h2 = placed.T
+    clear = ((x1 + w1 + min_distance <= x2) | (x2 + w2 + min_distance <= x1) |
+             (y1 + h1 + min_distance <= y2) | (y2 + h2 + min_distance <= y1))
+    valid = clear.all(axis=1)
+    
+    if return_conflict_index:
+        conflict_index = np.full(len(candidates), -1)
+        if placed.size:
+            conflict_index[~valid] = np.argmin(clear[~valid], axis=1)
+    
+    if single:
+        return (bool(valid[0]), int(conflict_index[0])) if return_conflict_index else bool(valid[0])
+    return (valid, conflict_index) if return_conflict_index else valid
+
+def building_rects(positions: Dict, buildings: List) -> np.ndarray:
+    """배치된 건물들을 (M,4) [x, y, w, h] 배열로 변환 (위치가 없는 건물은 제외)"""
+    rects = [(positions[building.name][0], positions[building.name][1], building.width, building.height)
+             for building in buildings if building.name in positions]
+    return np.array(rects, dtype=float).reshape(-1, 4)
+
 def distance(p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
     return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
 
@@ -120,27 +186,3 @@ def get_annex_group_center(annex_positions: Dict, annex_buildings: List) -> Tupl
     avg_x = sum(center[0] for center in centers) / len(centers)
     avg_y = sum(center[1] for center in centers) / len(centers)
     return (avg_x, avg_y)
-
-def is_valid_substation_position(sub_x: float, sub_y: float, substation,
-                                 prod_x: float, prod_y: float, prod_w: float, prod_h: float,
-                                 annex_positions: Dict, annex_buildings: List,
-                                 guide_positions: Dict, guide_buildings: List,
-                                 parking_positions: Dict, parking_buildings: List) -> bool:
-    """변전소 위치의 유효성을 검사하는 헬퍼 함수"""
-    # 생산동과의 이격거리 검사
-    if not check_setback_distance(sub_x, sub_y, substation.width, substation.height,
-                                  prod_x, prod_y, prod_w, prod_h):
-        return False
-    
-    # 다른 건물들과의 이격거리 검사
-    all_buildings = [(annex_positions, annex_buildings), (guide_positions, guide_buildings), (parking_positions, parking_buildings)]
-    
-    for positions, buildings in all_buildings:
-        for building in buildings:
-            if building.name in positions:
-                pos = positions[building.name]
-                if not check_setback_distance(sub_x, sub_y, substation.width, substation.height,
-                                              pos[0], pos[1], building.width, building.height):
-                    return False
-    
-    return True
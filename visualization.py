@@ -3,13 +3,17 @@
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
-from typing import List, Dict
+from typing import List, Dict, Optional
 from utils import get_production_areas, get_main_gate
-from layout import get_buildings_positions_sizes, find_max_square_area
+from layout import get_buildings_positions_sizes, find_max_square_area, FutureAreaCache
 from config import SETBACK
+from profiling import traced
 from shapely.geometry import Polygon  # 추가: 다각형 처리용
 
-def visualize_layout(layout: Dict, buildings: Dict, layout_title: str = "") -> go.Figure:
+@traced()
+def visualize_layout(layout: Dict, buildings: Dict, layout_title: str = "",
+                     future_area: Optional[FutureAreaCache] = None) -> go.Figure:
+    """배치 케이스 상세 배치도 (future_area: 여러 배치도를 그릴 때 공유하는 Future Area 격자 캐시)"""
     fig = go.Figure()
     site_size = buildings['site_size']
     site_shape = buildings.get('site_shape', '직사각형')  # site_shape 확인
@@ -155,8 +159,11 @@ def visualize_layout(layout: Dict, buildings: Dict, layout_title: str = "") -> g
         )
     
     # Future Area
-    positions, sizes = get_buildings_positions_sizes(layout, buildings)
-    future_x, future_y, future_size = find_max_square_area(site_w, site_h, positions, sizes, site_polygon, SETBACK)
+    if future_area is not None:
+        future_x, future_y, future_size = future_area.find(layout)
+    else:
+        positions, sizes = get_buildings_positions_sizes(layout, buildings)
+        future_x, future_y, future_size = find_max_square_area(site_w, site_h, positions, sizes, site_polygon, SETBACK)
     
     if future_x is not None and future_size > 0:
         fig.add_shape(
@@ -188,6 +195,7 @@ def visualize_layout(layout: Dict, buildings: Dict, layout_title: str = "") -> g
     
     return fig
 
+@traced()
 def visualize_all_layouts(layouts: List[Dict], buildings: Dict, max_display: int = 12):
     if not layouts:
         print("생성된 레이아웃이 없습니다.")